@@ -0,0 +1,42 @@
+from typing import List, Optional, Type
+
+from agents.heuristic_agent import HeuristicAgent
+from bid_table import MAX_ORDINAL, compile_tables, hand_target
+from models.bid import Bid, bid_ordinal
+from models.card import Card
+
+
+class CompiledHeuristicAgent(HeuristicAgent):
+    """
+    ``HeuristicAgent`` that bids from the compiled tables of ``bid_table``.
+
+    Makes the same bids and plays the same cards. The hand's target bid is
+    looked up once per deal, after which every bid is one table lookup.
+    ``valid_bids`` must be in the order ``Bidding.get_valid_bids`` returns:
+    pass, then the contract bids from the cheapest up.
+    """
+
+    # Agent whose bidding rules are compiled
+    RULES: Type[HeuristicAgent] = HeuristicAgent
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._responses = compile_tables(self.RULES).responses.tolist()
+        self._target: Optional[int] = None
+
+    def reset(self):
+        super().reset()
+        self._target = None
+
+    def receive_cards(self, cards: List[Card]):
+        super().receive_cards(cards)
+        self._target = None
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        if self._target is None:
+            self._target = hand_target(
+                self.evaluate_hand(), self._find_best_suit(), compile_tables(self.RULES)
+            )
+        highest = bid_ordinal(valid_bids[1]) - 1 if len(valid_bids) > 1 else MAX_ORDINAL
+        ordinal = self._responses[self._target][highest]
+        return valid_bids[ordinal - highest] if ordinal else valid_bids[0]
@@ -1,8 +1,17 @@
 from typing import List, Optional, Dict
 from models.player import Player
-from models.card import Card, Suit, Rank
+from models.card import Card, Suit, Rank, RANK_INDEX
 from models.bid import Bid
 from dataclasses import dataclass
+import suit_tables
+from suit_tables import (
+    FOURTH_BEST,
+    HIGHEST_CARD,
+    RANKS,
+    SUIT_HCP,
+    SUIT_LENGTH,
+    SUIT_QUALITY,
+)
 
 
 @dataclass
@@ -26,6 +35,8 @@ class HandEvaluation:
 class HeuristicAgent(Player):
     """A bridge-playing agent that uses standard bidding and playing conventions."""
 
+    deterministic = True
+
     # Bidding constants
     MIN_POINTS_TO_BID = 8
     MIN_POINTS_TO_OPEN = 12
@@ -34,30 +45,72 @@ class HeuristicAgent(Player):
     MIN_POINTS_FOR_NT = 15
 
     # Card evaluation constants
-    HIGH_CARD_POINTS = {
-        Rank.ACE: 4,
-        Rank.KING: 3,
-        Rank.QUEEN: 2,
-        Rank.JACK: 1,
-    }
-    SUIT_LENGTH_FACTOR = 0.5
-    HIGH_CARD_QUALITY_FACTOR = 0.3
+    HIGH_CARD_POINTS = suit_tables.HIGH_CARD_POINTS
+    SUIT_LENGTH_FACTOR = suit_tables.SUIT_LENGTH_FACTOR
+    HIGH_CARD_QUALITY_FACTOR = suit_tables.HIGH_CARD_QUALITY_FACTOR
+    SUITS = [Suit.CLUBS, Suit.DIAMONDS, Suit.HEARTS, Suit.SPADES]
 
     def __init__(self, name: str):
         super().__init__(name)
+        # Hand evaluation state, computed once per deal and kept up to date as
+        # cards are received and played
+        self._masks = [0, 0, 0, 0]
+        self._hand_eval: Optional[HandEvaluation] = None
+        self._best_suit: Optional[Suit] = None
+
+    def reset(self):
+        super().reset()
+        self._masks = [0, 0, 0, 0]
+        self._hand_eval = None
+        self._best_suit = None
+
+    def receive_cards(self, cards: List[Card]):
+        super().receive_cards(cards)
+        for card in cards:
+            self._masks[card.suit.index] |= 1 << RANK_INDEX[card.rank]
+        self._hand_eval = None
+        self._best_suit = None
+
+    def play_card(self, card: Card):
+        super().play_card(card)
+        self._masks[card.suit.index] &= ~(1 << RANK_INDEX[card.rank])
+        self._best_suit = None
+
+        # Replaced rather than updated, since callers may hold the old one
+        hand_eval = self._hand_eval
+        if hand_eval is not None:
+            suit_counts = dict(hand_eval.suit_counts)
+            suit_counts[card.suit] -= 1
+            self._hand_eval = HandEvaluation(
+                hand_eval.high_card_points - self.HIGH_CARD_POINTS.get(card.rank, 0),
+                self._calculate_distribution_points(suit_counts),
+                suit_counts,
+            )
+        return card
 
     def evaluate_hand(self) -> HandEvaluation:
-        """Evaluate the hand using standard bridge point count system."""
+        """
+        Evaluate the hand using standard bridge point count system.
+
+        The result is cached and must not be modified; playing a card
+        replaces it instead of changing it.
+        """
+        if self._hand_eval is not None:
+            return self._hand_eval
+
+        masks = self._masks
+
         # Calculate high card points
-        hcp = self.get_hcp()
+        hcp = sum(SUIT_HCP[mask] for mask in masks)
 
         # Count cards in each suit
-        suit_counts = self.get_suit_distribution()
+        suit_counts = {suit: SUIT_LENGTH[masks[suit.index]] for suit in self.SUITS}
 
         # Calculate distribution points
         distribution_points = self._calculate_distribution_points(suit_counts)
 
-        return HandEvaluation(hcp, distribution_points, suit_counts)
+        self._hand_eval = HandEvaluation(hcp, distribution_points, suit_counts)
+        return self._hand_eval
 
     def _calculate_distribution_points(self, suit_counts: Dict[Suit, int]) -> int:
         """Calculate distribution points (void=3, singleton=2, doubleton=1)."""
@@ -68,30 +121,16 @@ class HeuristicAgent(Player):
 
     def _evaluate_suit_quality(self, suit: Suit) -> float:
         """Evaluate the quality of a suit based on high cards and length."""
-        suit_cards = self.get_cards_of_suit(suit)
-        if not suit_cards:
-            return 0.0
-
-        # Base points from length
-        quality = len(suit_cards) * self.SUIT_LENGTH_FACTOR
-
-        # Add points for high cards
-        quality += sum(
-            self.HIGH_CARD_POINTS[card.rank] * self.HIGH_CARD_QUALITY_FACTOR
-            for card in suit_cards
-            if card.rank in self.HIGH_CARD_POINTS
-        )
-
-        return quality
+        return SUIT_QUALITY[self._masks[suit.index]]
 
     def _find_best_suit(self) -> Suit:
         """Find the most biddable suit in hand."""
-        suit_qualities = {
-            suit: self._evaluate_suit_quality(suit)
-            for suit in Suit
-            if suit != Suit.NO_TRUMP
-        }
-        return max(suit_qualities.items(), key=lambda x: x[1])[0]
+        if self._best_suit is None:
+            masks = self._masks
+            self._best_suit = max(
+                self.SUITS, key=lambda suit: SUIT_QUALITY[masks[suit.index]]
+            )
+        return self._best_suit
 
     def _determine_bid_level(self, total_points: int) -> int:
         """Determine appropriate bid level based on total points."""
@@ -107,26 +146,28 @@ class HeuristicAgent(Player):
         """Get the pass bid from valid bids."""
         return next(bid for bid in valid_bids if bid.is_pass)
 
-    def make_bid(self, valid_bids: List[Bid]) -> Bid:
-        """Make a bid based on hand evaluation and basic bidding rules."""
-        hand_eval = self.evaluate_hand()
-
+    def _desired_bid(self, hand_eval: HandEvaluation, best_suit: Suit) -> Optional[Bid]:
+        """The bid a hand aims for, None to pass."""
         # Pass with weak hands
         if hand_eval.total_points < self.MIN_POINTS_TO_BID:
-            return self._get_pass_bid(valid_bids)
+            return None
 
         bid_level = self._determine_bid_level(hand_eval.total_points)
         if bid_level == 0:
-            return self._get_pass_bid(valid_bids)
+            return None
 
         # Choose between NT and suit bid
         if (
             hand_eval.is_balanced
             and hand_eval.high_card_points >= self.MIN_POINTS_FOR_NT
         ):
-            desired_bid = Bid(bid_level, Suit.NO_TRUMP)
-        else:
-            desired_bid = Bid(bid_level, self._find_best_suit())
+            return Bid(bid_level, Suit.NO_TRUMP)
+        return Bid(bid_level, best_suit)
+
+    def _select_bid(self, desired_bid: Optional[Bid], valid_bids: List[Bid]) -> Bid:
+        """Lowest valid bid at or above the desired bid, pass if there is none."""
+        if desired_bid is None:
+            return self._get_pass_bid(valid_bids)
 
         # Find lowest valid bid that's higher than our desired bid
         valid_suit_bids = [b for b in valid_bids if not b.is_pass]
@@ -139,28 +180,28 @@ class HeuristicAgent(Player):
 
         return self._get_pass_bid(valid_bids)
 
-    def _get_suit_counts(self) -> Dict[Suit, int]:
-        """Count cards in each suit in hand."""
-        counts = {}
-        for card in self.hand:
-            counts[card.suit] = counts.get(card.suit, 0) + 1
-        return counts
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        """Make a bid based on hand evaluation and basic bidding rules."""
+        desired_bid = self._desired_bid(self.evaluate_hand(), self._find_best_suit())
+        return self._select_bid(desired_bid, valid_bids)
 
     def _choose_lead_card(self, valid_cards: List[Card]) -> Card:
         """Choose a card when leading a trick."""
-        suit_counts = self._get_suit_counts()
-        longest_suit = max(suit_counts.items(), key=lambda x: x[1])[0]
-        suit_cards = [c for c in valid_cards if c.suit == longest_suit]
+        masks = self._masks
+        # Longest suit, ties go to the higher ranking suit
+        longest_suit = max(
+            reversed(self.SUITS), key=lambda suit: SUIT_LENGTH[masks[suit.index]]
+        )
+        mask = masks[longest_suit.index]
 
-        if not suit_cards:
-            return max(valid_cards, key=lambda c: c.rank.value)
+        if not any(c.suit == longest_suit for c in valid_cards):
+            return max(valid_cards, key=lambda c: RANK_INDEX[c.rank])
 
         # Lead fourth highest from longest suit if possible
-        if len(suit_cards) >= 4:
-            suit_cards.sort(key=lambda c: c.rank.value)
-            return suit_cards[-4]
+        if SUIT_LENGTH[mask] >= 4:
+            return Card(longest_suit, RANKS[FOURTH_BEST[mask]])
 
-        return max(suit_cards, key=lambda c: c.rank.value)
+        return Card(longest_suit, RANKS[HIGHEST_CARD[mask]])
 
     def _choose_follow_card(self, valid_cards: List[Card], trick_suit: Suit) -> Card:
         """Choose a card when following to a trick."""
@@ -0,0 +1,441 @@
+"""Bidding agent that searches the auction with Monte Carlo tree search.
+
+At the start of a deal the agent samples ``num_worlds`` layouts of the hidden
+hands around its own and computes once per world what the other seats would
+bid and how many tricks every contract takes. Each search iteration picks a
+world consistent with the auction so far, walks the tree (the agent's own
+bids chosen by UCB, the other seats' bids given by the world), finishes the
+auction with a fast rollout and scores the final contract for the agent's
+side.
+
+The other seats are modelled as ``HeuristicAgent`` bidders: their bids are a
+pure function of their hand and the highest bid, which also lets the agent
+drop worlds in which the observed auction would have gone differently. When
+too few worlds are left, new ones are dealt from the hand constraints that
+``auction_inference`` derives from the auction. Trick counts come from
+``trick_estimator``, by default the fitted ``dd_estimate`` model;
+``estimate_tricks`` is a cruder point-count estimate, and
+``dd_dataset.dd_tables`` gives exact double dummy results at a much higher
+cost per world.
+
+The tree is kept between the agent's turns of the same auction. Every bid,
+world sampling included, stops at ``time_budget`` seconds: the number of
+worlds is sized from the time left using the measured cost per world, and
+when not even ``min_worlds`` fit the agent bids as ``HeuristicAgent`` does.
+Card play is ``HeuristicAgent``'s.
+"""
+
+import math
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.heuristic_agent import HeuristicAgent
+from auction_inference import AuctionInference
+from bid_table import compile_tables, deal_targets
+from dd_estimate import default_estimator
+from dealer import Dealer
+from hand_features import extract_features
+from models.bid import Bid, bid_ordinal
+from models.player import Player
+from scoring import NO_TRUMP, SCORES, UNDOUBLED
+
+# Ordinal of 7NT, the highest bid
+MAX_ORDINAL = 35
+
+# Candidate deals per batch, and batches at most, when sampling worlds from
+# auction constraints. Small batches let sampling stop close to the deadline.
+SAMPLE_BATCH_SIZE = 512
+MIN_SAMPLE_BATCH_SIZE = 32
+SAMPLE_BATCHES = 40
+
+# Shares of the time left for a bid spent sampling worlds, then computing
+# their bids and tricks; the rest is left for the search
+SAMPLE_SHARE = 0.25
+PRECOMPUTE_SHARE = 0.25
+
+# World counts whose precomputation is timed when the agent is created
+WARM_UP_WORLDS = (8, 32)
+
+# Scores are divided by this before averaging, so that exploration constants
+# around 1 are sensible
+SCORE_SCALE = 1000.0
+
+_PARTNER = [2, 3, 0, 1]
+
+
+def heuristic_bid(targets: np.ndarray, highest: int) -> np.ndarray:
+    """``HeuristicAgent``'s bid ordinals for an array of targets and a highest bid."""
+    return np.where(
+        (targets == 0) | (highest >= MAX_ORDINAL), 0, np.maximum(targets, highest + 1)
+    )
+
+
+def _next_declarer(declarer: int, seat: int, highest: int, ordinal: int) -> int:
+    """Declarer after ``seat`` bids ``ordinal``, same rule as ``Bidding.make_bid``."""
+    if (
+        declarer == -1
+        or (ordinal - 1) % 5 != (highest - 1) % 5
+        or (declarer + seat) % 2
+    ):
+        return seat
+    return declarer
+
+
+def estimate_tricks(deals: np.ndarray) -> np.ndarray:
+    """
+    Rough trick estimate for every strain and declarer.
+
+    Suit contracts use the losing trick count of the partnership, reduced
+    by the trumps missing from an eight card fit. No trump uses the
+    partnership's high card points.
+
+    Args:
+        deals: (N, 4, 52) boolean deals
+
+    Returns:
+        (N, 5, 4) tricks by strain index and declarer seat
+    """
+    features = extract_features(deals)
+    hcp = features.hcp + features.hcp[:, _PARTNER]
+    losers = features.losing_trick_count + features.losing_trick_count[:, _PARTNER]
+    fit = features.suit_lengths + features.suit_lengths[:, _PARTNER]
+
+    tricks = np.empty((len(deals), 5, 4), dtype=np.float32)
+    tricks[:, :4] = 24 - losers[:, None, :] - np.maximum(8 - fit, 0).transpose(0, 2, 1)
+    tricks[:, NO_TRUMP] = 6.5 + 0.4 * (hcp - 20)
+    return np.clip(np.rint(tricks), 0, 13).astype(np.int8)
+
+
+class _Node:
+    """Auction position. Seats are relative to the agent, which is seat 0."""
+
+    __slots__ = ("seat", "highest", "declarer", "passes", "children", "visits", "total")
+
+    def __init__(self, seat: int, highest: int, declarer: int, passes: int):
+        self.seat = seat
+        self.highest = highest
+        self.declarer = declarer
+        self.passes = passes
+        self.children: Dict[int, _Node] = {}
+        self.visits = 0
+        self.total = 0.0
+
+    @property
+    def is_over(self) -> bool:
+        return (self.highest and self.passes == 3) or self.passes == 4
+
+    def child(self, ordinal: int) -> "_Node":
+        """Position after a bid, created on first use."""
+        node = self.children.get(ordinal)
+        if node is None:
+            seat = self.seat
+            if ordinal:
+                declarer = _next_declarer(self.declarer, seat, self.highest, ordinal)
+                node = _Node((seat + 1) % 4, ordinal, declarer, 0)
+            else:
+                node = _Node(
+                    (seat + 1) % 4, self.highest, self.declarer, self.passes + 1
+                )
+            self.children[ordinal] = node
+        return node
+
+
+class MCTSBidAgent(HeuristicAgent):
+    """Bids by searching the rest of the auction within a time budget."""
+
+    deterministic = False
+
+    def __init__(
+        self,
+        name: str,
+        time_budget: float = 0.05,
+        num_worlds: int = 256,
+        exploration: float = 1.0,
+        min_worlds: int = 16,
+        vulnerable: bool = False,
+        trick_estimator: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        inference: Optional[AuctionInference] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            name: Player name
+            time_budget: Seconds per bid, including sampling the worlds
+            num_worlds: Hidden-hand layouts sampled per deal
+            exploration: UCB exploration constant, on scores / ``SCORE_SCALE``
+            min_worlds: Resample the worlds, and failing that use all of them,
+                when fewer than this many are consistent with the auction
+            vulnerable: Vulnerability used to score contracts
+            trick_estimator: Maps (N, 4, 52) deals to (N, 5, 4) tricks by
+                strain and declarer, ``dd_estimate.default_estimator()``
+                by default
+            inference: Auction inference to sample worlds from, can be
+                shared between agents to share its cache
+            seed: Seed for world sampling and search
+        """
+        super().__init__(name)
+        self.time_budget = time_budget
+        self.num_worlds = num_worlds
+        self.exploration = exploration
+        self.min_worlds = min_worlds
+        self.trick_estimator = trick_estimator or default_estimator()
+        self.inference = inference or AuctionInference()
+        self.rng = random.Random(seed)
+        self._seed = seed
+        self._scores = SCORES[int(vulnerable), UNDOUBLED].tolist()
+        # Iterations and consistent worlds of the last search
+        self.last_iterations = 0
+        self.last_worlds = 0
+        self._new_auction()
+        self._warm_up()
+
+    def _warm_up(self) -> None:
+        """
+        Build the bid tables and time sampling and the per-world bids and
+        tricks, so that the first bid is neither charged for lazy setup nor
+        sized from a guess.
+        """
+        compile_tables()
+        small, large = WARM_UP_WORLDS
+        dealer = Dealer(batch_size=large, seed=0)
+        start = time.perf_counter()
+        deals = dealer.generate_batch()
+        # Seconds per candidate deal
+        self._candidate_cost = (time.perf_counter() - start) / large
+
+        self._precompute(deals[:small])
+        times = [math.inf, math.inf]
+        for _ in range(3):
+            for i, n in enumerate(WARM_UP_WORLDS):
+                start = time.perf_counter()
+                self._precompute(deals[:n])
+                times[i] = min(times[i], time.perf_counter() - start)
+        # Precomputation takes overhead + world_cost * worlds seconds
+        self._world_cost = max(times[1] - times[0], 0.0) / (large - small) or 1e-6
+        self._precompute_overhead = max(times[0] - self._world_cost * small, 0.0)
+
+    def _worlds_within(self, seconds: float) -> int:
+        """Number of worlds whose bids and tricks take at most ``seconds``."""
+        return int((seconds - self._precompute_overhead) / self._world_cost)
+
+    def _new_auction(self) -> None:
+        self._auction: List[int] = []
+        self._root: Optional[_Node] = None
+        self._root_length = 0
+        self._deals: Optional[np.ndarray] = None
+        self._sampled_length = 0
+        self._targets: Optional[np.ndarray] = None
+        self._target_lists: List[List[int]] = []
+        self._trick_lists: List[List[List[int]]] = []
+
+    def reset(self):
+        super().reset()
+        self._new_auction()
+
+    def receive_cards(self, cards):
+        super().receive_cards(cards)
+        self._new_auction()
+
+    def observe_bid(self, player: Player, bid: Bid):
+        self._auction.append(bid_ordinal(bid))
+
+    def _precompute(self, deals: np.ndarray) -> Tuple[np.ndarray, list]:
+        """Bid targets and tricks, as nested lists, of every world."""
+        return deal_targets(deals), self.trick_estimator(deals).tolist()
+
+    def _sample_worlds(self, deadline: float) -> bool:
+        """
+        Deal the hidden hands and precompute each world's bids and tricks.
+
+        Args:
+            deadline: ``time.perf_counter()`` value the bid must finish by
+
+        Returns:
+            False, keeping the previous worlds, if fewer than ``min_worlds``
+            fit in the time left
+        """
+        start = time.perf_counter()
+        left = deadline - start
+        wanted = min(self.num_worlds, self._worlds_within(left * PRECOMPUTE_SHARE))
+        if wanted < self.min_worlds:
+            return False
+
+        seed = None if self._seed is None else self.rng.randrange(2**32)
+        predealt = {0: self.hand}
+        sample_deadline = start + left * SAMPLE_SHARE
+        batch_size = int(left * SAMPLE_SHARE / self._candidate_cost)
+        batch_size = max(MIN_SAMPLE_BATCH_SIZE, min(batch_size, SAMPLE_BATCH_SIZE))
+        chunks: List[np.ndarray] = []
+        count = 0
+        dealer = self.inference.dealer(
+            self._auction,
+            -len(self._auction) % 4,
+            predealt,
+            batch_size=batch_size,
+            seed=seed,
+        )
+        # Batch by batch rather than with ``stream``, which keeps drawing
+        # while its batches come out empty
+        for _ in range(SAMPLE_BATCHES):
+            batch_start = time.perf_counter()
+            if batch_start + batch_size * self._candidate_cost > sample_deadline:
+                break
+            deals = dealer.generate_batch()
+            self._candidate_cost = (time.perf_counter() - batch_start) / batch_size
+            chunks.append(deals)
+            count += len(deals)
+            if count >= wanted:
+                break
+        if count < self.min_worlds:
+            # The other seats do not bid by the rules the inference assumes
+            dealer = Dealer(predealt=predealt, batch_size=wanted, seed=seed)
+            chunks = [dealer.generate_batch()]
+
+        # Only the worlds whose bids and tricks fit in the time left
+        fits = self._worlds_within((deadline - time.perf_counter()) * PRECOMPUTE_SHARE)
+        deals = np.concatenate(chunks)[: min(wanted, fits)]
+        if len(deals) < self.min_worlds:
+            return False
+        targets, trick_lists = self._precompute(deals)
+
+        self._deals = deals
+        self._sampled_length = len(self._auction)
+        self._targets = targets
+        self._target_lists = targets.tolist()
+        self._trick_lists = trick_lists
+        return True
+
+    def _consistent_worlds(self) -> np.ndarray:
+        """Worlds in which the other seats would have bid as they did."""
+        auction = self._auction
+        keep = np.ones(len(self._targets), dtype=bool)
+        first_seat = -len(auction) % 4
+        highest = 0
+        for k, ordinal in enumerate(auction):
+            seat = (first_seat + k) % 4
+            if seat:
+                keep &= heuristic_bid(self._targets[:, seat], highest) == ordinal
+            if ordinal:
+                highest = ordinal
+        return np.flatnonzero(keep)
+
+    def _find_root(self, cheapest: int) -> _Node:
+        """
+        Tree node of the current auction, reusing the previous search's tree.
+
+        Args:
+            cheapest: Ordinal of the cheapest valid contract bid, 36 if none
+        """
+        node = self._root
+        if node is None:
+            # Start from the dealer's first bid
+            node = _Node(-len(self._auction) % 4, 0, -1, 0)
+            self._root_length = 0
+        for ordinal in self._auction[self._root_length :]:
+            node = node.child(ordinal)
+
+        if node.seat != 0 or node.highest + 1 != cheapest:
+            # The auction was not observed, start from the valid bids alone
+            highest = cheapest - 1
+            node = _Node(0, highest, 3 if highest else -1, 0)
+        self._root = node
+        self._root_length = len(self._auction)
+        return node
+
+    def _rollout(self, node: _Node, targets: List[int], tricks: List[List[int]]):
+        """Finish the auction with heuristic bids and score it for our side."""
+        seat, highest = node.seat, node.highest
+        declarer, passes = node.declarer, node.passes
+        while not ((highest and passes == 3) or passes == 4):
+            target = targets[seat]
+            if target and highest < MAX_ORDINAL:
+                ordinal = max(target, highest + 1)
+                declarer = _next_declarer(declarer, seat, highest, ordinal)
+                highest = ordinal
+                passes = 0
+            else:
+                passes += 1
+            seat = (seat + 1) % 4
+
+        if not highest:
+            return 0.0
+        level, strain = (highest - 1) // 5 + 1, (highest - 1) % 5
+        score = self._scores[level][strain][tricks[strain][declarer]]
+        return (score if declarer % 2 == 0 else -score) / SCORE_SCALE
+
+    def _iterate(self, root: _Node, world: int) -> None:
+        targets = self._target_lists[world]
+        tricks = self._trick_lists[world]
+        exploration = self.exploration
+
+        node = root
+        path = [node]
+        while not node.is_over:
+            if node.seat:
+                target = targets[node.seat]
+                if target and node.highest < MAX_ORDINAL:
+                    node = node.child(max(target, node.highest + 1))
+                else:
+                    node = node.child(0)
+                path.append(node)
+                continue
+
+            children = node.children
+            if len(children) < MAX_ORDINAL + 1 - node.highest:
+                # Expand the first untried move: pass, then the cheapest bids
+                move = 0
+                if move in children:
+                    move = node.highest + 1
+                    while move in children:
+                        move += 1
+                node = node.child(move)
+                path.append(node)
+                break
+
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children.values(),
+                key=lambda child: child.total / child.visits
+                + exploration * math.sqrt(log_visits / child.visits),
+            )
+            path.append(node)
+
+        value = self._rollout(node, targets, tricks)
+        for visited in path:
+            visited.visits += 1
+            visited.total += value
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        """Search the auction until the time budget runs out."""
+        deadline = time.perf_counter() + self.time_budget
+        contracts = [bid_ordinal(bid) for bid in valid_bids if not bid.is_pass]
+        if not contracts:
+            return self._get_pass_bid(valid_bids)
+
+        if self._deals is None and not self._sample_worlds(deadline):
+            return super().make_bid(valid_bids)
+        root = self._find_root(min(contracts))
+        worlds = self._consistent_worlds()
+        if len(worlds) < self.min_worlds and self._sampled_length < len(self._auction):
+            self._sample_worlds(deadline)
+            worlds = self._consistent_worlds()
+        if len(worlds) < self.min_worlds:
+            worlds = np.arange(len(self._targets))
+        worlds = worlds.tolist()
+
+        iterations = 0
+        while time.perf_counter() < deadline:
+            self._iterate(root, worlds[self.rng.randrange(len(worlds))])
+            iterations += 1
+        self.last_iterations = iterations
+        self.last_worlds = len(worlds)
+
+        if not root.children:
+            return super().make_bid(valid_bids)
+        best = max(root.children, key=lambda ordinal: root.children[ordinal].visits)
+        if best == 0:
+            return self._get_pass_bid(valid_bids)
+        return next(bid for bid in valid_bids if bid_ordinal(bid) == best)
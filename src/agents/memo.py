@@ -0,0 +1,150 @@
+"""Memoized decisions for deterministic agents.
+
+An agent whose class sets ``deterministic = True`` decides purely from its
+hand and the options it is given, so a decision seen before can be replayed
+instead of recomputed. ``memoize`` swaps caching wrappers into such an agent
+instance (the way ``RLAgent.record_plays`` does); other agents are returned
+untouched.
+
+Decisions are keyed on a 52-bit mask of the hand plus either the number of
+valid bids or the suit led, packed into one integer (non-negative for bids,
+negative for cards). Under the rules of ``Bidding.get_valid_bids``
+(pass, then every bid above the highest) and ``Trick.get_valid_cards``
+(follow suit if possible) these determine the options, and the options
+determine the decision. The cache stores the position of the chosen option,
+so the objects returned are always those of the current call.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Type
+
+from models.bid import Bid
+from models.card import Card, Suit, card_index
+from models.player import Player
+
+
+class DecisionCache:
+    """Bounded LRU mapping of decision keys to the chosen option's position."""
+
+    def __init__(self, capacity: int = 1_000_000):
+        """
+        Args:
+            capacity: Decisions kept; the least recently used are dropped
+        """
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: Hashable) -> Optional[int]:
+        choice = self._entries.get(key)
+        if choice is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return choice
+
+    def put(self, key: Hashable, choice: int) -> None:
+        self._entries[key] = choice
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self)} decisions, {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate)"
+        )
+
+
+# Cache shared by all memoized agents of a class
+_CACHES: Dict[Type[Player], DecisionCache] = {}
+
+
+def shared_cache(agent_class: Type[Player]) -> DecisionCache:
+    """The cache ``memoize`` uses by default for agents of a class."""
+    if agent_class not in _CACHES:
+        _CACHES[agent_class] = DecisionCache()
+    return _CACHES[agent_class]
+
+
+def _cards_mask(cards: List[Card]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_index(card)
+    return mask
+
+
+def memoize(player: Player, cache: Optional[DecisionCache] = None) -> Player:
+    """
+    Cache the decisions of a deterministic agent.
+
+    Args:
+        player: Agent to memoize in place
+        cache: Cache to use; by default one shared by all agents of the
+            player's class. Only share a cache between agents that decide alike.
+
+    Returns:
+        The same player
+    """
+    if not getattr(player, "deterministic", False):
+        return player
+    if cache is None:
+        cache = shared_cache(type(player))
+
+    cls = type(player)
+    hand_mask = _cards_mask(player.hand)
+
+    def reset():
+        nonlocal hand_mask
+        cls.reset(player)
+        hand_mask = 0
+
+    def receive_cards(cards: List[Card]):
+        nonlocal hand_mask
+        cls.receive_cards(player, cards)
+        hand_mask |= _cards_mask(cards)
+
+    def play_card(card: Card):
+        nonlocal hand_mask
+        hand_mask &= ~(1 << card_index(card))
+        return cls.play_card(player, card)
+
+    def make_bid(valid_bids: List[Bid]) -> Bid:
+        key = hand_mask | len(valid_bids) << 52
+        choice = cache.get(key)
+        if choice is not None:
+            return valid_bids[choice]
+        bid = cls.make_bid(player, valid_bids)
+        cache.put(key, valid_bids.index(bid))
+        return bid
+
+    def choose_card(valid_cards: List[Card], trick_suit: Optional[Suit] = None):
+        suit = 0 if trick_suit is None else trick_suit.index + 1
+        key = ~(hand_mask | suit << 52)
+        choice = cache.get(key)
+        if choice is not None:
+            return valid_cards[choice]
+        card = cls.choose_card(player, valid_cards, trick_suit)
+        cache.put(key, valid_cards.index(card))
+        return card
+
+    player.reset = reset
+    player.receive_cards = receive_cards
+    player.play_card = play_card
+    player.make_bid = make_bid
+    player.choose_card = choose_card
+    return player
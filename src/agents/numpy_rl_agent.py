@@ -0,0 +1,193 @@
+"""Inference-only Q-learning agent running trained networks in plain NumPy.
+
+Loads the ``.npz`` weights written by ``RLAgent.export_weights`` and makes the
+same decisions as ``RLAgent`` without importing torch.
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.player import Player
+from models.card import Card, Suit
+from models.bid import Bid
+from agents.rl_encoding import (
+    action_to_bid,
+    action_to_card,
+    bid_action_mask,
+    best_bid_actions,
+    card_action_mask,
+    encode_hand,
+    encode_trick_suit,
+    encode_valid_bids,
+)
+
+NUM_LAYERS = 3
+
+
+class NumpyQNetwork:
+    """Forward pass of a ``QNetwork`` (three linear layers with ReLU) in NumPy."""
+
+    def __init__(self, weights: Dict[str, np.ndarray], quantize: bool = False):
+        """
+        Args:
+            weights: ``QNetwork`` state dict as arrays (fc1.weight, fc1.bias, ...)
+            quantize: Round weights to int8 with a float32 scale per output
+                unit, to check decisions against an int8 deployment. The
+                rounded weights are kept as float32, since NumPy has no fast
+                integer matmul, so this saves neither memory nor time.
+        """
+        self.quantized = quantize
+        self.layers: List[Tuple[np.ndarray, np.ndarray]] = []
+        for i in range(1, NUM_LAYERS + 1):
+            weight = np.asarray(weights[f"fc{i}.weight"], dtype=np.float32).T
+            bias = np.asarray(weights[f"fc{i}.bias"], dtype=np.float32)
+            if quantize:
+                scale = np.abs(weight).max(axis=0) / 127.0
+                scale[scale == 0] = 1.0
+                weight = np.round(weight / scale).astype(np.int8) * scale
+            self.layers.append((np.ascontiguousarray(weight), bias))
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """
+        Compute Q-values.
+
+        Args:
+            x: (state_size,) state or (B, state_size) batch of states
+
+        Returns:
+            (action_size,) or (B, action_size) Q-values
+        """
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight
+            x += bias
+            if i < NUM_LAYERS - 1:
+                np.maximum(x, 0, out=x)
+        return x
+
+
+class NumpyRLAgent(Player):
+    """Plays with a trained ``RLAgent``'s networks, using NumPy only."""
+
+    def __init__(
+        self,
+        name: str,
+        weights_path: str,
+        epsilon: float = 0.0,
+        quantize: bool = False,
+    ) -> None:
+        """
+        Args:
+            name: Agent's name
+            weights_path: ``.npz`` file written by ``RLAgent.export_weights``
+            epsilon: Exploration rate for epsilon-greedy strategy
+            quantize: Run the networks with weights rounded to int8
+        """
+        super().__init__(name)
+        self.epsilon = epsilon
+        self.quantize = quantize
+
+        with np.load(weights_path) as data:
+            self.load_weights(dict(data))
+
+    def load_weights(self, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Replace the networks.
+
+        Args:
+            arrays: Weights keyed as in ``RLAgent.weight_arrays``, e.g. read
+                from a ``SharedStore``
+        """
+        self.bid_q_network = NumpyQNetwork(_subset(arrays, "bid"), self.quantize)
+        self.play_q_network = NumpyQNetwork(_subset(arrays, "play"), self.quantize)
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        """Make a bid using epsilon-greedy strategy."""
+        if random.random() < self.epsilon:
+            return random.choice(valid_bids)
+
+        state = np.concatenate([encode_hand(self.hand), encode_valid_bids(valid_bids)])
+        q_values = self.bid_q_network(state) + bid_action_mask(valid_bids)
+        return action_to_bid(int(best_bid_actions(q_values)), valid_bids)
+
+    def choose_card(
+        self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
+    ) -> Card:
+        """Choose a card using epsilon-greedy strategy."""
+        if random.random() < self.epsilon:
+            return random.choice(valid_cards)
+
+        state = np.concatenate([encode_hand(self.hand), encode_trick_suit(trick_suit)])
+        q_values = self.play_q_network(state) + card_action_mask(valid_cards)
+        return action_to_card(int(q_values.argmax()), valid_cards)
+
+    def make_bids(
+        self, hands: Sequence[Sequence[Card]], valid_bids: Sequence[List[Bid]]
+    ) -> List[Bid]:
+        """
+        Choose bids for many positions with one batched forward pass.
+
+        Args:
+            hands: Hand of each position
+            valid_bids: Valid bids of each position
+
+        Returns:
+            Chosen bid for each position
+        """
+        states = np.stack(
+            [
+                np.concatenate([encode_hand(hand), encode_valid_bids(bids)])
+                for hand, bids in zip(hands, valid_bids)
+            ]
+        )
+        masks = np.stack([bid_action_mask(bids) for bids in valid_bids])
+        actions = best_bid_actions(self.bid_q_network(states) + masks)
+        return [
+            (
+                random.choice(bids)
+                if random.random() < self.epsilon
+                else action_to_bid(int(action), bids)
+            )
+            for action, bids in zip(actions, valid_bids)
+        ]
+
+    def choose_cards(
+        self,
+        hands: Sequence[Sequence[Card]],
+        valid_cards: Sequence[List[Card]],
+        trick_suits: Sequence[Optional[Suit]],
+    ) -> List[Card]:
+        """
+        Choose cards for many positions with one batched forward pass.
+
+        Args:
+            hands: Hand of each position
+            valid_cards: Valid cards of each position
+            trick_suits: Suit led to each position's trick, None when leading
+
+        Returns:
+            Chosen card for each position
+        """
+        states = np.stack(
+            [
+                np.concatenate([encode_hand(hand), encode_trick_suit(suit)])
+                for hand, suit in zip(hands, trick_suits)
+            ]
+        )
+        masks = np.stack([card_action_mask(cards) for cards in valid_cards])
+        actions = (self.play_q_network(states) + masks).argmax(axis=1)
+        return [
+            (
+                random.choice(cards)
+                if random.random() < self.epsilon
+                else action_to_card(int(action), cards)
+            )
+            for action, cards in zip(actions, valid_cards)
+        ]
+
+
+def _subset(arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    """Arrays of one network, with the network prefix stripped from the keys."""
+    start = len(prefix) + 1
+    return {k[start:]: v for k, v in arrays.items() if k.startswith(prefix + ".")}
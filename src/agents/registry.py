@@ -0,0 +1,81 @@
+"""Registry of agent types, imported only when selected.
+
+Agent modules are referenced by import path so that picking a cheap agent
+never pays for the dependencies of an expensive one (``rl`` imports torch).
+"""
+
+from importlib import import_module
+from typing import Dict, List, Type
+
+from models.player import Player
+
+# Agent kind -> "module:ClassName"
+AGENTS: Dict[str, str] = {
+    "human": "agents.human_agent:HumanAgent",
+    "random": "agents.random_agent:RandomAgent",
+    "pass": "agents.pass_agent:PassAgent",
+    "heuristic": "agents.heuristic_agent:HeuristicAgent",
+    "heuristic-compiled": "agents.compiled_heuristic_agent:CompiledHeuristicAgent",
+    "rl": "agents.rl_agent:RLAgent",
+    "rl-numpy": "agents.numpy_rl_agent:NumpyRLAgent",
+    "mcts": "agents.mcts_bid_agent:MCTSBidAgent",
+}
+
+
+def register_agent(kind: str, path: str) -> None:
+    """
+    Register an agent type.
+
+    Args:
+        kind: Name used to select the agent
+        path: Import path of the agent class, as "module:ClassName"
+    """
+    AGENTS[kind] = path
+
+
+def available_agents() -> List[str]:
+    """Names of all registered agent types."""
+    return list(AGENTS)
+
+
+def get_agent_class(kind: str) -> Type[Player]:
+    """
+    Import and return the class of an agent type.
+
+    Args:
+        kind: Registered agent name
+
+    Returns:
+        The agent class
+
+    Raises:
+        ValueError: If no agent is registered under that name
+    """
+    if kind not in AGENTS:
+        raise ValueError(
+            f"Unknown agent '{kind}', available: {', '.join(available_agents())}"
+        )
+    module_name, class_name = AGENTS[kind].split(":")
+    return getattr(import_module(module_name), class_name)
+
+
+def create_agent(kind: str, name: str, memoized: bool = False, **kwargs) -> Player:
+    """
+    Create an agent of the given type.
+
+    Args:
+        kind: Registered agent name
+        name: Player name
+        memoized: Cache the agent's decisions with ``agents.memo`` if the
+            agent is deterministic
+        **kwargs: Extra arguments for the agent constructor
+
+    Returns:
+        The new agent
+    """
+    agent = get_agent_class(kind)(name, **kwargs)
+    if memoized:
+        from agents.memo import memoize
+
+        agent = memoize(agent)
+    return agent
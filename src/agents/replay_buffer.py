@@ -0,0 +1,91 @@
+"""Fixed-size buffer of (state, action, reward, next state, done) transitions.
+
+Transitions are stored in preallocated NumPy arrays, overwriting the oldest
+once the buffer is full, and sampled as whole minibatches for vectorized
+Q-network updates. Kept free of torch like ``rl_encoding``.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+Batch = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class ReplayBuffer:
+    """Ring buffer of transitions for one Q-network."""
+
+    def __init__(self, state_size: int, capacity: int = 100_000):
+        """
+        Args:
+            state_size: Length of the encoded states
+            capacity: Maximum number of transitions kept
+        """
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        state: np.ndarray,
+        action: int,
+        reward: float,
+        next_state: Optional[np.ndarray],
+        done: bool,
+    ) -> None:
+        """
+        Store one transition.
+
+        Args:
+            state: Encoded state the action was chosen in
+            action: Action index
+            reward: Reward received for the action
+            next_state: State of the next decision, None if done
+            done: Whether the episode ended after the action
+        """
+        i = self._next
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        if next_state is None:
+            self.next_states[i] = 0
+        else:
+            self.next_states[i] = next_state
+        self.dones[i] = done
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def sample(
+        self, batch_size: int, rng: Optional[np.random.Generator] = None
+    ) -> Batch:
+        """
+        Draw a minibatch uniformly, without replacement.
+
+        Args:
+            batch_size: Number of transitions, capped at the buffer size
+            rng: Random generator
+
+        Returns:
+            States, actions, rewards, next states and done flags
+        """
+        rng = rng or np.random.default_rng()
+        rows = rng.choice(self._size, size=min(batch_size, self._size), replace=False)
+        return (
+            self.states[rows],
+            self.actions[rows],
+            self.rewards[rows],
+            self.next_states[rows],
+            self.dones[rows],
+        )
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
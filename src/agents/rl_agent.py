@@ -7,10 +7,24 @@ from dataclasses import dataclass
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from typing import List, Optional, Final, ClassVar
+from typing import Dict, List, Optional, Final, ClassVar, Tuple
+import numpy as np
 from models.player import Player
-from models.card import Card, Suit, SUIT_INDEX, RANK_INDEX
+from models.card import Card, Suit, RANK_INDEX
 from models.bid import Bid
+from agents.rl_encoding import (
+    BID_STATE_SIZE,
+    CARD_STATE_SIZE,
+    TRICK_STATE_SIZE,
+    action_to_bid,
+    action_to_card,
+    bid_action_mask,
+    best_bid_actions,
+    card_action_mask,
+    encode_hand,
+    encode_trick_suit,
+    encode_valid_bids,
+)
 
 # Type aliases
 State = torch.Tensor
@@ -78,9 +92,9 @@ class RLAgent(Player):
         self.epsilon_decay_factor = epsilon_decay_factor
 
         # State dimensions
-        self.card_state_size: Final[int] = 52  # One-hot encoding of cards
-        self.bid_state_size: Final[int] = 35  # Possible bids
-        self.trick_state_size: Final[int] = 4  # One-hot encoding of trick suit
+        self.card_state_size: Final[int] = CARD_STATE_SIZE
+        self.bid_state_size: Final[int] = BID_STATE_SIZE
+        self.trick_state_size: Final[int] = TRICK_STATE_SIZE
 
         # Initialize networks
         self.bid_q_network = QNetwork(
@@ -102,17 +116,16 @@ class RLAgent(Player):
 
         self.criterion = nn.MSELoss()
 
+        # (state, action) of the last card chosen, see record_plays
+        self.last_play: Optional[Tuple[np.ndarray, Action]] = None
+
     def _encode_hand(self) -> torch.Tensor:
         """Encode the player's hand as a binary vector.
 
         Returns:
             One-hot encoded tensor representing the cards in hand
         """
-        encoding = torch.zeros(self.card_state_size, dtype=torch.float32)
-        for card in self.hand:
-            idx = 13 * SUIT_INDEX[card.suit] + RANK_INDEX[card.rank]
-            encoding[idx] = 1.0
-        return encoding
+        return torch.from_numpy(encode_hand(self.hand))
 
     def _encode_trick_suit(self, trick_suit: Optional[Suit]) -> torch.Tensor:
         """Encode the trick suit as a one-hot vector.
@@ -123,10 +136,7 @@ class RLAgent(Player):
         Returns:
             One-hot encoded tensor representing the trick suit
         """
-        encoding = torch.zeros(self.trick_state_size, dtype=torch.float32)
-        if trick_suit and trick_suit != Suit.NO_TRUMP:
-            encoding[SUIT_INDEX[trick_suit]] = 1.0
-        return encoding
+        return torch.from_numpy(encode_trick_suit(trick_suit))
 
     def _encode_valid_bids(self, valid_bids: List[Bid]) -> torch.Tensor:
         """Encode valid bids as a binary vector.
@@ -137,12 +147,7 @@ class RLAgent(Player):
         Returns:
             Binary tensor representing valid bids
         """
-        encoding = torch.zeros(self.bid_state_size, dtype=torch.float32)
-        for bid in valid_bids:
-            if not bid.is_pass:
-                idx = 5 * (bid.number - 1) + bid.suit.index
-                encoding[idx] = 1.0
-        return encoding
+        return torch.from_numpy(encode_valid_bids(valid_bids))
 
     def make_bid(self, valid_bids: List[Bid]) -> Bid:
         """Make a bid using epsilon-greedy strategy.
@@ -162,37 +167,11 @@ class RLAgent(Player):
             q_values = self.bid_q_network(state)
 
         # Mask invalid actions
-        valid_mask = torch.full_like(q_values, float("-inf"))
-        valid_mask[0] = 0  # Pass is always valid
-
-        for bid in valid_bids:
-            if not bid.is_pass:
-                idx = bid.number + SUIT_INDEX[bid.suit]
-                valid_mask[idx] = 0
-
-        action_idx = (q_values + valid_mask).argmax().item()
+        valid_mask = torch.from_numpy(bid_action_mask(valid_bids))
+        action_idx = int(best_bid_actions((q_values + valid_mask).numpy()))
 
         # Convert action index to bid
-        if action_idx == 0:
-            pass_bids = [bid for bid in valid_bids if bid.is_pass]
-            if not pass_bids:
-                # If no pass bid available, choose a random valid bid
-                return random.choice(valid_bids)
-            return pass_bids[0]
-        else:
-            target_number = action_idx // 5
-            target_suit = list(SUIT_INDEX.keys())[action_idx % 5]
-            matching_bids = [
-                bid
-                for bid in valid_bids
-                if not bid.is_pass
-                and bid.number == target_number
-                and bid.suit == target_suit
-            ]
-            if not matching_bids:
-                # If no matching bid available, choose a random valid bid
-                return random.choice(valid_bids)
-            return matching_bids[0]
+        return action_to_bid(action_idx, valid_bids)
 
     def choose_card(
         self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
@@ -215,14 +194,93 @@ class RLAgent(Player):
             q_values = self.play_q_network(state)
 
         # Create valid actions mask
-        valid_mask = torch.full((len(RANK_INDEX),), float("-inf"))
-        for card in valid_cards:
-            valid_mask[RANK_INDEX[card.rank]] = 0
-
+        valid_mask = torch.from_numpy(card_action_mask(valid_cards))
         action_idx = (q_values + valid_mask).argmax().item()
-        selected_rank = list(RANK_INDEX.keys())[action_idx]
 
-        return next(card for card in valid_cards if card.rank == selected_rank)
+        return action_to_card(action_idx, valid_cards)
+
+    def reset(self) -> None:
+        super().reset()
+        self.last_play = None
+
+    def record_plays(self, enabled: bool = True) -> None:
+        """Start or stop recording the state and action of each card played.
+
+        While recording, every ``choose_card`` call stores
+        ``(state, action)`` in ``last_play`` for the trainer to turn into a
+        transition once the trick is complete. Recording swaps in a wrapper
+        method on this instance, so ``choose_card`` costs nothing extra when
+        it is off.
+
+        Args:
+            enabled: Whether to record
+        """
+        self.last_play = None
+        if enabled:
+            self.choose_card = self._choose_card_recording
+        else:
+            self.__dict__.pop("choose_card", None)
+
+    def _choose_card_recording(
+        self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
+    ) -> Card:
+        card = RLAgent.choose_card(self, valid_cards, trick_suit)
+        state = np.concatenate([encode_hand(self.hand), encode_trick_suit(trick_suit)])
+        self.last_play = (state, RANK_INDEX[card.rank])
+        return card
+
+    def weight_arrays(self) -> Dict[str, np.ndarray]:
+        """Bid and play network weights as arrays keyed "bid.fc1.weight", ...
+
+        Returns:
+            Copies of the weights
+        """
+        arrays = {}
+        for prefix, network in (
+            ("bid", self.bid_q_network),
+            ("play", self.play_q_network),
+        ):
+            for key, tensor in network.state_dict().items():
+                arrays[f"{prefix}.{key}"] = tensor.detach().cpu().numpy().copy()
+        return arrays
+
+    def load_weight_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Load weights in the layout of ``weight_arrays``.
+
+        Args:
+            arrays: Weights of one or both networks
+        """
+        for prefix, network in (
+            ("bid", self.bid_q_network),
+            ("play", self.play_q_network),
+        ):
+            start = len(prefix) + 1
+            state = {
+                key[start:]: torch.from_numpy(np.asarray(value))
+                for key, value in arrays.items()
+                if key.startswith(prefix + ".")
+            }
+            if state:
+                network.load_state_dict(state)
+
+    def load_weights(self, path: str) -> None:
+        """Load weights from a ``.npz`` file written by ``export_weights``.
+
+        Args:
+            path: Weights file, e.g. from ``pretrain_bid_network.py``
+        """
+        with np.load(path) as data:
+            self.load_weight_arrays(dict(data))
+
+    def export_weights(self, path: str) -> None:
+        """Write the bid and play network weights to a flat ``.npz`` file.
+
+        The file can be loaded without torch by ``NumpyRLAgent``.
+
+        Args:
+            path: Destination file
+        """
+        np.savez(path, **self.weight_arrays())
 
     def update_q_network(
         self,
@@ -265,3 +323,46 @@ class RLAgent(Player):
         optimizer.zero_grad()
         loss.backward()
         optimizer.step()
+
+    def update_q_network_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        is_bidding: bool,
+    ) -> float:
+        """Update the appropriate Q-network on a minibatch of transitions.
+
+        Args:
+            states: (B, state_size) states
+            actions: (B,) chosen actions
+            rewards: (B,) received rewards
+            next_states: (B, state_size) next states
+            dones: (B,) whether each episode ended
+            is_bidding: Whether updating bid network or play network
+
+        Returns:
+            The minibatch loss
+        """
+        self.epsilon *= self.epsilon_decay_factor
+        network = self.bid_q_network if is_bidding else self.play_q_network
+        optimizer = self.bid_optimizer if is_bidding else self.play_optimizer
+
+        states = torch.as_tensor(states, dtype=torch.float32)
+        next_states = torch.as_tensor(next_states, dtype=torch.float32)
+        rewards = torch.as_tensor(rewards, dtype=torch.float32)
+        actions = torch.as_tensor(actions, dtype=torch.int64)
+        not_done = ~torch.as_tensor(dones, dtype=torch.bool)
+
+        current_q = network(states).gather(1, actions[:, None])[:, 0]
+        with torch.no_grad():
+            next_q = network(next_states).max(dim=1).values
+            target_q = rewards + QNetworkConfig.gamma * next_q * not_done
+
+        loss = self.criterion(current_q, target_q)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        return loss.item()
@@ -0,0 +1,114 @@
+"""State encodings and action masks shared by the Q-learning agents.
+
+Kept free of torch so that inference-only agents can use them.
+"""
+
+import random
+from typing import Final, List, Optional, Sequence
+
+import numpy as np
+
+from models.bid import Bid
+from models.card import Card, Suit, SUIT_INDEX, RANK_INDEX
+
+CARD_STATE_SIZE: Final[int] = 52  # One-hot encoding of cards
+BID_STATE_SIZE: Final[int] = 35  # Possible bids
+TRICK_STATE_SIZE: Final[int] = 4  # One-hot encoding of trick suit
+NUM_CARD_ACTIONS: Final[int] = len(RANK_INDEX)
+PASS_ACTION: Final[int] = -1  # Bid action index standing for pass
+PASS_Q: Final[float] = 0.0  # Q-value of passing
+
+_SUITS: Final[List[Suit]] = list(SUIT_INDEX.keys())
+_RANKS: Final = list(RANK_INDEX.keys())
+
+
+def encode_hand(hand: Sequence[Card]) -> np.ndarray:
+    """One-hot encoding of the cards in a hand."""
+    encoding = np.zeros(CARD_STATE_SIZE, dtype=np.float32)
+    for card in hand:
+        encoding[13 * SUIT_INDEX[card.suit] + RANK_INDEX[card.rank]] = 1.0
+    return encoding
+
+
+def encode_trick_suit(trick_suit: Optional[Suit]) -> np.ndarray:
+    """One-hot encoding of the suit led to the trick, all zeros when leading."""
+    encoding = np.zeros(TRICK_STATE_SIZE, dtype=np.float32)
+    if trick_suit and trick_suit != Suit.NO_TRUMP:
+        encoding[SUIT_INDEX[trick_suit]] = 1.0
+    return encoding
+
+
+def encode_valid_bids(valid_bids: Sequence[Bid]) -> np.ndarray:
+    """Binary encoding of the valid (non-pass) bids."""
+    encoding = np.zeros(BID_STATE_SIZE, dtype=np.float32)
+    for bid in valid_bids:
+        if not bid.is_pass:
+            encoding[5 * (bid.number - 1) + bid.suit.index] = 1.0
+    return encoding
+
+
+def bid_action_mask(valid_bids: Sequence[Bid]) -> np.ndarray:
+    """Additive mask over contract actions: 0 for valid bids, -inf otherwise.
+
+    Contract bids are actions ``5 * (number - 1) + suit index``. Pass has no
+    action of its own, see ``best_bid_actions``.
+    """
+    mask = np.full(BID_STATE_SIZE, -np.inf, dtype=np.float32)
+    for bid in valid_bids:
+        if not bid.is_pass:
+            mask[5 * (bid.number - 1) + SUIT_INDEX[bid.suit]] = 0
+    return mask
+
+
+def best_bid_actions(masked_q_values: np.ndarray) -> np.ndarray:
+    """
+    Greedy bid actions from masked Q-values.
+
+    Passing is worth ``PASS_Q``, so the agent passes unless some valid bid
+    has a higher Q-value.
+
+    Args:
+        masked_q_values: (..., 35) Q-values plus ``bid_action_mask``
+
+    Returns:
+        (...) action indices, ``PASS_ACTION`` for pass
+    """
+    actions = masked_q_values.argmax(axis=-1)
+    best = np.take_along_axis(masked_q_values, actions[..., None], axis=-1)[..., 0]
+    return np.where(best > PASS_Q, actions, PASS_ACTION)
+
+
+def action_to_bid(action_idx: int, valid_bids: Sequence[Bid]) -> Bid:
+    """Convert a bid action index back into one of the valid bids."""
+    if action_idx == PASS_ACTION:
+        pass_bids = [bid for bid in valid_bids if bid.is_pass]
+        if not pass_bids:
+            # If no pass bid available, choose a random valid bid
+            return random.choice(valid_bids)
+        return pass_bids[0]
+
+    target_number = action_idx // 5 + 1
+    target_suit = _SUITS[action_idx % 5]
+    matching_bids = [
+        bid
+        for bid in valid_bids
+        if not bid.is_pass and bid.number == target_number and bid.suit == target_suit
+    ]
+    if not matching_bids:
+        # If no matching bid available, choose a random valid bid
+        return random.choice(valid_bids)
+    return matching_bids[0]
+
+
+def card_action_mask(valid_cards: Sequence[Card]) -> np.ndarray:
+    """Additive mask over card (rank) actions: 0 for valid ranks, -inf otherwise."""
+    mask = np.full(NUM_CARD_ACTIONS, -np.inf, dtype=np.float32)
+    for card in valid_cards:
+        mask[RANK_INDEX[card.rank]] = 0
+    return mask
+
+
+def action_to_card(action_idx: int, valid_cards: Sequence[Card]) -> Card:
+    """Convert a card action index back into one of the valid cards."""
+    selected_rank = _RANKS[action_idx]
+    return next(card for card in valid_cards if card.rank == selected_rank)
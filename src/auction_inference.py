@@ -0,0 +1,235 @@
+"""Hand constraints implied by an auction.
+
+Given the bids made so far and the bidding rules the players follow, every
+seat's bids narrow down its hand. ``AuctionInference`` turns an auction into
+one ``HandConstraint`` per seat, which ``dealer.Dealer`` can sample from
+directly instead of dealing the hidden hands uniformly.
+
+Results are stored in a trie keyed by bid ordinal, so a prefix is only
+worked out once and looking up an auction a search has seen before is a walk
+down the trie. Seats are counted from the dealer: seat k of the result made
+bids k, k + 4, ... of the auction.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Type, Union
+
+from agents.heuristic_agent import HeuristicAgent
+from dealer import NUM_SEATS, Dealer, HandConstraint
+from models.bid import Bid, bid_ordinal
+from models.card import Card
+
+# Ordinal of 7NT, the highest bid
+MAX_ORDINAL = 35
+NO_TRUMP = 4
+
+_UNCONSTRAINED = HandConstraint()
+
+
+def intersect(a: HandConstraint, b: HandConstraint) -> Optional[HandConstraint]:
+    """
+    Constraint satisfied by the hands satisfying both, None if there are none.
+
+    Only checks the ranges for emptiness, not whether a hand exists.
+    """
+    hcp = (max(a.hcp[0], b.hcp[0]), min(a.hcp[1], b.hcp[1]))
+    points = (max(a.points[0], b.points[0]), min(a.points[1], b.points[1]))
+    if hcp[0] > hcp[1] or points[0] > points[1]:
+        return None
+
+    suit_lengths = dict(a.suit_lengths)
+    for suit, (low, high) in b.suit_lengths.items():
+        if suit in suit_lengths:
+            low = max(low, suit_lengths[suit][0])
+            high = min(high, suit_lengths[suit][1])
+            if low > high:
+                return None
+        suit_lengths[suit] = (low, high)
+
+    balanced = a.balanced
+    if b.balanced is not None:
+        if balanced is not None and balanced != b.balanced:
+            return None
+        balanced = b.balanced
+    return HandConstraint(hcp, points, suit_lengths, balanced)
+
+
+class BidRules(ABC):
+    """What a bid says about the bidder's hand under some agent's bidding rules."""
+
+    @abstractmethod
+    def constraint(self, ordinal: int, highest: int) -> Optional[HandConstraint]:
+        """
+        Constraint on the hand of a player making a bid.
+
+        Args:
+            ordinal: Bid ordinal made, 0 for pass
+            highest: Highest bid ordinal before it, 0 if none
+
+        Returns:
+            The constraint, None if the bid says nothing
+        """
+        pass
+
+
+class HeuristicBidRules(BidRules):
+    """
+    Inference for ``HeuristicAgent``.
+
+    The agent aims for a target bid whose level comes from its total points
+    and whose strain is no trump for balanced hands with enough high card
+    points, and otherwise bids the cheapest valid bid at or above the target.
+    So a pass shows fewer points than an opening, a jump shows the target
+    exactly and a cheapest bid caps the target's level.
+    """
+
+    def __init__(self, agent_class: Type[HeuristicAgent] = HeuristicAgent):
+        """
+        Args:
+            agent_class: ``HeuristicAgent`` or a subclass with other thresholds
+        """
+        self.open = agent_class.MIN_POINTS_TO_OPEN
+        self.nt = agent_class.MIN_POINTS_FOR_NT
+        # Total points range of each target level
+        self.levels = {
+            1: (agent_class.MIN_POINTS_TO_OPEN, agent_class.MIN_POINTS_FOR_TWO_BID - 1),
+            2: (
+                agent_class.MIN_POINTS_FOR_TWO_BID,
+                agent_class.MIN_POINTS_FOR_THREE_BID - 1,
+            ),
+            3: (agent_class.MIN_POINTS_FOR_THREE_BID, _UNCONSTRAINED.points[1]),
+        }
+
+    def constraint(self, ordinal: int, highest: int) -> Optional[HandConstraint]:
+        if highest >= MAX_ORDINAL:
+            # Nothing but pass was possible
+            return None
+        max_hcp = _UNCONSTRAINED.hcp[1]
+        if ordinal == 0:
+            return HandConstraint(hcp=(0, self.open - 1), points=(0, self.open - 1))
+
+        level = (ordinal - 1) // 5 + 1
+        if ordinal > highest + 1:
+            # A jump is the target itself
+            if level not in self.levels:
+                return None
+            low, high = self.levels[level]
+            if (ordinal - 1) % 5 == NO_TRUMP:
+                return HandConstraint(
+                    hcp=(self.nt, min(high, max_hcp)),
+                    points=(max(low, self.nt), high),
+                    balanced=True,
+                )
+            return HandConstraint(hcp=(0, min(high, max_hcp)), points=(low, high))
+
+        # The cheapest bid: the target is at most this bid
+        high = self.levels[min(level, 3)][1]
+        return HandConstraint(hcp=(0, min(high, max_hcp)), points=(self.open, high))
+
+
+class _TrieNode:
+    __slots__ = ("constraints", "highest", "children")
+
+    def __init__(self, constraints: List[HandConstraint], highest: int):
+        self.constraints = constraints
+        self.highest = highest
+        self.children: Dict[int, _TrieNode] = {}
+
+
+class AuctionInference:
+    """Per-seat hand constraints of auctions, memoized by auction prefix."""
+
+    def __init__(self, rules: Optional[BidRules] = None):
+        """
+        Args:
+            rules: Bidding rules every seat is assumed to follow,
+                ``HeuristicBidRules`` by default
+        """
+        self.rules = rules or HeuristicBidRules()
+        self._root = _TrieNode([_UNCONSTRAINED] * NUM_SEATS, 0)
+        # Trie nodes reused and created by lookups
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of auction prefixes stored."""
+        count = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children.values())
+        return count
+
+    def _child(self, node: _TrieNode, seat: int, ordinal: int) -> _TrieNode:
+        child = node.children.get(ordinal)
+        if child is not None:
+            self.hits += 1
+            return child
+        self.misses += 1
+
+        constraints = node.constraints
+        shown = self.rules.constraint(ordinal, node.highest)
+        if shown is not None:
+            combined = intersect(constraints[seat], shown)
+            # A bid contradicting earlier ones means the seat is not following
+            # the rules, so it is ignored
+            if combined is not None:
+                constraints = list(constraints)
+                constraints[seat] = combined
+        child = _TrieNode(constraints, max(node.highest, ordinal))
+        node.children[ordinal] = child
+        return child
+
+    def infer(self, auction: Sequence[Union[Bid, int]]) -> List[HandConstraint]:
+        """
+        Constraints on every seat's hand after an auction.
+
+        Args:
+            auction: Bids from the dealer on, as ``Bid`` objects (e.g.
+                ``Game.auction``) or bid ordinals
+
+        Returns:
+            One constraint per seat, counted from the dealer. The list and the
+            constraints are shared with the cache and must not be modified.
+        """
+        node = self._root
+        for k, bid in enumerate(auction):
+            ordinal = bid if isinstance(bid, int) else bid_ordinal(bid)
+            node = self._child(node, k % NUM_SEATS, ordinal)
+        return node.constraints
+
+    def seat_constraints(
+        self, auction: Sequence[Union[Bid, int]], dealer_index: int
+    ) -> List[HandConstraint]:
+        """Constraints of ``infer`` by seat in ``Game.players`` order."""
+        constraints = self.infer(auction)
+        return [
+            constraints[(seat - dealer_index) % NUM_SEATS] for seat in range(NUM_SEATS)
+        ]
+
+    def dealer(
+        self,
+        auction: Sequence[Union[Bid, int]],
+        dealer_index: int = 0,
+        predealt: Optional[Dict[int, List[Card]]] = None,
+        **kwargs,
+    ) -> Dealer:
+        """
+        Dealer of the deals consistent with an auction.
+
+        Args:
+            auction: Bids from the dealer on
+            dealer_index: Seat of the dealer in ``Game.players`` order
+            predealt: Known hands keyed by seat; their constraints are dropped
+            **kwargs: Extra ``Dealer`` arguments, e.g. seed
+
+        Returns:
+            The dealer
+        """
+        constraints: List[Optional[HandConstraint]] = list(
+            self.seat_constraints(auction, dealer_index)
+        )
+        for seat in predealt or {}:
+            constraints[seat] = None
+        return Dealer(constraints, predealt=predealt, **kwargs)
@@ -0,0 +1,161 @@
+"""``HeuristicAgent``'s bidding compiled into lookup tables.
+
+The agent's bid only depends on its high card points, its shape (which fixes
+distribution points and balance), its best suit and the highest bid so far.
+The rules are run once for every combination and stored in two arrays:
+
+* ``targets[hcp, shape, best_suit]``: the bid ordinal the hand aims for,
+  0 to always pass. ``shape`` indexes ``dealer.SHAPES``.
+* ``responses[target, highest]``: the bid ordinal made with that target when
+  the highest bid ordinal is ``highest``.
+
+A hand's target is fixed for the whole auction, so bidding costs one lookup
+in ``responses``, and both tables can be indexed with arrays over many deals.
+Compiling takes a fraction of a second and is done on first use.
+
+Usage:
+    python bid_table.py [--deals N]     (checks the tables against the agent)
+"""
+
+import argparse
+import sys
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+
+from agents.heuristic_agent import HandEvaluation, HeuristicAgent
+from dealer import SHAPES, Dealer, array_to_hands, shape_ids
+from hand_features import extract_features
+from models.bid import Bid, bid_ordinal, ordinal_to_bid
+from models.card import Suit
+
+MAX_HCP = 37
+# Ordinal of 7NT, the highest bid
+MAX_ORDINAL = 35
+
+# Index into SHAPES of every shape, as (clubs, diamonds, hearts, spades) lengths
+SHAPE_INDEX: Dict[Tuple[int, ...], int] = {
+    tuple(int(n) for n in shape): i for i, shape in enumerate(SHAPES)
+}
+
+
+class BidTables(NamedTuple):
+    targets: np.ndarray
+    responses: np.ndarray
+
+
+def _valid_bids(highest: int):
+    return [Bid(0), *(ordinal_to_bid(o) for o in range(highest + 1, MAX_ORDINAL + 1))]
+
+
+@lru_cache(maxsize=None)
+def compile_tables(agent_class: Type[HeuristicAgent] = HeuristicAgent) -> BidTables:
+    """
+    Run an agent's bidding rules for every table entry.
+
+    Args:
+        agent_class: ``HeuristicAgent`` or a subclass with other thresholds
+
+    Returns:
+        The (38, len(SHAPES), 4) targets and (36, 36) responses, read-only
+    """
+    agent = agent_class("compiler")
+
+    targets = np.zeros((MAX_HCP + 1, len(SHAPES), 4), dtype=np.int8)
+    for shape, lengths in enumerate(SHAPES):
+        suit_counts = {suit: int(lengths[suit.index]) for suit in agent.SUITS}
+        distribution = agent._calculate_distribution_points(suit_counts)
+        for hcp in range(MAX_HCP + 1):
+            hand_eval = HandEvaluation(hcp, distribution, suit_counts)
+            for suit in agent.SUITS:
+                desired = agent._desired_bid(hand_eval, suit)
+                if desired is not None:
+                    targets[hcp, shape, suit.index] = bid_ordinal(desired)
+
+    responses = np.zeros((MAX_ORDINAL + 1, MAX_ORDINAL + 1), dtype=np.int8)
+    for highest in range(MAX_ORDINAL + 1):
+        valid_bids = _valid_bids(highest)
+        for target in range(1, MAX_ORDINAL + 1):
+            bid = agent._select_bid(ordinal_to_bid(target), valid_bids)
+            responses[target, highest] = bid_ordinal(bid)
+
+    targets.setflags(write=False)
+    responses.setflags(write=False)
+    return BidTables(targets, responses)
+
+
+def hand_target(hand_eval: HandEvaluation, best_suit: Suit, tables: BidTables) -> int:
+    """Target bid ordinal of one evaluated hand."""
+    shape = SHAPE_INDEX[
+        tuple(hand_eval.suit_counts[suit] for suit in HeuristicAgent.SUITS)
+    ]
+    return int(tables.targets[hand_eval.high_card_points, shape, best_suit.index])
+
+
+def deal_targets(deals: np.ndarray, tables: Optional[BidTables] = None) -> np.ndarray:
+    """
+    Target bid ordinal of every hand of a batch of deals.
+
+    Args:
+        deals: (N, 4, 52) boolean deals
+        tables: Compiled tables, ``HeuristicAgent``'s by default
+
+    Returns:
+        (N, 4) target bid ordinals, 0 for hands that always pass
+    """
+    tables = tables or compile_tables()
+    features = extract_features(deals)
+    return tables.targets[
+        features.hcp,
+        shape_ids(features.suit_lengths),
+        features.suit_quality.argmax(axis=-1),
+    ]
+
+
+def check_tables(
+    num_deals: int = 1000,
+    seed: int = 0,
+    agent_class: Type[HeuristicAgent] = HeuristicAgent,
+) -> int:
+    """
+    Compare the compiled tables with the agent on random deals.
+
+    Every hand of every deal bids over every possible highest bid, once
+    through the agent and once through the tables.
+
+    Returns:
+        Number of mismatching bids
+    """
+    tables = compile_tables(agent_class)
+    deals = Dealer(seed=seed).generate(num_deals)
+    targets = deal_targets(deals, tables)
+    valid = [_valid_bids(highest) for highest in range(MAX_ORDINAL + 1)]
+
+    mismatches = 0
+    for deal, deal_target in zip(deals, targets):
+        for seat, hand in enumerate(array_to_hands(deal)):
+            agent = agent_class("check")
+            agent.receive_cards(hand)
+            target = hand_target(agent.evaluate_hand(), agent._find_best_suit(), tables)
+            mismatches += target != deal_target[seat]
+            for highest in range(MAX_ORDINAL + 1):
+                expected = bid_ordinal(agent.make_bid(valid[highest]))
+                mismatches += expected != tables.responses[target, highest]
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mismatches = check_tables(args.deals, args.seed)
+    checked = args.deals * 4 * (MAX_ORDINAL + 1)
+    print(f"{mismatches} mismatches in {checked} bids")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
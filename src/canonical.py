@@ -0,0 +1,221 @@
+"""Canonical forms of deals for caches and deduplication.
+
+Double dummy results do not change when the seats are rotated or the suits
+are relabelled, as long as the results are mapped through the same
+transform. ``canonicalize`` picks one representative per equivalence class
+and returns it as a key together with the ``DealTransform`` that maps results
+computed on the canonical deal back to the original.
+
+Deals are handled as owner arrays: the seat holding each card, by card index
+(the ``GameRecord.deal`` layout). The canonical key is itself such an array.
+
+``small_cards`` optionally treats the lowest ranks of each suit as
+interchangeable. This is an approximation: it merges deals that only differ
+in which seat holds which spot cards, which rarely but sometimes changes the
+double dummy result.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models.card import Card, Suit, RANK_INDEX, card_index
+from models.player import Player
+
+NO_TRUMP_INDEX = 4
+
+# bytes.translate tables rotating seat labels: seat -> (seat - r) % 4
+_ROTATIONS = [bytes((i - r) % 4 for i in range(256)) for r in range(4)]
+
+_PBN_RANKS = {rank.value: RANK_INDEX[rank] for rank in RANK_INDEX}
+
+DealLike = Union[bytes, np.ndarray, Sequence[Sequence[Card]], Sequence[Player], "Deal"]
+
+
+@dataclass(frozen=True)
+class DealTransform:
+    """Maps a deal to its canonical form.
+
+    Seat ``s`` of the original deal is seat ``(s - rotation) % 4`` of the
+    canonical deal, and suit index ``s`` becomes ``suit_map[s]``.
+    """
+
+    rotation: int
+    suit_map: Tuple[int, int, int, int]
+
+    def to_canonical_seat(self, seat: int) -> int:
+        return (seat - self.rotation) % 4
+
+    def to_original_seat(self, seat: int) -> int:
+        return (seat + self.rotation) % 4
+
+    def to_canonical_strain(self, strain: int) -> int:
+        """Map a strain index (suit index, or 4 for no trump)."""
+        return strain if strain == NO_TRUMP_INDEX else self.suit_map[strain]
+
+    def to_original_strain(self, strain: int) -> int:
+        if strain == NO_TRUMP_INDEX:
+            return strain
+        return self.suit_map.index(strain)
+
+    def dd_table_to_original(self, table: np.ndarray) -> np.ndarray:
+        """
+        Map a double dummy table of the canonical deal back to the original.
+
+        Args:
+            table: (5, 4) tricks by strain index and seat
+
+        Returns:
+            (5, 4) tricks of the original deal
+        """
+        table = np.asarray(table)
+        strains = [self.to_canonical_strain(strain) for strain in range(5)]
+        seats = [self.to_canonical_seat(seat) for seat in range(4)]
+        return table[np.ix_(strains, seats)]
+
+
+def to_owners(deal: DealLike) -> bytes:
+    """
+    Convert a deal to an owner array.
+
+    Args:
+        deal: Owner bytes, a (4, 52) boolean array, 4 card lists or players
+            in seat order, or an endplay ``Deal`` (North is seat 0)
+
+    Returns:
+        52 bytes holding the seat of each card
+    """
+    if isinstance(deal, (bytes, bytearray)):
+        return bytes(deal)
+    if isinstance(deal, np.ndarray):
+        return bytes(deal.argmax(axis=0).astype(np.uint8))
+    if hasattr(deal, "to_pbn"):
+        return pbn_to_owners(deal.to_pbn())
+    owners = bytearray(52)
+    for seat, cards in enumerate(deal):
+        for card in getattr(cards, "hand", cards):
+            owners[card_index(card)] = seat
+    return bytes(owners)
+
+
+def pbn_to_owners(pbn: str) -> bytes:
+    """Convert a PBN deal string ("N:spades.hearts.diamonds.clubs ...") to owners."""
+    first, _, hands = pbn.partition(":")
+    start = "NESW".index(first.strip().upper())
+    owners = bytearray(52)
+    for offset, hand in enumerate(hands.split()):
+        seat = (start + offset) % 4
+        for suit, holding in zip((3, 2, 1, 0), hand.split(".")):
+            for rank in holding:
+                owners[13 * suit + _PBN_RANKS[rank.upper()]] = seat
+    return bytes(owners)
+
+
+def _suit_order(blocks: List[bytes], strain: Optional[int]) -> List[int]:
+    """Old suit indices in canonical order, the trump suit (if any) last."""
+    if strain is None or strain == NO_TRUMP_INDEX:
+        return sorted(range(4), key=blocks.__getitem__)
+    others = sorted((s for s in range(4) if s != strain), key=blocks.__getitem__)
+    return others + [strain]
+
+
+def canonicalize(
+    deal: DealLike,
+    strain: Optional[Union[Suit, int]] = None,
+    small_cards: int = 0,
+) -> Tuple[bytes, DealTransform]:
+    """
+    Canonical form of a deal.
+
+    Args:
+        deal: The deal, see ``to_owners``
+        strain: Only keep results for this strain exact; the trump suit is
+            then kept apart from the other suits. None for all strains.
+        small_cards: Number of lowest ranks per suit treated as interchangeable
+
+    Returns:
+        The canonical owner array and the transform from the original deal
+    """
+    owners = to_owners(deal)
+    if isinstance(strain, Suit):
+        strain = strain.index
+
+    best = None
+    for rotation in range(4):
+        rotated = owners.translate(_ROTATIONS[rotation])
+        blocks = [rotated[13 * s : 13 * (s + 1)] for s in range(4)]
+        if small_cards:
+            blocks = [bytes(sorted(b[:small_cards])) + b[small_cards:] for b in blocks]
+        order = _suit_order(blocks, strain)
+        key = b"".join(blocks[s] for s in order)
+        if best is None or key < best[0]:
+            best = (key, rotation, order)
+
+    key, rotation, order = best
+    suit_map = [0, 0, 0, 0]
+    for new, old in enumerate(order):
+        suit_map[old] = new
+    return key, DealTransform(rotation, tuple(suit_map))
+
+
+def canonicalize_batch(
+    owners: np.ndarray,
+    strain: Optional[int] = None,
+    small_cards: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized ``canonicalize`` over many deals.
+
+    Args:
+        owners: (N, 52) seat of each card
+        strain: Strain index kept exact, None for all strains
+        small_cards: Number of lowest ranks per suit treated as interchangeable
+
+    Returns:
+        (N, 52) canonical owner arrays, (N,) rotations and (N, 4) suit maps
+    """
+    owners = np.asarray(owners, dtype=np.uint8)
+    n = len(owners)
+    weights = 4 ** np.arange(12, -1, -1, dtype=np.int64)
+    rows = np.arange(n)[:, None]
+
+    best_blocks = best_hi = best_lo = None
+    best_rotation = np.zeros(n, dtype=np.int8)
+    best_order = np.zeros((n, 4), dtype=np.int64)
+    for rotation in range(4):
+        blocks = ((owners.astype(np.int64) - rotation) % 4).reshape(n, 4, 13)
+        if small_cards:
+            blocks[:, :, :small_cards] = np.sort(blocks[:, :, :small_cards], axis=2)
+        codes = blocks @ weights
+
+        if strain is None or strain == NO_TRUMP_INDEX:
+            order = np.argsort(codes, axis=1, kind="stable")
+        else:
+            others = [s for s in range(4) if s != strain]
+            order = np.concatenate(
+                [
+                    np.array(others)[np.argsort(codes[:, others], axis=1)],
+                    np.full((n, 1), strain),
+                ],
+                axis=1,
+            )
+        ordered = codes[rows, order]
+        hi = (ordered[:, 0] << 26) | ordered[:, 1]
+        lo = (ordered[:, 2] << 26) | ordered[:, 3]
+
+        if best_blocks is None:
+            better = np.ones(n, dtype=bool)
+            best_blocks, best_hi, best_lo = blocks.copy(), hi, lo
+        else:
+            better = (hi < best_hi) | ((hi == best_hi) & (lo < best_lo))
+        best_blocks[better] = blocks[better]
+        best_hi = np.where(better, hi, best_hi)
+        best_lo = np.where(better, lo, best_lo)
+        best_rotation[better] = rotation
+        best_order[better] = order[better]
+
+    keys = best_blocks[rows, best_order].reshape(n, 52).astype(np.uint8)
+    suit_maps = np.empty_like(best_order)
+    suit_maps[rows, best_order] = np.arange(4)
+    return keys, best_rotation, suit_maps
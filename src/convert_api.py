@@ -1,14 +1,21 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from models.game import Game
 from models.card import Suit
-from endplay.types import Deal
-from endplay.dds import calc_dd_table, ddtable
 from collections import defaultdict
 
+# endplay is imported where it is used, it is slow to load
+if TYPE_CHECKING:
+    from endplay.types import Deal
+
 """
 convert game to a endplay Deal object
 
 """
 def game_to_deal(game: Game) -> Deal:
+    from endplay.types import Deal
+
     hand_endplay = []
     for player in game.players:
         d = defaultdict(lambda:[])
@@ -0,0 +1,256 @@
+"""On-disk datasets of deals labelled with double dummy tables.
+
+A dataset is a directory of ``chunk_NNNNN.npz`` files, each holding
+
+* ``owners``: (N, 52) uint8, the seat holding each card (North is seat 0)
+* ``dd``: (N, 5, 4) int8, tricks by strain index (clubs .. no trump) and seat
+
+Chunks are loaded one at a time, so datasets larger than memory can be
+streamed. ``minibatches`` shuffles within chunks and prepares batches on a
+background thread while the consumer trains on the previous one.
+
+Usage:
+    python dd_dataset.py OUT_DIR --deals N [--chunk-size N] [--seed S]
+"""
+
+import argparse
+import os
+import queue
+import threading
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from dealer import Dealer, array_to_owners
+
+CHUNK_PATTERN = "chunk_{:05d}.npz"
+
+# Maximum number of tables per DDS call
+DDS_BATCH = 32
+
+# Strain index -> row of endplay's DDTable.to_list() (spades first)
+_ENDPLAY_STRAINS = [3, 2, 1, 0, 4]
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+
+def dd_tables(deals: np.ndarray) -> np.ndarray:
+    """
+    Solve double dummy tables with endplay.
+
+    Args:
+        deals: (N, 4, 52) boolean deals
+
+    Returns:
+        (N, 5, 4) tricks by strain index and seat
+    """
+    from endplay.dds import calc_all_tables
+    from dealer import array_to_deal
+
+    tables = np.zeros((len(deals), 5, 4), dtype=np.int8)
+    for start in range(0, len(deals), DDS_BATCH):
+        batch = deals[start : start + DDS_BATCH]
+        results = calc_all_tables([array_to_deal(deal) for deal in batch])
+        for i, table in enumerate(results):
+            tables[start + i] = np.array(table.to_list())[_ENDPLAY_STRAINS]
+    return tables
+
+
+def write_dataset(
+    directory: str,
+    num_deals: int,
+    chunk_size: int = 10_000,
+    dealer: Optional[Dealer] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> List[str]:
+    """
+    Deal and solve a dataset, appending chunks after any already present.
+
+    Args:
+        directory: Dataset directory, created if missing
+        num_deals: Number of deals to add
+        chunk_size: Deals per chunk file
+        dealer: Deal generator, unconstrained random deals by default
+        progress: Called with the number of deals written after each chunk
+
+    Returns:
+        Paths of the chunks written
+    """
+    os.makedirs(directory, exist_ok=True)
+    dealer = dealer or Dealer()
+    first = len(chunk_paths(directory))
+    written = []
+    done = 0
+    while done < num_deals:
+        deals = dealer.generate(min(chunk_size, num_deals - done))
+        path = os.path.join(directory, CHUNK_PATTERN.format(first + len(written)))
+        np.savez(path, owners=array_to_owners(deals), dd=dd_tables(deals))
+        written.append(path)
+        done += len(deals)
+        if progress:
+            progress(done)
+    return written
+
+
+def chunk_paths(directory: str) -> List[str]:
+    """Chunk files of a dataset, in order."""
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.startswith("chunk_") and name.endswith(".npz")
+    ]
+
+
+def load_chunk(path: str) -> Chunk:
+    """Load the owners and DD tables of one chunk."""
+    with np.load(path) as data:
+        return data["owners"], data["dd"]
+
+
+class Prefetcher:
+    """
+    Runs an iterator on a background thread, keeping a few items ready.
+
+    Call ``close`` when stopping before the end, or the thread stays blocked
+    on the full queue.
+    """
+
+    _DONE = object()
+    # Seconds between checks for close while the queue is full
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self, iterator: Iterator, depth: int = 4):
+        """
+        Args:
+            iterator: Items to produce, e.g. a generator building minibatches
+            depth: Number of items kept ready ahead of the consumer
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(iterator,), daemon=True)
+        self._thread.start()
+
+    def _put(self, entry: tuple) -> bool:
+        """Queue an entry, False if the prefetcher was closed first."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(entry, timeout=self._POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self, iterator: Iterator) -> None:
+        try:
+            for item in iterator:
+                if not self._put((item, None)):
+                    return
+        except BaseException as error:  # Re-raised in the consumer
+            self._put((None, error))
+            return
+        self._put((self._DONE, None))
+
+    def close(self) -> None:
+        """Stop the background thread, dropping the items it prepared."""
+        self._stop.set()
+        self._thread.join()
+
+    def __iter__(self) -> "Prefetcher":
+        return self
+
+    def __next__(self):
+        if self._stop.is_set():
+            raise StopIteration
+        item, error = self._queue.get()
+        if error is not None:
+            raise error
+        if item is self._DONE:
+            raise StopIteration
+        return item
+
+
+def minibatches(
+    directory: str,
+    batch_size: int,
+    epochs: int = 1,
+    seed: Optional[int] = None,
+    prefetch: int = 4,
+    transform: Optional[Callable[[np.ndarray, np.ndarray], object]] = None,
+) -> Iterator:
+    """
+    Stream shuffled minibatches of a dataset.
+
+    Chunk order is shuffled every epoch and deals are shuffled within each
+    chunk; a partial batch at the end of a chunk is carried into the next.
+
+    Args:
+        directory: Dataset directory
+        batch_size: Deals per batch
+        epochs: Passes over the dataset
+        seed: Seed for shuffling
+        prefetch: Number of batches prepared ahead
+        transform: Applied to (owners, dd) of each batch on the background
+            thread, e.g. to build network inputs and targets
+
+    Returns:
+        Iterator over (owners, dd) batches, or the transformed batches
+    """
+    paths = chunk_paths(directory)
+    if not paths:
+        raise ValueError(f"No dataset chunks in {directory}")
+
+    def generate():
+        rng = np.random.default_rng(seed)
+        leftover: Optional[Chunk] = None
+        for _ in range(epochs):
+            for i in rng.permutation(len(paths)):
+                owners, dd = load_chunk(paths[i])
+                order = rng.permutation(len(owners))
+                owners, dd = owners[order], dd[order]
+                if leftover is not None:
+                    owners = np.concatenate([leftover[0], owners])
+                    dd = np.concatenate([leftover[1], dd])
+                end = len(owners) - len(owners) % batch_size
+                for start in range(0, end, batch_size):
+                    batch = (
+                        owners[start : start + batch_size],
+                        dd[start : start + batch_size],
+                    )
+                    yield transform(*batch) if transform else batch
+                leftover = (owners[end:], dd[end:])
+        if leftover is not None and len(leftover[0]):
+            yield transform(*leftover) if transform else leftover
+
+    return _prefetched(generate(), prefetch)
+
+
+def _prefetched(iterator: Iterator, depth: int) -> Iterator:
+    """Iterate through a ``Prefetcher``, closing it when abandoned early."""
+    prefetcher = Prefetcher(iterator, depth)
+    try:
+        yield from prefetcher
+    finally:
+        prefetcher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a DD-labelled deal dataset")
+    parser.add_argument("directory")
+    parser.add_argument("--deals", type=int, required=True)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    write_dataset(
+        args.directory,
+        args.deals,
+        args.chunk_size,
+        Dealer(seed=args.seed),
+        progress=lambda done: print(f"{done}/{args.deals} deals"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""Local double dummy solving service.
+
+One process owns the solver and many processes send it single deals. The
+server collects the requests arriving within a few milliseconds of each
+other into one ``dd_dataset.dd_tables`` call of up to ``DDS_BATCH`` deals,
+so callers get batch throughput without batching themselves. A deal that is
+already queued or being solved is not solved again: the new request waits
+for the same result.
+
+Connections use ``multiprocessing.connection``, on a Unix socket by default.
+Every message is unpickled, so a TCP address requires an authkey; a Unix
+socket is limited to the users its file permissions let connect.
+``DDClient.submit`` returns a ``concurrent.futures.Future``, and one client
+may be shared by many threads.
+
+Messages are tuples:
+
+    client -> server:  ("solve", id, owners)   owners: (52,) uint8 card owners
+                       ("stats", id)
+    server -> client:  ("result", id, dd)      dd: (5, 4) int8 tricks
+                       ("stats", id, dict)
+                       ("error", id, message)
+
+Usage:
+    python dd_service.py [--address PATH|HOST:PORT] [--authkey KEY]
+                                                       (run the server)
+    python dd_service.py --bench N [--clients K]       (in-process benchmark)
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from dd_dataset import DDS_BATCH
+from dealer import NUM_SEATS, array_to_owners, owners_to_array
+
+DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), "bridge_dd.sock")
+
+# Unix socket path, or (host, port) for TCP
+Address = Union[str, Tuple[str, int]]
+
+# Request latencies kept for the stats
+LATENCY_WINDOW = 10_000
+
+# (N, 52) owners -> (N, 5, 4) tricks
+Solver = Callable[[np.ndarray], np.ndarray]
+
+
+def _check_authkey(address: Address, authkey: Optional[bytes]) -> None:
+    """ValueError for a TCP address without an authkey."""
+    if not isinstance(address, str) and authkey is None:
+        raise ValueError(
+            "A TCP address needs an authkey: messages are unpickled, so any "
+            "peer that can connect could run code"
+        )
+
+
+def _parse_address(text: str) -> Address:
+    """``HOST:PORT`` as a TCP address, anything else as a socket path."""
+    host, _, port = text.rpartition(":")
+    if host and port.isdigit() and os.sep not in text:
+        return host, int(port)
+    return text
+
+
+def _solve_owners(owners: np.ndarray) -> np.ndarray:
+    from dd_dataset import dd_tables
+
+    return dd_tables(owners_to_array(owners))
+
+
+def _owners(deal: np.ndarray) -> np.ndarray:
+    deal = np.asarray(deal)
+    if deal.shape == (NUM_SEATS, 52):
+        return array_to_owners(deal)
+    if deal.shape == (52,):
+        return deal.astype(np.uint8)
+    raise ValueError(f"Expected a (4, 52) deal or (52,) owners, got {deal.shape}")
+
+
+def _check_owners(value) -> np.ndarray:
+    """Owners of a solve request, ValueError unless 13 cards to each of 4 seats."""
+    owners = np.asarray(value)
+    if owners.shape != (52,) or not np.issubdtype(owners.dtype, np.integer):
+        raise ValueError(f"Expected (52,) integer owners, got {owners.shape}")
+    if owners.min() < 0 or owners.max() >= NUM_SEATS:
+        raise ValueError("Owners must be seats 0 to 3")
+    if (np.bincount(owners, minlength=NUM_SEATS) != 13).any():
+        raise ValueError("Every seat must hold 13 cards")
+    return owners.astype(np.uint8)
+
+
+class _Waiter:
+    __slots__ = ("connection", "request_id", "received")
+
+    def __init__(self, connection: "_ClientConnection", request_id: int):
+        self.connection = connection
+        self.request_id = request_id
+        self.received = time.perf_counter()
+
+
+class _ClientConnection:
+    """Server side of one client, sending from the solver thread."""
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self._lock = threading.Lock()
+
+    def send(self, message: tuple) -> None:
+        with self._lock:
+            try:
+                self.connection.send(message)
+            except OSError:
+                # The client went away; its requests are dropped
+                pass
+
+
+class DDServer:
+    """Serves DD tables to ``DDClient`` connections, solving in batches."""
+
+    def __init__(
+        self,
+        address: Address = DEFAULT_ADDRESS,
+        authkey: Optional[bytes] = None,
+        max_batch: int = DDS_BATCH,
+        max_wait: float = 0.005,
+        solver: Optional[Solver] = None,
+    ):
+        """
+        Args:
+            address: Unix socket path, or a (host, port) tuple for TCP
+            authkey: Key clients must present; required for TCP, optional
+                for a Unix socket
+            max_batch: Most deals solved per solver call
+            max_wait: Seconds the first queued deal waits for more to batch with
+            solver: Function from (N, 52) owners to (N, 5, 4) tricks, endplay
+                through ``dd_dataset.dd_tables`` by default
+
+        Raises:
+            ValueError: For a TCP address without an authkey
+        """
+        _check_authkey(address, authkey)
+        self.address = address
+        self.authkey = authkey
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.solver = solver or _solve_owners
+
+        self._cond = threading.Condition()
+        # Deals waiting for a batch and deals being solved, keyed by owners
+        self._queued: "OrderedDict[bytes, List[_Waiter]]" = OrderedDict()
+        self._solving: Dict[bytes, List[_Waiter]] = {}
+        self._closed = False
+        self._listener: Optional[Listener] = None
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.deals_solved = 0
+        self.batches = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Counters and latencies.
+
+        ``queued`` is the number of distinct deals waiting for a batch and
+        ``latency_*`` are seconds from a request arriving to its reply, over
+        the last ``LATENCY_WINDOW`` requests.
+        """
+        with self._cond:
+            latencies = np.array(self._latencies)
+            stats = {
+                "queued": len(self._queued),
+                "solving": len(self._solving),
+                "requests": self.requests,
+                "deduplicated": self.deduplicated,
+                "deals_solved": self.deals_solved,
+                "batches": self.batches,
+                "mean_batch": self.deals_solved / self.batches if self.batches else 0.0,
+            }
+        for name, q in (("p50", 50), ("p95", 95), ("max", 100)):
+            stats[f"latency_{name}"] = (
+                float(np.percentile(latencies, q)) if len(latencies) else 0.0
+            )
+        return stats
+
+    def _enqueue(self, key: bytes, waiter: _Waiter) -> None:
+        with self._cond:
+            self.requests += 1
+            waiters = self._solving.get(key) or self._queued.get(key)
+            if waiters is not None:
+                self.deduplicated += 1
+                waiters.append(waiter)
+                return
+            self._queued[key] = [waiter]
+            self._cond.notify()
+
+    def _next_batch(self) -> Optional[List[bytes]]:
+        """Wait for queued deals and move up to ``max_batch`` to solving."""
+        with self._cond:
+            while not self._queued and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            deadline = time.perf_counter() + self.max_wait
+            while len(self._queued) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            keys = list(itertools.islice(self._queued, self.max_batch))
+            for key in keys:
+                self._solving[key] = self._queued.pop(key)
+            return keys
+
+    def _solve(self, keys: List[bytes]) -> List[Tuple[str, object]]:
+        """Replies to a batch. If the batch fails, its deals are solved one
+        at a time so that only the failing ones get an error."""
+        try:
+            owners = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 52)
+            return [("result", table) for table in self.solver(owners)]
+        except Exception as error:
+            if len(keys) == 1:
+                return [("error", f"{type(error).__name__}: {error}")]
+        return [reply for key in keys for reply in self._solve([key])]
+
+    def _solve_loop(self) -> None:
+        while (keys := self._next_batch()) is not None:
+            replies = self._solve(keys)
+
+            with self._cond:
+                waiters = [self._solving.pop(key) for key in keys]
+                self.deals_solved += len(keys)
+                self.batches += 1
+            now = time.perf_counter()
+            for (kind, payload), deal_waiters in zip(replies, waiters):
+                for waiter in deal_waiters:
+                    waiter.connection.send((kind, waiter.request_id, payload))
+            with self._cond:
+                self._latencies.extend(
+                    now - waiter.received
+                    for deal_waiters in waiters
+                    for waiter in deal_waiters
+                )
+
+    def _serve_connection(self, connection: Connection) -> None:
+        client = _ClientConnection(connection)
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                if not isinstance(message, tuple) or len(message) < 2:
+                    client.send(("error", None, "Malformed request"))
+                    continue
+                kind, request_id = message[0], message[1]
+                if kind == "solve":
+                    try:
+                        owners = _check_owners(message[2] if len(message) > 2 else None)
+                    except ValueError as error:
+                        client.send(("error", request_id, f"ValueError: {error}"))
+                        continue
+                    self._enqueue(owners.tobytes(), _Waiter(client, request_id))
+                elif kind == "stats":
+                    client.send(("stats", request_id, self.stats()))
+                else:
+                    client.send(("error", request_id, f"Unknown request {kind!r}"))
+
+    def serve_forever(self) -> None:
+        """Accept clients until ``close`` is called."""
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._solve_loop, daemon=True).start()
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, ConnectionError, EOFError):
+                continue  # A client failed the handshake
+            except OSError:
+                if self._closed:
+                    return
+                raise
+            threading.Thread(
+                target=self._serve_connection, args=(connection,), daemon=True
+            ).start()
+
+    def start(self) -> threading.Thread:
+        """Serve on a background thread; returns once clients can connect."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        while self._listener is None and thread.is_alive():
+            time.sleep(0.001)
+        return thread
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._listener is not None:
+            self._listener.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class DDClient:
+    """Connection to a ``DDServer``; safe to share between threads."""
+
+    def __init__(
+        self, address: Address = DEFAULT_ADDRESS, authkey: Optional[bytes] = None
+    ):
+        """
+        Args:
+            address: Address of the server
+            authkey: The server's key; required for TCP
+
+        Raises:
+            ValueError: For a TCP address without an authkey
+        """
+        _check_authkey(address, authkey)
+        self._connection = Client(address, authkey=authkey)
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._futures: Dict[int, Future] = {}
+        self._receiver = threading.Thread(target=self._receive, daemon=True)
+        self._receiver.start()
+
+    def _request(self, *message) -> Future:
+        future: Future = Future()
+        request_id = next(self._ids)
+        self._futures[request_id] = future
+        with self._send_lock:
+            self._connection.send((message[0], request_id, *message[1:]))
+        return future
+
+    def _receive(self) -> None:
+        try:
+            while True:
+                kind, request_id, payload = self._connection.recv()
+                future = self._futures.pop(request_id, None)
+                if future is None:
+                    continue
+                if kind == "error":
+                    future.set_exception(RuntimeError(payload))
+                else:
+                    future.set_result(payload)
+        except (EOFError, OSError):
+            pass
+        while self._futures:
+            _, future = self._futures.popitem()
+            future.set_exception(ConnectionError("DD server connection closed"))
+
+    def submit(self, deal: np.ndarray) -> Future:
+        """
+        Ask for the DD table of a deal.
+
+        Args:
+            deal: (4, 52) boolean deal or (52,) owner seats
+
+        Returns:
+            Future of the (5, 4) tricks by strain index and seat
+        """
+        return self._request("solve", _owners(deal))
+
+    def solve(self, deal: np.ndarray) -> np.ndarray:
+        """DD table of one deal, waiting for it."""
+        return self.submit(deal).result()
+
+    def solve_many(self, deals: np.ndarray) -> np.ndarray:
+        """(N, 5, 4) DD tables of (N, 4, 52) deals, all requested at once."""
+        futures = [self.submit(deal) for deal in deals]
+        return np.stack([future.result() for future in futures])
+
+    def stats(self) -> Dict[str, float]:
+        """The server's ``DDServer.stats``."""
+        return self._request("stats").result()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "DDClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def benchmark(
+    num_deals: int, clients: int, address: str, seed: int = 0
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Solve deals one request at a time from concurrent clients.
+
+    A server is started in this process; each client thread sends one deal
+    at a time and waits for its table, as an unbatched caller would. Every
+    tenth deal repeats the one before it.
+
+    Returns:
+        Seconds taken and the server's stats
+    """
+    from dealer import Dealer
+
+    deals = Dealer(seed=seed).generate(num_deals)
+    deals[1::10] = deals[0::10][: len(deals[1::10])]
+    server = DDServer(address)
+    server.start()
+    try:
+        with DDClient(address) as client:
+
+            def run(worker: int) -> None:
+                for deal in deals[worker::clients]:
+                    client.solve(deal)
+
+            threads = [
+                threading.Thread(target=run, args=(worker,))
+                for worker in range(clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            return elapsed, client.stats()
+    finally:
+        server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--address", default=DEFAULT_ADDRESS, help="socket path or HOST:PORT"
+    )
+    parser.add_argument(
+        "--authkey", default=None, help="key clients must present, required for TCP"
+    )
+    parser.add_argument("--max-batch", type=int, default=DDS_BATCH)
+    parser.add_argument("--max-wait", type=float, default=0.005)
+    parser.add_argument("--bench", type=int, default=None, metavar="N")
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.bench:
+        elapsed, stats = benchmark(args.bench, args.clients, args.address)
+        print(f"{args.bench} deals from {args.clients} clients in {elapsed:.2f} s")
+        for name, value in stats.items():
+            print(f"  {name}: {value:.4g}")
+        return
+
+    authkey = args.authkey.encode() if args.authkey is not None else None
+    try:
+        server = DDServer(
+            _parse_address(args.address),
+            authkey,
+            max_batch=args.max_batch,
+            max_wait=args.max_wait,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Serving DD tables on {args.address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""Constraint-driven deal generator.
+
+Deals are represented as boolean arrays of shape (N, 4, 52): seat index follows
+``Game.players`` order (seat 0 is North when converted with ``convert_api``) and
+card index is ``13 * SUIT_INDEX[suit] + RANK_INDEX[rank]``.
+
+Generation is done in two vectorized stages. Shapes (suit lengths per seat) are
+sampled first, seat by seat, from the exact hypergeometric distribution truncated
+to each seat's length constraints; the truncation is corrected with a rejection
+step so accepted shapes follow the true conditional distribution. Ranks are then
+dealt into the accepted shapes and only the point constraints are checked by
+rejection.
+"""
+
+from dataclasses import dataclass, field
+from itertools import product
+from math import comb
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from models.card import Card, Suit, Rank, SUIT_INDEX, CARDS, card_index
+
+if TYPE_CHECKING:
+    from endplay.types import Deal
+
+NUM_SEATS = 4
+NUM_SUITS = 4
+CARDS_PER_HAND = 13
+
+# High card points for every card index
+HCP_BY_CARD = np.zeros(52, dtype=np.int8)
+for _card in CARDS:
+    HCP_BY_CARD[card_index(_card)] = {
+        Rank.ACE: 4,
+        Rank.KING: 3,
+        Rank.QUEEN: 2,
+        Rank.JACK: 1,
+    }.get(_card.rank, 0)
+
+# Every possible hand shape as suit lengths (clubs, diamonds, hearts, spades)
+SHAPES = np.array(
+    [s for s in product(range(14), repeat=NUM_SUITS) if sum(s) == CARDS_PER_HAND],
+    dtype=np.int8,
+)
+
+# Binomial coefficients C(n, k) for 0 <= n, k <= 13
+_COMB = np.array([[comb(n, k) for k in range(14)] for n in range(14)], dtype=np.float64)
+
+DealArray = np.ndarray
+
+
+def distribution_points(suit_lengths: np.ndarray) -> np.ndarray:
+    """Distribution points (void=3, singleton=2, doubleton=1) over the last axis."""
+    return np.clip(3 - suit_lengths, 0, None).sum(axis=-1)
+
+
+def is_balanced(suit_lengths: np.ndarray) -> np.ndarray:
+    """Balanced flag over the last axis, same rule as ``HandEvaluation.is_balanced``."""
+    return ((suit_lengths >= 1) & (suit_lengths <= 5)).all(axis=-1)
+
+
+@dataclass
+class HandConstraint:
+    """Constraints on a single seat's hand.
+
+    Ranges are inclusive. ``points`` is high card points plus distribution
+    points, matching ``HandEvaluation.total_points``.
+    """
+
+    hcp: Tuple[int, int] = (0, 37)
+    points: Tuple[int, int] = (0, 46)
+    suit_lengths: Dict[Suit, Tuple[int, int]] = field(default_factory=dict)
+    balanced: Optional[bool] = None
+
+    def shape_mask(self) -> np.ndarray:
+        """Boolean mask over ``SHAPES`` of the shapes allowed by this constraint."""
+        mask = np.ones(len(SHAPES), dtype=bool)
+        for suit, (low, high) in self.suit_lengths.items():
+            lengths = SHAPES[:, SUIT_INDEX[suit]]
+            mask &= (lengths >= low) & (lengths <= high)
+        if self.balanced is not None:
+            mask &= is_balanced(SHAPES) == self.balanced
+        return mask
+
+    @property
+    def has_point_constraint(self) -> bool:
+        return self.hcp != (0, 37) or self.points != (0, 46)
+
+
+class Dealer:
+    """Generates deals satisfying per-seat hand constraints."""
+
+    def __init__(
+        self,
+        constraints: Union[
+            Sequence[Optional[HandConstraint]], Dict[int, HandConstraint], None
+        ] = None,
+        predealt: Optional[Dict[int, List[Card]]] = None,
+        batch_size: int = 4096,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            constraints: Constraint per seat, as a sequence of 4 (``None`` for an
+                unconstrained seat) or a dict keyed by seat index
+            predealt: Fixed 13-card hands keyed by seat index
+            batch_size: Number of candidate deals generated per batch
+            seed: Seed for the random generator
+        """
+        if isinstance(constraints, dict):
+            constraints = [constraints.get(seat) for seat in range(NUM_SEATS)]
+        self.constraints: List[HandConstraint] = [
+            c if c is not None else HandConstraint()
+            for c in (constraints or [None] * NUM_SEATS)
+        ]
+        if len(self.constraints) != NUM_SEATS:
+            raise ValueError("Exactly 4 seat constraints are required")
+
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self._shape_masks = [c.shape_mask() for c in self.constraints]
+
+        # Fixed hands
+        self.predealt = np.zeros((NUM_SEATS, 52), dtype=bool)
+        for seat, cards in (predealt or {}).items():
+            if len(cards) != CARDS_PER_HAND:
+                raise ValueError("Predealt hands must have 13 cards")
+            self.predealt[seat, [card_index(card) for card in cards]] = True
+        if (self.predealt.sum(axis=0) > 1).any():
+            raise ValueError("A card is predealt to more than one seat")
+
+        fixed_seats = [seat for seat in range(NUM_SEATS) if self.predealt[seat].any()]
+        for seat in fixed_seats:
+            if not self._check(self.predealt[seat][None, None], [seat])[0]:
+                raise ValueError(
+                    f"Predealt hand of seat {seat} violates its constraint"
+                )
+
+        remaining = ~self.predealt.any(axis=0)
+        self._remaining_ranks = [
+            np.flatnonzero(remaining[13 * s : 13 * (s + 1)]) for s in range(NUM_SUITS)
+        ]
+        self._remaining_lengths = np.array(
+            [len(ranks) for ranks in self._remaining_ranks]
+        )
+
+        # Seats with shape constraints get their shapes sampled first, most
+        # restrictive first, which maximises shape acceptance. Unconstrained seats
+        # share whatever is left in a random split.
+        self._allowed_shapes = [SHAPES[mask] for mask in self._shape_masks]
+        free_seats = [seat for seat in range(NUM_SEATS) if seat not in fixed_seats]
+        self.shape_seats = sorted(
+            (
+                seat
+                for seat in free_seats
+                if len(self._allowed_shapes[seat]) < len(SHAPES)
+            ),
+            key=lambda seat: self._shape_probabilities(
+                self._remaining_lengths[None], self._allowed_shapes[seat]
+            ).sum(),
+        )
+        self.pool_seats = [seat for seat in free_seats if seat not in self.shape_seats]
+
+    def _shape_probabilities(
+        self, remaining: np.ndarray, shapes: np.ndarray
+    ) -> np.ndarray:
+        """Probability of each allowed shape given the cards left in each suit.
+
+        Args:
+            remaining: (M, 4) cards left per suit
+            shapes: (K, 4) allowed shapes
+
+        Returns:
+            (M, K) probability of dealing each shape from the remaining cards
+        """
+        weights = _COMB[remaining[:, 0][:, None], shapes[:, 0][None, :]]
+        for s in range(1, NUM_SUITS):
+            weights = weights * _COMB[remaining[:, s][:, None], shapes[:, s][None, :]]
+        return weights / comb(int(remaining[0].sum()), CARDS_PER_HAND)
+
+    def _sample_shapes(self, n: int) -> np.ndarray:
+        """Sample suit lengths for the shape-constrained seats.
+
+        Returns:
+            (M, 4, 4) accepted suit lengths per seat, M <= n. Lengths of predealt
+            and unconstrained seats are left at zero.
+        """
+        lengths = np.zeros((n, NUM_SEATS, NUM_SUITS), dtype=np.int8)
+        remaining = np.tile(self._remaining_lengths, (n, 1))
+        accept = np.ones(n, dtype=bool)
+        acceptance_probability = np.ones(n)
+
+        for i, seat in enumerate(self.shape_seats):
+            shapes = self._allowed_shapes[seat]
+            if not self.pool_seats and i == len(self.shape_seats) - 1:
+                # The last seat gets whatever is left
+                lengths[:, seat] = remaining
+                accept &= np.isin(shape_ids(remaining), shape_ids(shapes))
+                break
+
+            # Rows share few distinct remaining-card vectors, so the shape
+            # distribution is computed once per distinct vector
+            keys = remaining.astype(np.int64) @ _SHAPE_KEY
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            probs = self._shape_probabilities(remaining[first], shapes)
+            cumulative = np.cumsum(probs, axis=1)
+            totals = cumulative[:, -1]
+            # The first seat always sees the same remaining cards, so only the
+            # later seats' truncation needs correcting
+            if i > 0:
+                acceptance_probability *= totals[inverse]
+            accept &= totals[inverse] > 0
+
+            # Inverse CDF sampling with one searchsorted over all distinct rows
+            with np.errstate(invalid="ignore", divide="ignore"):
+                normalised = np.nan_to_num(cumulative / totals[:, None], nan=1.0)
+            offsets = np.arange(len(first))[:, None]
+            positions = np.searchsorted(
+                (normalised + offsets).ravel(),
+                inverse + self.rng.random(n),
+                side="right",
+            )
+            chosen = np.minimum(positions - inverse * len(shapes), len(shapes) - 1)
+            lengths[:, seat] = shapes[chosen]
+            remaining = remaining - shapes[chosen]
+
+        accept &= self.rng.random(n) < acceptance_probability
+        return lengths[accept]
+
+    def _deal_ranks(self, lengths: np.ndarray) -> np.ndarray:
+        """Deal the remaining ranks into the sampled shapes.
+
+        Args:
+            lengths: (M, 4, 4) suit lengths per seat
+
+        Returns:
+            (M, 4, 52) deal array
+        """
+        m = len(lengths)
+        deals = np.zeros((m, NUM_SEATS, 52), dtype=bool)
+        deals[:] = self.predealt
+        rows = np.arange(m)[:, None]
+        shape_seats = np.array(self.shape_seats, dtype=np.int64)
+        pool = np.zeros((m, 52), dtype=bool)
+
+        for s, ranks in enumerate(self._remaining_ranks):
+            if len(ranks) == 0:
+                continue
+            order = np.argsort(self.rng.random((m, len(ranks))), axis=1)
+            shuffled = 13 * s + ranks[order]
+            if len(shape_seats) == 0:
+                pool[rows, shuffled] = True
+                continue
+            bounds = np.cumsum(lengths[:, shape_seats, s], axis=1)
+            seat_of_position = (
+                np.arange(len(ranks))[None, :, None] >= bounds[:, None, :]
+            ).sum(axis=2)
+            dealt = seat_of_position < len(shape_seats)
+            seat_of_position = np.minimum(seat_of_position, len(shape_seats) - 1)
+            deals[rows, shape_seats[seat_of_position], shuffled] = dealt
+            pool[rows, shuffled] = ~dealt
+
+        if self.pool_seats:
+            # Split the leftover cards randomly between the unconstrained seats
+            keys = self.rng.random((m, 52))
+            keys[~pool] = np.inf
+            order = np.argsort(keys, axis=1)[:, : CARDS_PER_HAND * len(self.pool_seats)]
+            pool_seats = np.array(self.pool_seats)
+            seat_of_position = pool_seats[np.arange(order.shape[1]) // CARDS_PER_HAND]
+            deals[rows, seat_of_position[None, :], order] = True
+
+        return deals
+
+    def _check(self, deals: np.ndarray, seats: Sequence[int]) -> np.ndarray:
+        """Check point constraints of the given seats.
+
+        Args:
+            deals: (M, S, 52) hands of the given seats
+            seats: Seat index of each hand
+
+        Returns:
+            (M,) boolean mask of deals satisfying all constraints
+        """
+        ok = np.ones(len(deals), dtype=bool)
+        for i, seat in enumerate(seats):
+            constraint = self.constraints[seat]
+            hand = deals[:, i]
+            suit_lengths = hand.reshape(-1, NUM_SUITS, 13).sum(axis=2)
+            ok &= self._shape_masks[seat][shape_ids(suit_lengths)]
+            if not constraint.has_point_constraint:
+                continue
+            hcp = hand @ HCP_BY_CARD.astype(np.int16)
+            points = hcp + distribution_points(suit_lengths)
+            ok &= (hcp >= constraint.hcp[0]) & (hcp <= constraint.hcp[1])
+            ok &= (points >= constraint.points[0]) & (points <= constraint.points[1])
+        return ok
+
+    def generate_batch(self) -> DealArray:
+        """Generate one batch of candidate deals and keep the matching ones.
+
+        Returns:
+            (M, 4, 52) boolean array of deals satisfying all constraints
+        """
+        deals = self._deal_ranks(self._sample_shapes(self.batch_size))
+        # Unconstrained seats' shapes come out of the rank stage
+        point_seats = [
+            seat
+            for seat in self.shape_seats + self.pool_seats
+            if self.constraints[seat].has_point_constraint
+        ]
+        if point_seats:
+            deals = deals[self._check(deals[:, point_seats], point_seats)]
+        return deals
+
+    def stream(self, max_batches: Optional[int] = None) -> Iterator[DealArray]:
+        """Yield batches of matching deals.
+
+        Args:
+            max_batches: Stop after this many candidate batches (unbounded if None)
+        """
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batches += 1
+            deals = self.generate_batch()
+            if len(deals):
+                yield deals
+
+    def generate(self, n: int, max_batches: int = 10_000) -> DealArray:
+        """
+        Generate a fixed number of matching deals.
+
+        Args:
+            n: Number of deals
+            max_batches: Maximum number of candidate batches to try
+
+        Returns:
+            (n, 4, 52) boolean deal array
+
+        Raises:
+            ValueError: If the constraints are too restrictive to fill n deals
+        """
+        chunks = []
+        count = 0
+        for deals in self.stream(max_batches):
+            chunks.append(deals)
+            count += len(deals)
+            if count >= n:
+                return np.concatenate(chunks)[:n]
+        raise ValueError(
+            f"Only {count} of {n} deals found in {max_batches} batches, "
+            "constraints may be unsatisfiable"
+        )
+
+    def hands(self, n: int) -> Iterator[List[List[Card]]]:
+        """Yield deals as lists of 4 card lists, ready for ``Game.play(hands=...)``."""
+        for deal in self.generate(n):
+            yield array_to_hands(deal)
+
+    def deals(self, n: int) -> Iterator["Deal"]:
+        """Yield deals as endplay ``Deal`` objects."""
+        for deal in self.generate(n):
+            yield array_to_deal(deal)
+
+
+# Lookup from packed suit lengths to shape index
+_SHAPE_KEY = 14 ** np.arange(NUM_SUITS)
+_SHAPE_LOOKUP = np.full(14**NUM_SUITS, -1, dtype=np.int16)
+_SHAPE_LOOKUP[SHAPES.astype(np.int64) @ _SHAPE_KEY] = np.arange(len(SHAPES))
+
+
+def shape_ids(suit_lengths: np.ndarray) -> np.ndarray:
+    """Index into ``SHAPES`` of suit length vectors (last axis of size 4)."""
+    return _SHAPE_LOOKUP[suit_lengths.astype(np.int64) @ _SHAPE_KEY]
+
+
+def hands_to_array(hands: Sequence[Sequence[Card]]) -> DealArray:
+    """Encode 4 card lists as a (4, 52) boolean array."""
+    deal = np.zeros((NUM_SEATS, 52), dtype=bool)
+    for seat, cards in enumerate(hands):
+        deal[seat, [card_index(card) for card in cards]] = True
+    return deal
+
+
+def array_to_hands(deal: DealArray) -> List[List[Card]]:
+    """Decode a (4, 52) boolean array into 4 card lists."""
+    return [[CARDS[i] for i in np.flatnonzero(hand)] for hand in deal]
+
+
+def array_to_pbn(deal: DealArray) -> str:
+    """Format a (4, 52) boolean array as a PBN deal string, North first."""
+    hands = []
+    for hand in deal:
+        suits = [
+            "".join(
+                CARDS[13 * s + r].rank.value
+                for r in reversed(range(13))
+                if hand[13 * s + r]
+            )
+            for s in reversed(range(NUM_SUITS))
+        ]
+        hands.append(".".join(suits))
+    return "N:" + " ".join(hands)
+
+
+def array_to_deal(deal: DealArray) -> "Deal":
+    """Convert a (4, 52) boolean array into an endplay ``Deal``."""
+    from endplay.types import Deal
+
+    return Deal(array_to_pbn(deal))
+
+
+def array_to_owners(deals: np.ndarray) -> np.ndarray:
+    """Convert (..., 4, 52) boolean deals to (..., 52) owner seats."""
+    return deals.argmax(axis=-2).astype(np.uint8)
+
+
+def owners_to_array(owners: np.ndarray) -> np.ndarray:
+    """Convert (..., 52) owner seats to (..., 4, 52) boolean deals."""
+    return owners[..., None, :] == np.arange(NUM_SEATS)[:, None]
@@ -0,0 +1,288 @@
+"""Secondary indexes over a game log.
+
+Each log record gets one row of small integer columns (contract level and
+strain, declarer, tricks, result, agent ids, HCP per seat). For every column
+the index also stores the row order that sorts it, so a predicate is answered
+with two binary searches instead of a scan. Indexes live next to the log in
+``<log>.idx.npz`` and are built as records are appended. The stored index
+records how many bytes of the log it covers, so records appended without
+updating it are picked up when it is next opened.
+
+Queries return record offsets, which ``GameLogReader.read`` accepts.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from dealer import HCP_BY_CARD
+from game_log import MAGIC, GameLogReader, GameLogWriter, GameRecord
+from models.card import Suit
+
+# Column -> dtype
+COLUMNS: Dict[str, type] = {
+    "offset": np.int64,
+    "level": np.int8,  # 0 if passed out
+    "strain": np.int8,  # Suit index, -1 if passed out
+    "declarer": np.int8,  # -1 if passed out
+    "tricks": np.int8,  # Tricks won by the declaring side
+    "result": np.int8,  # Over/undertricks, 0 if passed out
+    "declarer_score": np.int16,
+    **{f"agent_{seat}": np.int16 for seat in range(4)},
+    **{f"hcp_{seat}": np.int8 for seat in range(4)},
+}
+
+# Columns that get a sorted index
+INDEXED = [name for name in COLUMNS if name != "offset"]
+
+Range = Union[int, Tuple[int, int]]
+
+
+def index_path(log_path: str) -> str:
+    return log_path + ".idx.npz"
+
+
+class GameIndex:
+    """Column store with sorted indexes over the records of one game log."""
+
+    def __init__(self):
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.sorted_rows: Dict[str, np.ndarray] = {
+            name: np.zeros(0, dtype=np.int64) for name in INDEXED
+        }
+        self._sorted_values: Dict[str, np.ndarray] = {
+            name: self.columns[name] for name in INDEXED
+        }
+        self.agent_ids: List[str] = []
+        self._agent_codes: Dict[str, int] = {}
+        self._pending: Dict[str, list] = {name: [] for name in COLUMNS}
+        self._pending_deals = bytearray()
+        # Bytes of the log covered by the index, 0 if unknown
+        self.log_length = 0
+
+    def __len__(self) -> int:
+        return len(self.columns["offset"]) + len(self._pending["offset"])
+
+    def _agent_code(self, agent_id: str) -> int:
+        code = self._agent_codes.get(agent_id)
+        if code is None:
+            code = self._agent_codes[agent_id] = len(self.agent_ids)
+            self.agent_ids.append(agent_id)
+        return code
+
+    def add(self, offset: int, record: GameRecord) -> None:
+        """Add a record to the index."""
+        level = (record.contract - 1) // 5 + 1 if record.contract else 0
+        pending = self._pending
+        pending["offset"].append(offset)
+        pending["level"].append(level)
+        pending["strain"].append((record.contract - 1) % 5 if record.contract else -1)
+        pending["declarer"].append(record.declarer)
+        pending["tricks"].append(record.declarer_tricks)
+        pending["result"].append(record.declarer_tricks - 6 - level if level else 0)
+        pending["declarer_score"].append(
+            record.scores[record.declarer] if record.contract else 0
+        )
+        for seat, agent_id in enumerate(record.agent_ids):
+            pending[f"agent_{seat}"].append(self._agent_code(agent_id))
+        self._pending_deals += record.deal
+
+    def _merge_pending(self) -> None:
+        """Move pending rows into the column arrays and the sorted indexes."""
+        if not self._pending["offset"]:
+            return
+
+        # HCP per seat for all pending deals at once
+        seats = np.frombuffer(bytes(self._pending_deals), dtype=np.uint8).reshape(
+            -1, 52
+        )
+        hcp = ((seats[:, None, :] == np.arange(4)[None, :, None]) * HCP_BY_CARD).sum(
+            axis=2
+        )
+        for seat in range(4):
+            self._pending[f"hcp_{seat}"] = hcp[:, seat]
+
+        first_row = len(self.columns["offset"])
+        for name, dtype in COLUMNS.items():
+            values = np.asarray(self._pending[name], dtype=dtype)
+            self.columns[name] = np.concatenate([self.columns[name], values])
+            self._pending[name] = []
+            if name not in INDEXED:
+                continue
+
+            # Sort only the new rows and insert them after the equal old ones,
+            # which keeps the order of a stable sort of all rows
+            order = np.argsort(values, kind="stable")
+            values = values[order]
+            sorted_values = self._sorted_values[name]
+            positions = np.searchsorted(sorted_values, values, side="right")
+            self.sorted_rows[name] = np.insert(
+                self.sorted_rows[name], positions, first_row + order.astype(np.int64)
+            )
+            self._sorted_values[name] = np.insert(sorted_values, positions, values)
+        self._pending_deals = bytearray()
+
+    def _sort_values(self) -> None:
+        self._sorted_values = {
+            name: self.columns[name][rows] for name, rows in self.sorted_rows.items()
+        }
+
+    def _rows_in_range(self, name: str, low: int, high: int) -> np.ndarray:
+        """Rows whose column value lies in [low, high], using the sorted index."""
+        rows = self.sorted_rows[name]
+        values = self._sorted_values[name]
+        start = np.searchsorted(values, low, side="left")
+        end = np.searchsorted(values, high, side="right")
+        return rows[start:end]
+
+    def query(
+        self,
+        level: Optional[Range] = None,
+        strain: Optional[Suit] = None,
+        declarer: Optional[int] = None,
+        result: Optional[Range] = None,
+        went_down: Optional[bool] = None,
+        tricks: Optional[Range] = None,
+        agents: Optional[Dict[int, str]] = None,
+        hcp: Optional[Dict[int, Range]] = None,
+    ) -> np.ndarray:
+        """
+        Find records matching all the given conditions.
+
+        Ranges are a single value or an inclusive (low, high) pair.
+
+        Args:
+            level: Contract level
+            strain: Contract strain
+            declarer: Declarer seat
+            result: Over/undertricks of the contract
+            went_down: Only failed (True) or made (False) contracts
+            tricks: Tricks won by the declaring side
+            agents: Agent id per seat
+            hcp: HCP range per seat
+
+        Returns:
+            Sorted offsets of the matching records
+        """
+        self._merge_pending()
+
+        conditions: List[Tuple[str, int, int]] = []
+
+        def add(name: str, value: Range) -> None:
+            low, high = value if isinstance(value, tuple) else (value, value)
+            conditions.append((name, low, high))
+
+        if level is not None:
+            add("level", level)
+        if strain is not None:
+            add("strain", strain.index)
+        if declarer is not None:
+            add("declarer", declarer)
+        if result is not None:
+            add("result", result)
+        if went_down is not None:
+            add("level", (1, 7))
+            add("result", (-13, -1) if went_down else (0, 7))
+        if tricks is not None:
+            add("tricks", tricks)
+        for seat, agent_id in (agents or {}).items():
+            code = self._agent_codes.get(agent_id)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            add(f"agent_{seat}", code)
+        for seat, value in (hcp or {}).items():
+            add(f"hcp_{seat}", value)
+
+        if not conditions:
+            return self.columns["offset"].copy()
+
+        # Start from the most selective condition and filter the rest directly
+        candidates = [self._rows_in_range(*condition) for condition in conditions]
+        best = min(range(len(conditions)), key=lambda i: len(candidates[i]))
+        rows = candidates[best]
+        for i, (name, low, high) in enumerate(conditions):
+            if i != best:
+                values = self.columns[name][rows]
+                rows = rows[(values >= low) & (values <= high)]
+
+        return np.sort(self.columns["offset"][rows])
+
+    def save(self, path: str) -> None:
+        self._merge_pending()
+        np.savez(
+            path,
+            log_length=np.int64(self.log_length),
+            agent_ids=np.array(self.agent_ids, dtype=str),
+            **self.columns,
+            **{f"sorted_{name}": rows for name, rows in self.sorted_rows.items()},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "GameIndex":
+        index = cls()
+        with np.load(path) as data:
+            for name in COLUMNS:
+                index.columns[name] = data[name]
+            for name in INDEXED:
+                # Missing from indexes saved without records by older versions
+                if f"sorted_{name}" in data:
+                    index.sorted_rows[name] = data[f"sorted_{name}"]
+            index.agent_ids = [str(agent_id) for agent_id in data["agent_ids"]]
+            if "log_length" in data:
+                index.log_length = int(data["log_length"])
+        index._agent_codes = {a: code for code, a in enumerate(index.agent_ids)}
+        index._sort_values()
+        return index
+
+    @classmethod
+    def build(cls, log_path: str) -> "GameIndex":
+        """Build the index of an existing log by scanning it."""
+        index = cls()
+        index.update(log_path)
+        return index
+
+    def update(self, log_path: str) -> None:
+        """Add the records appended to the log since ``log_length``."""
+        with GameLogReader(log_path) as reader:
+            for offset, record in reader.records(max(self.log_length, len(MAGIC))):
+                self.add(offset, record)
+            self.log_length = reader.size
+        self._merge_pending()
+
+    @classmethod
+    def open(cls, log_path: str) -> "GameIndex":
+        """
+        Load the index stored next to a log and add the records it is missing.
+
+        The index is rebuilt if it is missing, predates ``log_length`` or
+        covers more than the log holds.
+        """
+        path = index_path(log_path)
+        if os.path.exists(path):
+            index = cls.load(path)
+            if 0 < index.log_length <= os.path.getsize(log_path):
+                index.update(log_path)
+                return index
+        return cls.build(log_path)
+
+
+class IndexedGameLogWriter(GameLogWriter):
+    """Game log writer that keeps the log's index up to date."""
+
+    def __init__(self, path: str, batch_size: int = 256):
+        existed = os.path.exists(path) and os.path.getsize(path) > 0
+        super().__init__(path, batch_size)
+        self.index = GameIndex.open(path) if existed else GameIndex()
+
+    def append_record(self, record: GameRecord) -> int:
+        offset = super().append_record(record)
+        self.index.add(offset, record)
+        return offset
+
+    def close(self) -> None:
+        super().close()
+        self.index.log_length = self._offset
+        self.index.save(index_path(self.path))
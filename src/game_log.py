@@ -0,0 +1,312 @@
+"""Append-only streaming log of played games.
+
+Every game is stored as one compact binary record: the deal as the seat
+holding each card, the dealer, the auction as bid ordinals, the cards played
+as card indices, and the result. Records are written through a buffered
+writer and can be read back sequentially or by offset, and replayed into a
+``Game``.
+
+Seats are indices into ``Game.players``.
+"""
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from models.bid import Bid, bid_ordinal, ordinal_to_bid
+from models.card import Card, Suit, CARDS, card_index
+from models.game import Game
+from models.player import Player
+
+MAGIC = b"BRIDGELOG1\n"
+
+# record length, dealer, declarer, contract, declarer tricks, 4 scores,
+# auction length, number of plays, 4 agent id lengths
+_HEADER = struct.Struct("<HBbBB4hBB4B")
+
+
+@dataclass
+class GameRecord:
+    """Compact record of one played deal."""
+
+    deal: bytes  # Seat holding each card, by card index
+    dealer: int
+    auction: bytes  # Bid ordinals in bidding order, starting with the dealer
+    plays: bytes  # Card indices in play order, empty if passed out
+    declarer: int  # Declarer seat, -1 if passed out
+    contract: int  # Bid ordinal of the contract, 0 if passed out
+    declarer_tricks: int  # Tricks won by the declaring side
+    scores: Tuple[int, int, int, int]
+    agent_ids: Tuple[str, str, str, str]
+
+    @classmethod
+    def from_game(
+        cls, game: Game, agent_ids: Optional[Sequence[str]] = None
+    ) -> "GameRecord":
+        """
+        Build a record from a finished game.
+
+        Args:
+            game: The game, after ``play()``
+            agent_ids: Identifier per seat, the agent class names by default
+
+        Returns:
+            The game record
+        """
+        seats = {player: seat for seat, player in enumerate(game.players)}
+        deal = bytearray(52)
+        plays = bytearray()
+        declarer_tricks = 0
+        declarer_side = seats[game.declarer] % 2 if game.declarer else None
+
+        # Played cards come from the tricks, the rest are still in the hands
+        for trick in game.tricks_played:
+            for player, card in trick.cards_played.items():
+                index = card_index(card)
+                deal[index] = seats[player]
+                plays.append(index)
+            if seats[trick.get_winner()] % 2 == declarer_side:
+                declarer_tricks += 1
+        for seat, player in enumerate(game.players):
+            for card in player.hand:
+                deal[card_index(card)] = seat
+
+        if agent_ids is None:
+            agent_ids = [type(player).__name__ for player in game.players]
+
+        return cls(
+            deal=bytes(deal),
+            dealer=game.dealer_index,
+            auction=bytes(bid_ordinal(bid) for bid in game.auction),
+            plays=bytes(plays),
+            declarer=seats[game.declarer] if game.declarer else -1,
+            contract=bid_ordinal(game.contract) if game.contract else 0,
+            declarer_tricks=declarer_tricks,
+            scores=tuple(game.score[player] for player in game.players),
+            agent_ids=tuple(agent_ids),
+        )
+
+    @property
+    def contract_bid(self) -> Optional[Bid]:
+        return ordinal_to_bid(self.contract) if self.contract else None
+
+    def hands(self) -> List[List[Card]]:
+        """The deal as 4 card lists in seat order."""
+        hands: List[List[Card]] = [[], [], [], []]
+        for index, seat in enumerate(self.deal):
+            hands[seat].append(CARDS[index])
+        return hands
+
+    def bids(self) -> List[Bid]:
+        return [ordinal_to_bid(ordinal) for ordinal in self.auction]
+
+    def cards(self) -> List[Card]:
+        return [CARDS[index] for index in self.plays]
+
+    def encode(self) -> bytes:
+        ids = [agent_id.encode() for agent_id in self.agent_ids]
+        length = (
+            _HEADER.size
+            + len(self.deal)
+            + len(self.auction)
+            + len(self.plays)
+            + sum(len(i) for i in ids)
+        )
+        header = _HEADER.pack(
+            length,
+            self.dealer,
+            self.declarer,
+            self.contract,
+            self.declarer_tricks,
+            *self.scores,
+            len(self.auction),
+            len(self.plays),
+            *(len(i) for i in ids),
+        )
+        return b"".join([header, self.deal, self.auction, self.plays, *ids])
+
+    @classmethod
+    def decode(cls, buffer, offset: int = 0) -> Tuple["GameRecord", int]:
+        """
+        Decode a record.
+
+        Args:
+            buffer: Bytes-like object holding the record
+            offset: Position of the record in the buffer
+
+        Returns:
+            The record and the offset of the next one
+        """
+        fields = _HEADER.unpack_from(buffer, offset)
+        length, dealer, declarer, contract, declarer_tricks = fields[:5]
+        scores = fields[5:9]
+        auction_length, plays_length = fields[9:11]
+        id_lengths = fields[11:15]
+
+        position = offset + _HEADER.size
+        chunks = []
+        for size in (52, auction_length, plays_length, *id_lengths):
+            chunks.append(bytes(buffer[position : position + size]))
+            position += size
+
+        record = cls(
+            deal=chunks[0],
+            dealer=dealer,
+            auction=chunks[1],
+            plays=chunks[2],
+            declarer=declarer,
+            contract=contract,
+            declarer_tricks=declarer_tricks,
+            scores=scores,
+            agent_ids=tuple(chunk.decode() for chunk in chunks[3:]),
+        )
+        return record, offset + length
+
+
+class GameLogWriter:
+    """Appends game records to a log file, writing them out in batches."""
+
+    def __init__(self, path: str, batch_size: int = 256):
+        """
+        Args:
+            path: Log file, created if missing and appended to otherwise
+            batch_size: Number of records buffered before writing to disk
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._offset = self._file.tell()
+        self._buffer = bytearray()
+        self._pending = 0
+
+    def append(self, game: Game, agent_ids: Optional[Sequence[str]] = None) -> int:
+        """
+        Append a finished game to the log.
+
+        Args:
+            game: The game, after ``play()``
+            agent_ids: Identifier per seat, the agent class names by default
+
+        Returns:
+            Offset of the record in the log
+        """
+        return self.append_record(GameRecord.from_game(game, agent_ids))
+
+    def append_record(self, record: GameRecord) -> int:
+        """Append a record to the log and return its offset."""
+        offset = self._offset + len(self._buffer)
+        self._buffer += record.encode()
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+        return offset
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._offset += len(self._buffer)
+            self._buffer.clear()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameLogReader:
+    """Reads game records from a log file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else b""
+        )
+        if self._data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a game log")
+
+    def __iter__(self) -> Iterator[Tuple[int, GameRecord]]:
+        """Yield (offset, record) for every record in the log."""
+        return self.records()
+
+    def records(self, start: int = len(MAGIC)) -> Iterator[Tuple[int, GameRecord]]:
+        """Yield (offset, record) for the records from offset ``start`` on."""
+        offset = start
+        while offset < len(self._data):
+            record, next_offset = GameRecord.decode(self._data, offset)
+            yield offset, record
+            offset = next_offset
+
+    def read(self, offset: int) -> GameRecord:
+        """Read the record at the given offset."""
+        return GameRecord.decode(self._data, offset)[0]
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "GameLogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _ReplayPlayer(Player):
+    """Player that repeats the bids and cards of a recorded game."""
+
+    def __init__(self, name: str, bids: List[Bid], cards: List[Card]):
+        super().__init__(name)
+        self._bids = iter(bids)
+        self._cards = iter(cards)
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        return next(self._bids)
+
+    def choose_card(
+        self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
+    ) -> Card:
+        return next(self._cards)
+
+
+def replay(record: GameRecord) -> Game:
+    """
+    Replay a record through the game engine.
+
+    Args:
+        record: The game record
+
+    Returns:
+        The finished game, with its auction, tricks, contract and score
+    """
+    seat_bids: List[List[Bid]] = [[], [], [], []]
+    for i, bid in enumerate(record.bids()):
+        seat_bids[(record.dealer + i) % 4].append(bid)
+    seat_cards: List[List[Card]] = [[], [], [], []]
+    for card in record.cards():
+        seat_cards[record.deal[card_index(card)]].append(card)
+
+    players = [
+        _ReplayPlayer(agent_id, seat_bids[seat], seat_cards[seat])
+        for seat, agent_id in enumerate(record.agent_ids)
+    ]
+    game = Game(players)
+    game.dealer_index = record.dealer
+    game.play(hands=record.hands())
+    return game
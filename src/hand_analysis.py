@@ -1,12 +1,17 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from models.game import Game
 from models.card import Suit
 from convert_api import game_to_deal
-from endplay.dds import calc_dd_table, ddtable, par
-from endplay.types import Denom, Player, Vul
 from collections import defaultdict
 from random import shuffle
 from statistics import median
 
+# endplay is imported where it is used, it is slow to load
+if TYPE_CHECKING:
+    from endplay.dds import ddtable
+
 """
 Analyse the theoretical contract based on double dummy analysis
 
@@ -21,6 +26,8 @@ Returns:
 
 
 def analyse_contract(game: Game) -> ddtable:
+    from endplay.dds import calc_dd_table
+
     hand_endplay = game_to_deal(game)
     table = calc_dd_table(hand_endplay)
     table.pprint()
@@ -34,6 +41,9 @@ Repeat and get the expected winnning tricks for each suite
 Get the optimal score
 """
 def get_suitable_score(game: Game) -> int:
+    from endplay.dds import par
+    from endplay.types import Player, Vul
+
     hand_endplay = game_to_deal(game)
     east = hand_endplay.east.__str__().split('.')
     west = hand_endplay.west.__str__().split('.')
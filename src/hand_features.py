@@ -0,0 +1,81 @@
+"""Vectorized hand features over batches of deals.
+
+Works on the (N, 4, 52) boolean deal arrays produced by ``dealer``; every
+feature is computed for all 4N hands at once.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+import suit_tables
+from dealer import NUM_SUITS, distribution_points, is_balanced
+
+# Suit holding tables as arrays, indexed by 13-bit suit mask
+SUIT_HCP = np.array(suit_tables.SUIT_HCP, dtype=np.int8)
+QUICK_TRICKS = np.array(suit_tables.QUICK_TRICKS, dtype=np.float32)
+LOSING_TRICKS = np.array(suit_tables.LOSING_TRICKS, dtype=np.int8)
+SUIT_QUALITY = np.array(suit_tables.SUIT_QUALITY)
+
+_RANK_BITS = 1 << np.arange(13, dtype=np.int16)
+
+
+@dataclass
+class HandFeatures:
+    """Features of every hand in a batch of deals.
+
+    Arrays have shape (N, 4) per hand, or (N, 4, 4) per hand and suit with
+    suits in ``SUIT_INDEX`` order.
+    """
+
+    hcp: np.ndarray
+    quick_tricks: np.ndarray
+    suit_lengths: np.ndarray
+    distribution_points: np.ndarray
+    balanced: np.ndarray
+    losing_trick_count: np.ndarray
+    suit_quality: np.ndarray
+
+    @property
+    def total_points(self) -> np.ndarray:
+        return self.hcp + self.distribution_points
+
+
+def suit_masks(deals: np.ndarray) -> np.ndarray:
+    """
+    Holding mask of every suit of every hand.
+
+    Args:
+        deals: (..., 52) boolean card array
+
+    Returns:
+        (..., 4) 13-bit suit masks
+    """
+    by_suit = deals.reshape(*deals.shape[:-1], NUM_SUITS, 13)
+    return by_suit @ _RANK_BITS
+
+
+def extract_features(deals: np.ndarray) -> HandFeatures:
+    """
+    Compute hand features for a batch of deals.
+
+    Args:
+        deals: (N, 4, 52) boolean deal array
+
+    Returns:
+        Features of all hands
+    """
+    masks = suit_masks(deals)
+    suit_lengths = deals.reshape(*deals.shape[:-1], NUM_SUITS, 13).sum(
+        axis=-1, dtype=np.int8
+    )
+
+    return HandFeatures(
+        hcp=SUIT_HCP[masks].sum(axis=-1),
+        quick_tricks=QUICK_TRICKS[masks].sum(axis=-1),
+        suit_lengths=suit_lengths,
+        distribution_points=distribution_points(suit_lengths),
+        balanced=is_balanced(suit_lengths),
+        losing_trick_count=LOSING_TRICKS[masks].sum(axis=-1),
+        suit_quality=SUIT_QUALITY[masks],
+    )
@@ -1,16 +1,14 @@
 from models.game import Game
-from agents.human_agent import HumanAgent
-from agents.random_agent import RandomAgent
-from agents.heuristic_agent import HeuristicAgent
+from agents.registry import create_agent
 
 
 def main():
     # Create players - one human player and three random agents
     players = [
-        HumanAgent("You"),
-        RandomAgent("Bot 1"),
-        HeuristicAgent("Heuristic 2"),
-        RandomAgent("Bot 3"),
+        create_agent("human", "You"),
+        create_agent("random", "Bot 1"),
+        create_agent("heuristic", "Heuristic 2"),
+        create_agent("random", "Bot 3"),
     ]
 
     # Create and play the game
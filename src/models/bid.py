@@ -1,5 +1,5 @@
 from typing import Optional
-from .card import Suit, Compare_Suits
+from .card import Suit, Compare_Suits, SUIT_INDEX
 
 
 class Bid:
@@ -47,3 +47,21 @@ class Bid:
             return "Pass"
         suit_str = self.suit.value if self.suit else ""
         return f"{self.number} {suit_str}"
+
+
+# Suits ordered by suit index
+_SUITS = list(SUIT_INDEX)
+
+
+def bid_ordinal(bid: Bid) -> int:
+    """Position of a bid in bidding order: 0 for pass, then 1 (1♣) to 35 (7NT)."""
+    if bid.is_pass:
+        return 0
+    return 5 * (bid.number - 1) + SUIT_INDEX[bid.suit] + 1
+
+
+def ordinal_to_bid(ordinal: int) -> Bid:
+    """Inverse of ``bid_ordinal``."""
+    if ordinal == 0:
+        return Bid(0)
+    return Bid((ordinal - 1) // 5 + 1, _SUITS[(ordinal - 1) % 5])
@@ -1,17 +1,29 @@
 from typing import List, Optional, Dict, Tuple
-from .card import Suit, Compare_Suits
+from .card import SUIT_INDEX
 from .player import Player
-from .bid import Bid
+from .bid import Bid, bid_ordinal
+
+# All contract bids in bidding order, shared by every auction
+_CONTRACT_BIDS: List[Bid] = [
+    Bid(number, suit) for number in range(1, 8) for suit in SUIT_INDEX
+]
+_PASS = Bid(0)
 
 
 class Bidding:
     def __init__(self, players: List[Player], dealer_index: int):
         self.players = players
+        self.bids: Dict[Player, Optional[Bid]] = {player: None for player in players}
+        self.reset(dealer_index)
+
+    def reset(self, dealer_index: int):
+        """Start a new auction with the same players."""
         self.dealer_index = dealer_index
         self.current_player_index = dealer_index  # dealer starts bidding
-        self.bids: Dict[Player, Optional[Bid]] = {player: None for player in players}
+        for player in self.bids:
+            self.bids[player] = None
         self.passes = 0
-        self.highest_bid = Bid(0)  # Pass bid
+        self.highest_bid = _PASS  # Pass bid
         self.highest_bidder: Optional[Player] = None
         self.current_declarer: int = -1
 
@@ -22,25 +34,8 @@ class Bidding:
         Returns:
             List of valid bids
         """
-        valid_bids = []
-        current_highest = self.highest_bid.number
-
-        # Can always pass
-        valid_bids.append(Bid(0))  # Pass bid
-
-        # Generate valid bids
-        for number in range(max(1, current_highest), 8):
-            for suit in Suit:
-                if number > current_highest or (
-                    number == current_highest
-                    and (
-                        not self.highest_bid.suit
-                        or Compare_Suits(self.highest_bid.suit, suit)
-                    )
-                ):
-                    valid_bids.append(Bid(number, suit))
-
-        return valid_bids
+        # Can always pass, or bid anything above the highest bid
+        return [_PASS, *_CONTRACT_BIDS[bid_ordinal(self.highest_bid) :]]
 
     def make_bid(self, bid: Bid) -> bool:
         """
@@ -94,3 +94,17 @@ class Card:
 
     def __hash__(self):
         return hash((self.suit, self.rank))
+
+
+# Cards of a standard deck ordered by card index
+CARDS = tuple(
+    Card(suit, rank)
+    for suit in SUIT_INDEX
+    if suit != Suit.NO_TRUMP
+    for rank in RANK_INDEX
+)
+
+
+def card_index(card: Card) -> int:
+    """Index of a card in the 52-card encoding (13 * suit index + rank index)."""
+    return 13 * SUIT_INDEX[card.suit] + RANK_INDEX[card.rank]
@@ -1,6 +1,6 @@
 import random
 from typing import List
-from .card import Card, Suit, Rank
+from .card import Card, Suit, Rank, CARDS
 
 
 class Deck:
@@ -14,6 +14,10 @@ class Deck:
             Card(suit, rank) for suit in Suit if suit != Suit.NO_TRUMP for rank in Rank
         ]
 
+    def reset(self):
+        """Put all 52 cards back in the deck, in the original order."""
+        self.cards[:] = CARDS
+
     def shuffle(self):
         """Shuffles the deck of cards."""
         random.shuffle(self.cards)
@@ -35,7 +39,7 @@ class Deck:
             raise ValueError("Not enough cards in deck")
 
         dealt_cards = self.cards[:num_cards]
-        self.cards = self.cards[num_cards:]
+        del self.cards[:num_cards]
         return dealt_cards
 
     def __len__(self):
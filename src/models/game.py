@@ -1,49 +1,163 @@
-from typing import List, Optional
+from typing import Callable, Generator, List, Optional, Union
 import random
 from .deck import Deck
 from .player import Player
 from .bidding import Bidding
 from .bid import Bid
 from .trick import Trick
+from .card import Card, Suit
+
+
+class Decision:
+    """A bid or card the game needs from a player, yielded by ``Game.steps``."""
+
+    __slots__ = ("player", "valid_bids", "valid_cards", "trick_suit")
+
+    def __init__(
+        self,
+        player: Player,
+        valid_bids: Optional[List[Bid]] = None,
+        valid_cards: Optional[List[Card]] = None,
+        trick_suit: Optional[Suit] = None,
+    ):
+        self.player = player
+        self.valid_bids = valid_bids
+        self.valid_cards = valid_cards
+        self.trick_suit = trick_suit
+
+    @property
+    def is_bid(self) -> bool:
+        return self.valid_bids is not None
 
 
 class Game:
-    def __init__(self, players: List[Player]):
+    def __init__(self, players: List[Player], keep_history: bool = True):
+        """
+        Args:
+            players: The 4 players, in seat order
+            keep_history: Keep every deal's ``tricks_played`` and ``auction``.
+                If False, one set of ``Trick`` objects and lists is reused
+                for every deal, so they are only valid until the next deal
+                starts.
+        """
         if len(players) != 4:
             raise ValueError("Bridge requires exactly 4 players")
         self.players = players
+        self.keep_history = keep_history
         self.dealer_index = random.randint(0, 3)
         self.current_trick: Optional[Trick] = None
         self.tricks_played = []
+        self.auction: List[Bid] = []
         self.declarer: Optional[Player] = None
         self.contract: Optional[Bid] = None
         self.score = {player: 0 for player in players}
+        # Called as trick_observer(game, trick) after each completed trick
+        self.trick_observer: Optional[Callable[["Game", Trick], None]] = None
+
+        # Reused by every deal
+        self._deck = Deck()
+        self._bidding = Bidding(players, self.dealer_index)
+        self._decision = Decision(players[0])
+        self._tricks: Optional[List[Trick]] = (
+            None if keep_history else [Trick(players[0], None) for _ in range(13)]
+        )
+
+    def new_deal(self, dealer_index: Optional[int] = None):
+        """
+        Prepare the next deal with the same players.
+
+        Args:
+            dealer_index: Dealer of the next deal, chosen at random if None
+        """
+        self.dealer_index = (
+            random.randint(0, 3) if dealer_index is None else dealer_index
+        )
+        self.reset()
+
+    def reset(self):
+        """Clear the players' hands and tricks and the state of the last deal."""
+        for player in self.players:
+            player.reset()
+            self.score[player] = 0
+        self.current_trick = None
+        self.declarer = None
+        self.contract = None
+        if self.keep_history:
+            self.tricks_played = []
+            self.auction = []
+        else:
+            self.tricks_played.clear()
+            self.auction.clear()
 
-    def play(self):
-        """Play a complete game of bridge."""
+    def play(
+        self, hands: Optional[List[List[Card]]] = None, bidding_only: bool = False
+    ):
+        """
+        Play a complete game of bridge.
+
+        Args:
+            hands: Predetermined hands in player order, dealt at random if None
+            bidding_only: Stop after the auction, see ``steps``
+        """
+        steps = self.steps(hands, bidding_only)
+        decision = next(steps, None)
+        while decision is not None:
+            player = decision.player
+            if decision.is_bid:
+                choice = player.make_bid(decision.valid_bids)
+            else:
+                choice = player.choose_card(decision.valid_cards, decision.trick_suit)
+            try:
+                decision = steps.send(choice)
+            except StopIteration:
+                decision = None
+
+    def steps(
+        self, hands: Optional[List[List[Card]]] = None, bidding_only: bool = False
+    ) -> Generator["Decision", Union[Bid, Card], None]:
+        """
+        Play a game, asking the caller for every bid and card.
+
+        Each yielded ``Decision`` must be answered by sending the chosen bid or
+        card back into the generator. ``play`` answers them by asking the
+        players; other drivers can decide for several games at once. The same
+        ``Decision`` object is updated for every request of a game.
+
+        Args:
+            hands: Predetermined hands in player order, dealt at random if None
+            bidding_only: Stop once the contract is known, without playing or
+                scoring; the caller can score it with ``score_result``
+        """
         # print("\nStarting new game of Bridge")
         # print("Players:", ", ".join(p.name for p in self.players))
 
         # Deal cards
-        self._deal_cards()
+        self.reset()
+        self._deal_cards(hands)
 
         # Bidding phase
-        self._conduct_bidding()
-        if not self.contract:
+        yield from self._conduct_bidding()
+        if not self.contract or bidding_only:
             # print("All players passed. Game over.")
             return
 
         # print(f"\nFinal Contract: {self.contract} " f"by {self.declarer.name}")
 
         # Playing phase
-        self._play_tricks()
+        yield from self._play_tricks()
 
         # Score the game
         self._score_game()
 
-    def _deal_cards(self):
-        """Deal cards to all players."""
-        deck = Deck()
+    def _deal_cards(self, hands: Optional[List[List[Card]]] = None):
+        """Deal cards to all players, or hand out predetermined hands."""
+        if hands is not None:
+            for player, cards in zip(self.players, hands):
+                player.receive_cards(cards)
+            return
+
+        deck = self._deck
+        deck.reset()
         deck.shuffle()
         cards_per_player = len(deck) // len(self.players)
 
@@ -51,15 +165,24 @@ class Game:
             cards = deck.deal(cards_per_player)
             player.receive_cards(cards)
 
-    def _conduct_bidding(self):
+    def _conduct_bidding(self) -> Generator["Decision", Bid, None]:
         """Conduct the bidding phase."""
-        bidding = Bidding(self.players, self.dealer_index)
+        bidding = self._bidding
+        bidding.reset(self.dealer_index)
+        decision = self._decision
+        decision.valid_cards = None
+        decision.trick_suit = None
 
         while True:
             current_player = self.players[bidding.current_player_index]
             valid_bids = bidding.get_valid_bids()
             # Get bid from current player
-            bid = current_player.make_bid(valid_bids)
+            decision.player = current_player
+            decision.valid_bids = valid_bids
+            bid = yield decision
+            self.auction.append(bid)
+            for player in self.players:
+                player.observe_bid(current_player, bid)
             bidding_complete = bidding.make_bid(bid)
 
             # Show current bidding status
@@ -69,7 +192,7 @@ class Game:
                 self.declarer, self.contract = bidding.get_contract()
                 break
 
-    def _play_tricks(self):
+    def _play_tricks(self) -> Generator["Decision", Card, None]:
         """Play out all tricks."""
         if not self.declarer or not self.contract:
             return
@@ -77,11 +200,19 @@ class Game:
         # Start with player to the left of declarer
         current_player_index = (self.players.index(self.declarer) + 1) % 4
         trump_suit = self.contract.suit
+        observer = self.trick_observer
+        tricks = self._tricks
+        decision = self._decision
+        decision.valid_bids = None
 
         # Play 13 tricks
-        for _ in range(13):
+        for trick_number in range(13):
             leader = self.players[current_player_index]
-            self.current_trick = Trick(leader, trump_suit)
+            if tricks is None:
+                self.current_trick = Trick(leader, trump_suit)
+            else:
+                self.current_trick = tricks[trick_number]
+                self.current_trick.reset(leader, trump_suit)
             # print(f"\nTrick {len(self.tricks_played) + 1}:")
 
             # Each player plays a card
@@ -90,7 +221,10 @@ class Game:
                 valid_cards = self.current_trick.get_valid_cards(player)
 
                 # Get card from current player
-                card = player.choose_card(valid_cards, self.current_trick.leading_suit)
+                decision.player = player
+                decision.valid_cards = valid_cards
+                decision.trick_suit = self.current_trick.leading_suit
+                card = yield decision
                 player.play_card(card)
                 self.current_trick.play_card(player, card)
 
@@ -104,6 +238,8 @@ class Game:
 
             self.tricks_played.append(self.current_trick)
             current_player_index = self.players.index(winner)
+            if observer is not None:
+                observer(self, self.current_trick)
 
     def _score_game(self):
         """Score the completed game."""
@@ -113,11 +249,23 @@ class Game:
         # Get declarer's team tricks
         declarer_index = self.players.index(self.declarer)
         partner_index = (declarer_index + 2) % 4
-        declarer_team_tricks = (
+        self.score_result(
             self.players[declarer_index].tricks_won
             + self.players[partner_index].tricks_won
         )
 
+    def score_result(self, declarer_team_tricks: int):
+        """
+        Score the contract as if the declarer's side took the given tricks.
+
+        Args:
+            declarer_team_tricks: Tricks taken by the declarer and partner
+        """
+        if not self.declarer or not self.contract:
+            return
+        declarer_index = self.players.index(self.declarer)
+        partner_index = (declarer_index + 2) % 4
+
         # Calculate if contract was made
         tricks_needed = 6 + self.contract.number
         contract_made = declarer_team_tricks >= tricks_needed
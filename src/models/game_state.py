@@ -0,0 +1,279 @@
+"""Compact card-play state for search agents.
+
+``Game`` plays through ``Player`` objects and changes them in place, so it
+cannot look ahead. ``GameState`` holds the same information as the play
+phase of a ``Game`` in a few integers: every hand is a 52-bit mask over card
+indices (``13 * SUIT_INDEX[suit] + RANK_INDEX[rank]``), the current trick is
+a short list of card indices and seats are indices into ``Game.players``.
+
+Moves are applied with ``apply`` and taken back with ``undo``, so a search
+can walk the tree on a single state. ``clone`` copies the position in
+constant time and ``key`` is a Zobrist hash that is updated incrementally.
+The rules are those of ``Trick`` and ``Game._play_tricks``.
+"""
+
+import random
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .card import CARDS, Card, Suit, card_index
+
+NUM_SEATS = 4
+NO_TRUMP = 4
+
+# Mask of the 13 cards of each suit
+SUIT_MASKS: Tuple[int, ...] = tuple(0x1FFF << (13 * suit) for suit in range(4))
+
+# Zobrist keys: card held by a seat, card in the current trick, seat on lead
+_rng = random.Random(0x5EED)
+_HAND_KEYS = tuple(
+    tuple(_rng.getrandbits(64) for _ in range(52)) for _ in range(NUM_SEATS)
+)
+_TRICK_KEYS = tuple(_rng.getrandbits(64) for _ in range(52))
+_LEADER_KEYS = tuple(_rng.getrandbits(64) for _ in range(NUM_SEATS))
+del _rng
+
+
+def cards_to_mask(cards: Iterable[Card]) -> int:
+    """52-bit mask of the given cards."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_index(card)
+    return mask
+
+
+def mask_to_indices(mask: int) -> List[int]:
+    """Card indices set in a mask, lowest first."""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+def trick_winner(cards: Sequence[int], leader: int, trump: int) -> int:
+    """
+    Seat winning a complete trick.
+
+    Args:
+        cards: The 4 card indices in the order played
+        leader: Seat that led the trick
+        trump: Trump strain index, ``NO_TRUMP`` for no trump
+
+    Returns:
+        The winning seat
+    """
+    best = 0
+    best_suit = cards[0] // 13
+    for i in range(1, len(cards)):
+        card = cards[i]
+        suit = card // 13
+        if suit == best_suit:
+            if card > cards[best]:
+                best = i
+        elif suit == trump:
+            best = i
+            best_suit = suit
+    return (leader + best) % NUM_SEATS
+
+
+class GameState:
+    """Undoable state of the card play of one deal."""
+
+    __slots__ = ("hands", "trump", "leader", "trick", "tricks_won", "key", "_history")
+
+    def __init__(
+        self,
+        hands: Sequence[int],
+        trump: int,
+        leader: int,
+        trick: Optional[Sequence[int]] = None,
+        tricks_won: Optional[Sequence[int]] = None,
+    ):
+        """
+        Args:
+            hands: Card mask of each seat
+            trump: Trump strain index, ``NO_TRUMP`` for no trump
+            leader: Seat that leads (or led) the current trick
+            trick: Card indices already played to the current trick
+            tricks_won: Tricks won so far by each seat
+        """
+        self.hands = list(hands)
+        self.trump = trump
+        self.leader = leader
+        self.trick = list(trick or ())
+        self.tricks_won = list(tricks_won or (0,) * NUM_SEATS)
+        # (card, completed trick or None, previous leader) per applied move
+        self._history: List[Tuple[int, Optional[List[int]], int]] = []
+
+        key = _LEADER_KEYS[leader]
+        for seat, hand in enumerate(self.hands):
+            for card in mask_to_indices(hand):
+                key ^= _HAND_KEYS[seat][card]
+        for card in self.trick:
+            key ^= _TRICK_KEYS[card]
+        self.key = key
+
+    @classmethod
+    def from_hands(
+        cls, hands: Sequence[Iterable[Card]], trump: Optional[Suit], leader: int
+    ) -> "GameState":
+        """
+        State at the opening lead.
+
+        Args:
+            hands: Cards of each seat in ``Game.players`` order
+            trump: Trump suit of the contract, ``Suit.NO_TRUMP`` or None for no trump
+            leader: Seat on opening lead
+        """
+        strain = NO_TRUMP if trump is None else trump.index
+        return cls([cards_to_mask(hand) for hand in hands], strain, leader)
+
+    @classmethod
+    def from_game(cls, game) -> "GameState":
+        """
+        State of a ``Game`` during card play, e.g. from a ``Game.steps`` decision.
+
+        Args:
+            game: Game whose contract has been determined
+        """
+        if game.contract is None:
+            raise ValueError("The game has no contract to play")
+        players = game.players
+        trick = game.current_trick
+        if trick is None or len(trick.cards_played) == NUM_SEATS:
+            # Before the opening lead or between tricks
+            if trick is None:
+                leader = (players.index(game.declarer) + 1) % NUM_SEATS
+            else:
+                leader = players.index(trick.get_winner())
+            played: List[int] = []
+        else:
+            leader = players.index(trick.leader)
+            played = [card_index(card) for card in trick.cards_played.values()]
+        return cls(
+            [cards_to_mask(player.hand) for player in players],
+            game.contract.suit.index,
+            leader,
+            played,
+            [player.tricks_won for player in players],
+        )
+
+    @property
+    def to_move(self) -> int:
+        """Seat whose turn it is."""
+        return (self.leader + len(self.trick)) % NUM_SEATS
+
+    @property
+    def tricks_left(self) -> int:
+        return (sum(hand.bit_count() for hand in self.hands) + len(self.trick)) // 4
+
+    def is_over(self) -> bool:
+        return not self.trick and not any(self.hands)
+
+    def legal_mask(self) -> int:
+        """Mask of the cards the seat to move may play."""
+        hand = self.hands[self.to_move]
+        if self.trick:
+            following = hand & SUIT_MASKS[self.trick[0] // 13]
+            if following:
+                return following
+        return hand
+
+    def legal_moves(self) -> List[int]:
+        """Card indices the seat to move may play, lowest first."""
+        return mask_to_indices(self.legal_mask())
+
+    def apply(self, card: int) -> None:
+        """
+        Play a card for the seat to move, completing the trick if it is the 4th.
+
+        The card is not checked against ``legal_mask``.
+
+        Args:
+            card: Card index
+        """
+        seat = self.to_move
+        self.hands[seat] &= ~(1 << card)
+        self.trick.append(card)
+        key = self.key ^ _HAND_KEYS[seat][card] ^ _TRICK_KEYS[card]
+
+        completed = None
+        leader = self.leader
+        if len(self.trick) == NUM_SEATS:
+            completed = self.trick
+            for played in completed:
+                key ^= _TRICK_KEYS[played]
+            winner = trick_winner(completed, leader, self.trump)
+            self.tricks_won[winner] += 1
+            self.leader = winner
+            self.trick = []
+            key ^= _LEADER_KEYS[leader] ^ _LEADER_KEYS[winner]
+        self.key = key
+        self._history.append((card, completed, leader))
+
+    def undo(self) -> int:
+        """
+        Take back the last card applied.
+
+        Returns:
+            The card index taken back
+        """
+        card, completed, leader = self._history.pop()
+        key = self.key
+        if completed is not None:
+            winner = self.leader
+            self.tricks_won[winner] -= 1
+            key ^= _LEADER_KEYS[winner] ^ _LEADER_KEYS[leader]
+            for played in completed:
+                key ^= _TRICK_KEYS[played]
+            self.trick = completed
+            self.leader = leader
+        self.trick.pop()
+        seat = self.to_move
+        self.hands[seat] |= 1 << card
+        self.key = key ^ _HAND_KEYS[seat][card] ^ _TRICK_KEYS[card]
+        return card
+
+    def clone(self) -> "GameState":
+        """
+        Copy of the position without its move history.
+
+        Copies a fixed number of small lists and skips hashing, so it costs
+        the same at any point of the deal. The copy cannot undo past this point.
+        """
+        state = GameState.__new__(GameState)
+        state.hands = self.hands.copy()
+        state.trump = self.trump
+        state.leader = self.leader
+        state.trick = self.trick.copy()
+        state.tricks_won = self.tricks_won.copy()
+        state.key = self.key
+        state._history = []
+        return state
+
+    def hand_cards(self, seat: int) -> List[Card]:
+        """Cards still held by a seat."""
+        return [CARDS[card] for card in mask_to_indices(self.hands[seat])]
+
+    def __hash__(self) -> int:
+        return self.key
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (
+            self.hands == other.hands
+            and self.trick == other.trick
+            and self.leader == other.leader
+            and self.trump == other.trump
+            and self.tricks_won == other.tricks_won
+        )
+
+    def __str__(self) -> str:
+        hands = " / ".join(
+            " ".join(str(card) for card in self.hand_cards(seat))
+            for seat in range(NUM_SEATS)
+        )
+        trick = " ".join(str(CARDS[card]) for card in self.trick)
+        return f"Leader {self.leader}, trick [{trick}], won {self.tricks_won}: {hands}"
@@ -7,6 +7,10 @@ from .bid import Bid
 class Player(ABC):
     """Abstract base class for all player types (human, random, AI, etc.)"""
 
+    # Whether decisions depend only on the hand and the options given, which
+    # lets agents.memo cache them
+    deterministic = False
+
     def __init__(self, name: str):
         self.name = name
         self.hand: List[Card] = []
@@ -23,7 +27,7 @@ class Player(ABC):
         return sum(
             HIGH_CARD_POINTS[card.rank]
             for card in self.hand
-            if card.rank in self.HIGH_CARD_POINTS
+            if card.rank in HIGH_CARD_POINTS
         )
 
     def get_suit_distribution(self):
@@ -33,6 +37,11 @@ class Player(ABC):
             if s != Suit.NO_TRUMP
         }
 
+    def reset(self):
+        """Clear the hand and trick count before a new deal."""
+        self.hand.clear()
+        self.tricks_won = 0
+
     def receive_cards(self, cards: List[Card]):
         """Add cards to the player's hand."""
         self.hand.extend(cards)
@@ -51,6 +60,9 @@ class Player(ABC):
         self.hand.remove(card)
         return card
 
+    def observe_bid(self, player: "Player", bid: Bid):
+        """Called for every bid made at the table, including this player's own."""
+
     @abstractmethod
     def make_bid(self, valid_bids: List[Bid]) -> Bid:
         """
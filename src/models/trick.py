@@ -5,9 +5,14 @@ from .player import Player
 
 class Trick:
     def __init__(self, leader: Player, trump_suit: Optional[Suit]):
+        self.cards_played: Dict[Player, Card] = {}
+        self.reset(leader, trump_suit)
+
+    def reset(self, leader: Player, trump_suit: Optional[Suit]):
+        """Empty the trick so it can be played again."""
         self.leader = leader
         self.trump_suit = trump_suit
-        self.cards_played: Dict[Player, Card] = {}
+        self.cards_played.clear()
         self.leading_suit: Optional[Suit] = None
 
     def play_card(self, player: Player, card: Card) -> bool:
@@ -87,7 +92,7 @@ class Trick:
 
         # If suits match, higher rank wins
         if card.suit == current_winner.suit:
-            return card.rank.value > current_winner.rank.value
+            return card.rank.index > current_winner.rank.index
 
         # If suits don't match and no trump, must follow leading suit to win
         return card.suit == self.leading_suit
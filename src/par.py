@@ -0,0 +1,254 @@
+"""Par scores and contracts of whole arrays of double dummy tables.
+
+Par is the result when both sides know every trick count and bid perfectly:
+each side bids its best contract and sacrifices when going down doubled
+costs less than letting the opponents play. It is found by backward
+induction over the 35 contracts, from 7NT down, for all deals at once.
+
+A contract held by one side ends the auction if the other side passes, for
+its undoubled score if it makes and its doubled penalty if it does not;
+otherwise the other side bids something higher. A side declares from the
+partner taking more tricks in the strain. When both sides can make the same
+contract the side that gets to bid first wins it, so the result depends on
+the dealer. As with DDS, the contract reported is the lowest one giving the
+par score that the other side cannot profitably outbid.
+
+Usage:
+    python par.py [--deals N] [--dataset DIR]   (checks against endplay's par)
+"""
+
+import argparse
+import sys
+import time
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from scoring import DOUBLED, NUM_STRAINS, SCORES, UNDOUBLED
+
+NUM_CONTRACTS = 35
+NORTH_SOUTH = 0
+EAST_WEST = 1
+
+# Level and strain of every contract, by contract index (bid ordinal - 1)
+_LEVELS = np.arange(NUM_CONTRACTS) // NUM_STRAINS + 1
+_STRAINS = np.arange(NUM_CONTRACTS) % NUM_STRAINS
+
+
+class Par(NamedTuple):
+    """Par of N deals. Arrays are (N,); level is 0 for a passed out deal."""
+
+    # Score for North-South
+    score: np.ndarray
+    level: np.ndarray
+    strain: np.ndarray
+    declarer: np.ndarray
+    doubled: np.ndarray
+
+
+def contract_results(dd: np.ndarray, vulnerable: np.ndarray) -> np.ndarray:
+    """
+    North-South score of every contract played by either side.
+
+    Args:
+        dd: (N, 5, 4) tricks by strain index and seat
+        vulnerable: (N, 2) vulnerability of North-South and East-West
+
+    Returns:
+        (N, 35, 2) scores by contract index and declaring side, doubled when
+        the contract goes down
+    """
+    # (N, 5, 2) tricks of each side's better declarer
+    tricks = np.maximum(dd[:, :, :2], dd[:, :, 2:]).astype(np.intp)
+    tricks = tricks[:, _STRAINS]
+    needed = (_LEVELS + 6)[None, :, None]
+    doubled = np.where(tricks >= needed, UNDOUBLED, DOUBLED)
+    scores = SCORES[
+        vulnerable[:, None, :].astype(np.intp),
+        doubled,
+        _LEVELS[None, :, None],
+        _STRAINS[None, :, None],
+        tricks,
+    ]
+    scores[:, :, EAST_WEST] *= -1
+    return scores
+
+
+def par(
+    dd: np.ndarray,
+    vulnerable: Union[np.ndarray, bool] = False,
+    dealer: Union[np.ndarray, int] = 0,
+) -> Par:
+    """
+    Par of a batch of deals.
+
+    Args:
+        dd: (N, 5, 4) tricks by strain index and seat, e.g. from
+            ``dd_dataset.dd_tables``
+        vulnerable: Vulnerability of North-South and East-West, broadcast to
+            (N, 2)
+        dealer: Seat of the dealer, broadcast to (N,)
+
+    Returns:
+        Par scores and contracts
+    """
+    dd = np.asarray(dd)
+    n = len(dd)
+    vulnerable = np.broadcast_to(np.asarray(vulnerable, dtype=bool), (n, 2))
+    if vulnerable.ndim != 2:
+        raise ValueError("vulnerable must broadcast to (N, 2)")
+    dealer_side = np.broadcast_to(np.asarray(dealer), (n,)) % 2
+    results = contract_results(dd, vulnerable)
+
+    # values[:, c, side]: par once the side holds contract c and the other
+    # side is to bid. North-South maximize, East-West minimize.
+    values = np.empty_like(results)
+    best_ns = np.full(n, np.iinfo(np.int32).min, dtype=np.int32)
+    best_ew = np.full(n, np.iinfo(np.int32).max, dtype=np.int32)
+    for c in range(NUM_CONTRACTS - 1, -1, -1):
+        values[:, c, NORTH_SOUTH] = np.minimum(results[:, c, NORTH_SOUTH], best_ew)
+        values[:, c, EAST_WEST] = np.maximum(results[:, c, EAST_WEST], best_ns)
+        np.maximum(best_ns, values[:, c, NORTH_SOUTH], out=best_ns)
+        np.minimum(best_ew, values[:, c, EAST_WEST], out=best_ew)
+
+    # Opening bids: the dealer's side, the other side, the dealer's side
+    # again in third seat and the other side in fourth, then passed out
+    ns_first = np.maximum(best_ns, np.minimum(best_ew, np.maximum(best_ns, 0)))
+    ns_first = np.maximum(best_ns, np.minimum(best_ew, ns_first))
+    ew_first = np.minimum(best_ew, np.maximum(best_ns, np.minimum(best_ew, 0)))
+    ew_first = np.minimum(best_ew, np.maximum(best_ns, ew_first))
+    score = np.where(dealer_side == NORTH_SOUTH, ns_first, ew_first)
+
+    # The lowest contract giving the par score that the other side cannot
+    # improve on by outbidding it with any contract of its own
+    outbid = np.empty_like(results)
+    outbid[:, -1, NORTH_SOUTH] = np.iinfo(np.int32).max
+    outbid[:, -1, EAST_WEST] = np.iinfo(np.int32).min
+    outbid[:, :-1, NORTH_SOUTH] = np.minimum.accumulate(
+        results[:, :0:-1, EAST_WEST], axis=1
+    )[:, ::-1]
+    outbid[:, :-1, EAST_WEST] = np.maximum.accumulate(
+        results[:, :0:-1, NORTH_SOUTH], axis=1
+    )[:, ::-1]
+    stable = np.empty(results.shape, dtype=bool)
+    stable[:, :, NORTH_SOUTH] = outbid[:, :, NORTH_SOUTH] >= score[:, None]
+    stable[:, :, EAST_WEST] = outbid[:, :, EAST_WEST] <= score[:, None]
+    final = (results == score[:, None, None]) & stable
+    flat = final.reshape(n, -1)
+    found = flat.any(axis=1)
+    first = flat.argmax(axis=1)
+    contract, side = np.divmod(first, 2)
+
+    strain = _STRAINS[contract]
+    rows = np.arange(n)
+    partner_better = dd[rows, strain, side + 2] > dd[rows, strain, side]
+    tricks = np.maximum(dd[rows, strain, side], dd[rows, strain, side + 2])
+    return Par(
+        score=score,
+        level=np.where(found, _LEVELS[contract], 0),
+        strain=np.where(found, strain, 0),
+        declarer=np.where(found, side + 2 * partner_better, 0),
+        doubled=np.where(found & (tricks < _LEVELS[contract] + 6), DOUBLED, 0),
+    )
+
+
+def _endplay_par(table: np.ndarray, vulnerable: np.ndarray, dealer: int):
+    from endplay._dds import ddTableResults
+    from endplay.dds import par as endplay_par
+    from endplay.dds.ddtable import DDTable
+    from endplay.types import Player, Vul
+
+    from dd_dataset import _ENDPLAY_STRAINS
+
+    results = ddTableResults()
+    for strain in range(NUM_STRAINS):
+        for seat in range(4):
+            results.resTable[_ENDPLAY_STRAINS[strain]][seat] = int(table[strain, seat])
+    vul = [Vul.none, Vul.ns, Vul.ew, Vul.both][vulnerable[0] + 2 * vulnerable[1]]
+    return endplay_par(DDTable(results), vul, Player(dealer))
+
+
+def _verification_tables(
+    num_deals: int, seed: int, dataset: Optional[str]
+) -> np.ndarray:
+    if dataset is not None:
+        from dd_dataset import minibatches
+
+        return next(iter(minibatches(dataset, num_deals, seed=seed)))[1]
+    from dd_dataset import dd_tables
+    from dealer import Dealer
+
+    return dd_tables(Dealer(seed=seed).generate(num_deals))
+
+
+def check_par(dd: np.ndarray, seed: int = 0) -> int:
+    """
+    Compare ``par`` with endplay's ``par`` under random vulnerability and dealer.
+
+    Args:
+        dd: (N, 5, 4) tables to check
+        seed: Seed for the vulnerability and dealer
+
+    Returns:
+        Number of deals whose score differs from endplay's, or whose contract
+        (level, strain, declarer and doubling) is not one of endplay's
+    """
+    from dd_dataset import _ENDPLAY_STRAINS
+
+    rng = np.random.default_rng(seed)
+    vulnerable = rng.integers(0, 2, (len(dd), 2)).astype(bool)
+    dealer = rng.integers(0, 4, len(dd))
+    result = par(dd, vulnerable, dealer)
+
+    mismatches = 0
+    for i, table in enumerate(dd):
+        expected = _endplay_par(table, vulnerable[i], int(dealer[i]))
+        contracts = {
+            # The strain permutation is its own inverse
+            (
+                c.level,
+                _ENDPLAY_STRAINS[int(c.denom)],
+                int(c.declarer),
+                DOUBLED if c.penalty.name == "doubled" else UNDOUBLED,
+            )
+            for c in expected
+            if c.level  # A passed out deal is given as one level 0 contract
+        }
+        contract = (
+            int(result.level[i]),
+            int(result.strain[i]),
+            int(result.declarer[i]),
+            int(result.doubled[i]),
+        )
+        ok = expected.score == result.score[i] and (
+            contract in contracts if result.level[i] else not contracts
+        )
+        mismatches += not ok
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--dataset",
+        default=None,
+        help="dd_dataset directory, solves new deals if not given",
+    )
+    args = parser.parse_args()
+
+    dd = _verification_tables(args.deals, args.seed, args.dataset)
+    mismatches = check_par(dd, args.seed)
+    print(f"{mismatches} mismatches in {len(dd)} deals")
+
+    tables = np.resize(dd, (1_000_000, *dd.shape[1:]))
+    vulnerable = np.random.default_rng(args.seed).integers(0, 2, (len(tables), 2))
+    start = time.perf_counter()
+    par(tables, vulnerable, np.arange(len(tables)) % 4)
+    print(f"par of {len(tables)} deals: {time.perf_counter() - start:.2f} s")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
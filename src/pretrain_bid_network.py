@@ -0,0 +1,234 @@
+"""Supervised pretraining of the RL bid network on double dummy results.
+
+Instead of waiting for sparse rewards from self-play, every deal of a
+``dd_dataset`` directory gives a target for every contract at once: the
+reward ``BridgeTrainer`` would give for ending in that contract, taking the
+double dummy tricks of the bidder's side as the result. The network is
+trained towards these targets for the bids valid in a randomly chosen
+auction context, with one sample per seat of every deal.
+
+Usage:
+    python pretrain_bid_network.py DATA_DIR [--epochs N] [--batch-size N]
+        [--out bid_weights.npz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+from agents.rl_encoding import BID_STATE_SIZE, CARD_STATE_SIZE, PASS_Q
+from dd_dataset import minibatches
+from dealer import NUM_SEATS, owners_to_array
+from models.bid import ordinal_to_bid
+
+if TYPE_CHECKING:
+    from agents.rl_agent import RLAgent
+    from train_rl_agent import BridgeTrainer
+
+# Partner of each seat
+_PARTNER = [2, 3, 0, 1]
+
+
+def bid_reward_table(trainer: BridgeTrainer) -> np.ndarray:
+    """
+    Rewards of the trainer for every contract action.
+
+    Args:
+        trainer: Trainer whose ``_get_reward_for_bid`` defines the rewards
+
+    Returns:
+        (35, 2) reward by action, for a failed (0) and made (1) contract
+    """
+    table = np.zeros((BID_STATE_SIZE, 2), dtype=np.float32)
+    for action in range(BID_STATE_SIZE):
+        bid = ordinal_to_bid(action + 1)
+        for made in (False, True):
+            table[action, int(made)] = trainer._get_reward_for_bid(
+                bid.number, made, bid.suit
+            )
+    return table
+
+
+def build_batch(
+    owners: np.ndarray,
+    dd: np.ndarray,
+    rewards: np.ndarray,
+    rng: np.random.Generator,
+    opening_fraction: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Network inputs and targets for a batch of deals, one sample per seat.
+
+    Each sample gets an auction context: with probability
+    ``opening_fraction`` every bid is still available, otherwise the
+    cheapest valid bid is drawn uniformly. The state encodes it the way
+    ``RLAgent.make_bid`` does.
+
+    Args:
+        owners: (B, 52) seat holding each card
+        dd: (B, 5, 4) double dummy tricks by strain index and seat
+        rewards: (35, 2) output of ``bid_reward_table``
+        rng: Random generator for the auction contexts
+        opening_fraction: Share of samples with every bid available
+
+    Returns:
+        (4B, 87) states, (4B, 35) targets and (4B, 35) masks of valid bids
+    """
+    n = len(owners) * NUM_SEATS
+    hands = owners_to_array(owners).reshape(n, CARD_STATE_SIZE)
+
+    # Tricks of each seat's side, per contract action
+    side_tricks = np.maximum(dd, dd[:, :, _PARTNER]).transpose(0, 2, 1)
+    side_tricks = side_tricks.reshape(n, 5)
+    actions = np.arange(BID_STATE_SIZE)
+    levels = actions // 5 + 1
+    made = side_tricks[:, actions % 5] >= 6 + levels
+    targets = rewards[actions, made.astype(np.int64)]
+
+    cheapest = np.where(
+        rng.random(n) < opening_fraction, 0, rng.integers(0, BID_STATE_SIZE, n)
+    )
+    valid = actions[None, :] >= cheapest[:, None]
+
+    states = np.concatenate([hands, valid], axis=1).astype(np.float32)
+    return states, targets.astype(np.float32), valid
+
+
+def pretrain(
+    agent: RLAgent,
+    rewards: np.ndarray,
+    data_dir: str,
+    epochs: int = 1,
+    batch_size: int = 1024,
+    learning_rate: Optional[float] = None,
+    seed: Optional[int] = None,
+    log_every: int = 100,
+) -> List[float]:
+    """
+    Train an agent's bid network on a DD dataset.
+
+    Args:
+        agent: Agent whose ``bid_q_network`` is trained in place
+        rewards: (35, 2) output of ``bid_reward_table``
+        data_dir: ``dd_dataset`` directory
+        epochs: Passes over the dataset
+        batch_size: Deals per minibatch (four samples each)
+        learning_rate: Overrides the learning rate of the agent's optimizer
+        seed: Seed for shuffling and auction contexts
+        log_every: Print the running loss every this many batches (0 to disable)
+
+    Returns:
+        Loss of every batch
+    """
+    import torch
+
+    rng = np.random.default_rng(seed)
+    batches = minibatches(
+        data_dir,
+        batch_size,
+        epochs,
+        seed=seed,
+        transform=lambda owners, dd: build_batch(owners, dd, rewards, rng),
+    )
+
+    network = agent.bid_q_network
+    optimizer = agent.bid_optimizer
+    if learning_rate is not None:
+        for group in optimizer.param_groups:
+            group["lr"] = learning_rate
+
+    losses = []
+    start = time.perf_counter()
+    network.train()
+    for step, (states, targets, valid) in enumerate(batches, 1):
+        states = torch.from_numpy(states)
+        targets = torch.from_numpy(targets)
+        valid = torch.from_numpy(valid)
+
+        errors = (network(states) - targets) ** 2
+        loss = (errors * valid).sum() / valid.sum()
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        losses.append(loss.item())
+
+        if log_every and step % log_every == 0:
+            recent = np.mean(losses[-log_every:])
+            elapsed = time.perf_counter() - start
+            print(f"Batch {step}: loss {recent:.3f} ({elapsed:.1f}s)")
+    network.eval()
+    return losses
+
+
+def evaluate(
+    agent: RLAgent, rewards: np.ndarray, data_dir: str, batch_size: int = 4096
+) -> Tuple[float, float]:
+    """
+    Opening-bid quality of an agent's bid network on a DD dataset.
+
+    Args:
+        agent: Agent to evaluate
+        rewards: (35, 2) output of ``bid_reward_table``
+        data_dir: ``dd_dataset`` directory
+        batch_size: Deals per forward pass
+
+    Returns:
+        Average reward of the greedy opening choice (pass counting as
+        ``PASS_Q``) and average reward of the best choice
+    """
+    import torch
+
+    rng = np.random.default_rng(0)
+    chosen = best = 0.0
+    count = 0
+    for states, targets, _ in minibatches(
+        data_dir,
+        batch_size,
+        transform=lambda owners, dd: build_batch(owners, dd, rewards, rng, 1.0),
+    ):
+        with torch.no_grad():
+            q_values = agent.bid_q_network(torch.from_numpy(states)).numpy()
+        actions = q_values.argmax(axis=1)
+        greedy = targets[np.arange(len(targets)), actions]
+        greedy[q_values.max(axis=1) <= PASS_Q] = PASS_Q
+        chosen += greedy.sum()
+        best += np.maximum(targets.max(axis=1), PASS_Q).sum()
+        count += len(targets)
+    return chosen / count, best / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--learning-rate", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default="bid_weights.npz")
+    args = parser.parse_args()
+
+    from train_rl_agent import BridgeTrainer
+
+    trainer = BridgeTrainer(num_episodes=0)
+    rewards = bid_reward_table(trainer)
+    pretrain(
+        trainer.rl_agent,
+        rewards,
+        args.data_dir,
+        args.epochs,
+        args.batch_size,
+        args.learning_rate,
+        args.seed,
+    )
+    chosen, best = evaluate(trainer.rl_agent, rewards, args.data_dir)
+    print(f"Opening reward: {chosen:.2f} (best possible {best:.2f})")
+    trainer.rl_agent.export_weights(args.out)
+    print(f"Weights written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
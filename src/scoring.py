@@ -0,0 +1,103 @@
+"""Duplicate bridge contract scores.
+
+``SCORES`` holds the declaring side's score of every contract and result, so
+scoring a batch of results is a single NumPy lookup::
+
+    SCORES[vulnerable, doubled, level, strain, tricks]
+
+``vulnerable`` is 0 or 1, ``doubled`` 0 (undoubled), 1 (doubled) or
+2 (redoubled), ``level`` 1 to 7 (row 0 is unused), ``strain`` the strain index
+(clubs .. no trump) and ``tricks`` the declaring side's tricks, 0 to 13.
+"""
+
+from typing import Final
+
+import numpy as np
+
+NUM_STRAINS: Final[int] = 5
+NO_TRUMP: Final[int] = 4
+
+UNDOUBLED: Final[int] = 0
+DOUBLED: Final[int] = 1
+REDOUBLED: Final[int] = 2
+
+
+def _trick_score(level: int, strain: int) -> int:
+    if strain == NO_TRUMP:
+        return 40 + 30 * (level - 1)
+    return (20 if strain < 2 else 30) * level
+
+
+def _undertrick_penalty(down: int, vulnerable: bool, doubled: int) -> int:
+    if doubled == UNDOUBLED:
+        return (100 if vulnerable else 50) * down
+    if vulnerable:
+        penalty = 200 + 300 * (down - 1)
+    else:
+        # 100, 300, 500, then 300 for every further trick
+        penalty = 100 + 200 * min(down - 1, 2) + 300 * max(down - 3, 0)
+    return penalty * doubled
+
+
+def contract_score(
+    level: int,
+    strain: int,
+    tricks: int,
+    vulnerable: bool = False,
+    doubled: int = UNDOUBLED,
+) -> int:
+    """
+    Score of a contract for the declaring side.
+
+    Args:
+        level: Contract level, 1 to 7
+        strain: Strain index, ``NO_TRUMP`` for no trump
+        tricks: Tricks taken by the declaring side
+        vulnerable: Vulnerability of the declaring side
+        doubled: ``UNDOUBLED``, ``DOUBLED`` or ``REDOUBLED``
+
+    Returns:
+        The score, negative when the contract went down
+    """
+    needed = 6 + level
+    if tricks < needed:
+        return -_undertrick_penalty(needed - tricks, vulnerable, doubled)
+
+    multiplier = 2**doubled
+    trick_score = _trick_score(level, strain) * multiplier
+    score = trick_score
+    if trick_score >= 100:
+        score += 500 if vulnerable else 300
+    else:
+        score += 50
+    if level == 6:
+        score += 750 if vulnerable else 500
+    elif level == 7:
+        score += 1500 if vulnerable else 1000
+    score += 50 * doubled
+
+    overtricks = tricks - needed
+    if doubled == UNDOUBLED:
+        score += overtricks * (30 if strain >= 2 else 20)
+    else:
+        score += overtricks * (200 if vulnerable else 100) * doubled
+    return score
+
+
+def _build() -> np.ndarray:
+    scores = np.zeros((2, 3, 8, NUM_STRAINS, 14), dtype=np.int32)
+    for vulnerable in range(2):
+        for doubled in range(3):
+            for level in range(1, 8):
+                for strain in range(NUM_STRAINS):
+                    for tricks in range(14):
+                        scores[vulnerable, doubled, level, strain, tricks] = (
+                            contract_score(
+                                level, strain, tricks, bool(vulnerable), doubled
+                            )
+                        )
+    scores.setflags(write=False)
+    return scores
+
+
+SCORES: Final[np.ndarray] = _build()
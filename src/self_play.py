@@ -0,0 +1,303 @@
+"""Self-play training with one shared Q-learning policy in all four seats.
+
+Many tables are played at once through ``Game.steps``. Each round collects
+the pending decision of every table and answers all bids with one forward
+pass of the bid network and all cards with one forward pass of the play
+network. Transitions from every seat go into shared replay buffers:
+
+* play: one per card, rewarded per trick by ``BridgeTrainer._get_reward_for_trick``
+* bid: one for the seat that made the final contract bid, rewarded by
+  ``BridgeTrainer._get_reward_for_bid`` for the declaring side's result
+
+Usage:
+    python self_play.py [--rounds N] [--tables N] [--out weights.npz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.replay_buffer import ReplayBuffer
+from agents.rl_encoding import (
+    BID_STATE_SIZE,
+    CARD_STATE_SIZE,
+    PASS_ACTION,
+    TRICK_STATE_SIZE,
+    action_to_bid,
+    action_to_card,
+    best_bid_actions,
+    bid_action_mask,
+    card_action_mask,
+    encode_hand,
+    encode_trick_suit,
+    encode_valid_bids,
+)
+from models.bid import Bid
+from models.card import RANK_INDEX, Card, Suit
+from models.game import Decision, Game
+from models.player import Player
+from models.trick import Trick
+
+if TYPE_CHECKING:
+    from agents.rl_agent import RLAgent
+    from train_rl_agent import BridgeTrainer
+
+
+class PolicySeat(Player):
+    """Seat whose decisions are made in batches by ``SelfPlayRunner``."""
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        raise RuntimeError("PolicySeat decisions are made by SelfPlayRunner")
+
+    def choose_card(
+        self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
+    ) -> Card:
+        raise RuntimeError("PolicySeat decisions are made by SelfPlayRunner")
+
+
+class _Table:
+    """One game in progress, with the transitions of its four seats."""
+
+    def __init__(self, runner: SelfPlayRunner, index: int):
+        self.runner = runner
+        self.seats = [PolicySeat(f"Table {index} seat {seat}") for seat in range(4)]
+        self.seat_index = {player: seat for seat, player in enumerate(self.seats)}
+        self.game = Game(self.seats)
+        self.game.trick_observer = self.observe_trick
+        self.steps = self.game.steps()
+        self.decision: Optional[Decision] = next(self.steps)
+
+        # Per seat: (state, action) of the card in the current trick, and the
+        # transition of the previous trick waiting for its next state
+        self.last_play: List[Optional[Tuple[np.ndarray, int]]] = [None] * 4
+        self.pending_play: List[Optional[Tuple[np.ndarray, int, float]]] = [None] * 4
+        # (state, action) of the latest contract bid
+        self.last_bid: Optional[Tuple[np.ndarray, int]] = None
+
+    def answer(self, choice, state: np.ndarray, action: int) -> None:
+        """Send a choice to the game and record the decision it answered."""
+        seat = self.seat_index[self.decision.player]
+        if self.decision.is_bid:
+            if not choice.is_pass:
+                self.last_bid = (state, action)
+        else:
+            self.last_play[seat] = (state, action)
+        try:
+            self.decision = self.steps.send(choice)
+        except StopIteration:
+            self.decision = None
+            self.finish()
+
+    def observe_trick(self, game: Game, trick: Trick) -> None:
+        trainer = self.runner.trainer
+        winner = self.seat_index[trick.get_winner()]
+        declarer = self.seat_index[game.declarer]
+        done = len(game.tricks_played) == trainer.NUM_TRICKS
+        buffer = self.runner.play_buffer
+
+        for seat in range(4):
+            state, action = self.last_play[seat]
+            reward = trainer._get_reward_for_trick(
+                winner % 2 == seat % 2, declarer % 2 == seat % 2
+            )
+            if self.pending_play[seat] is not None:
+                buffer.add(*self.pending_play[seat], state, False)
+            if done:
+                buffer.add(state, action, reward, None, True)
+                self.pending_play[seat] = None
+            else:
+                self.pending_play[seat] = (state, action, reward)
+
+    def finish(self) -> None:
+        """Record the bid transition of a finished game."""
+        game = self.game
+        self.runner.games_played += 1
+        if not game.contract or self.last_bid is None:
+            return
+
+        declarer = self.seat_index[game.declarer]
+        tricks = sum(
+            self.seats[seat].tricks_won for seat in (declarer, (declarer + 2) % 4)
+        )
+        made = tricks >= 6 + game.contract.number
+        reward = self.runner.trainer._get_reward_for_bid(
+            game.contract.number, made, game.contract.suit
+        )
+        state, action = self.last_bid
+        self.runner.bid_buffer.add(state, action, reward, None, True)
+        self.runner.contracts.append((game.contract.number, made))
+
+
+class SelfPlayRunner:
+    """Plays batches of tables with one shared policy and trains it."""
+
+    def __init__(
+        self,
+        trainer: Optional[BridgeTrainer] = None,
+        num_tables: int = 64,
+        batch_size: int = 256,
+        buffer_capacity: int = 200_000,
+    ):
+        """
+        Args:
+            trainer: Provides the shared ``rl_agent`` and the reward functions
+            num_tables: Games played at once
+            batch_size: Transitions per network update
+            buffer_capacity: Transitions kept per replay buffer
+        """
+        if trainer is None:
+            from train_rl_agent import BridgeTrainer
+
+            trainer = BridgeTrainer(num_episodes=0)
+        self.trainer = trainer
+        self.agent: RLAgent = trainer.rl_agent
+        self.num_tables = num_tables
+        self.batch_size = batch_size
+        self.play_buffer = ReplayBuffer(
+            CARD_STATE_SIZE + TRICK_STATE_SIZE, buffer_capacity
+        )
+        self.bid_buffer = ReplayBuffer(
+            CARD_STATE_SIZE + BID_STATE_SIZE, buffer_capacity
+        )
+        self.games_played = 0
+        self.contracts: List[Tuple[int, bool]] = []
+
+    def _decide_bids(self, tables: List[_Table]) -> None:
+        import torch
+
+        decisions = [table.decision for table in tables]
+        states = np.stack(
+            [
+                np.concatenate(
+                    [encode_hand(d.player.hand), encode_valid_bids(d.valid_bids)]
+                )
+                for d in decisions
+            ]
+        )
+        masks = np.stack([bid_action_mask(d.valid_bids) for d in decisions])
+        with torch.no_grad():
+            q_values = self.agent.bid_q_network(torch.from_numpy(states)).numpy()
+        actions = best_bid_actions(q_values + masks)
+
+        for table, decision, state, action in zip(tables, decisions, states, actions):
+            if random.random() < self.agent.epsilon:
+                bid = random.choice(decision.valid_bids)
+                action = (
+                    PASS_ACTION
+                    if bid.is_pass
+                    else 5 * (bid.number - 1) + bid.suit.index
+                )
+            else:
+                bid = action_to_bid(int(action), decision.valid_bids)
+            table.answer(bid, state, int(action))
+
+    def _decide_cards(self, tables: List[_Table]) -> None:
+        import torch
+
+        decisions = [table.decision for table in tables]
+        states = np.stack(
+            [
+                np.concatenate(
+                    [encode_hand(d.player.hand), encode_trick_suit(d.trick_suit)]
+                )
+                for d in decisions
+            ]
+        )
+        masks = np.stack([card_action_mask(d.valid_cards) for d in decisions])
+        with torch.no_grad():
+            q_values = self.agent.play_q_network(torch.from_numpy(states)).numpy()
+        actions = (q_values + masks).argmax(axis=1)
+
+        for table, decision, state, action in zip(tables, decisions, states, actions):
+            if random.random() < self.agent.epsilon:
+                card = random.choice(decision.valid_cards)
+            else:
+                card = action_to_card(int(action), decision.valid_cards)
+            table.answer(card, state, RANK_INDEX[card.rank])
+
+    def play_round(self) -> None:
+        """Play ``num_tables`` games to the end, batching decisions across tables."""
+        tables = [_Table(self, i) for i in range(self.num_tables)]
+        active = [table for table in tables if table.decision is not None]
+        while active:
+            bidding = [table for table in active if table.decision.is_bid]
+            playing = [table for table in active if not table.decision.is_bid]
+            if bidding:
+                self._decide_bids(bidding)
+            if playing:
+                self._decide_cards(playing)
+            active = [table for table in active if table.decision is not None]
+
+    def update(self, num_updates: int = 1) -> Dict[str, float]:
+        """
+        Train both networks on minibatches from the replay buffers.
+
+        Returns:
+            Average loss per network, for the networks that were updated
+        """
+        losses: Dict[str, List[float]] = {"bid": [], "play": []}
+        for name, buffer, is_bidding in (
+            ("bid", self.bid_buffer, True),
+            ("play", self.play_buffer, False),
+        ):
+            if len(buffer) < self.batch_size:
+                continue
+            for _ in range(num_updates):
+                losses[name].append(
+                    self.agent.update_q_network_batch(
+                        *buffer.sample(self.batch_size), is_bidding=is_bidding
+                    )
+                )
+        return {
+            name: float(np.mean(values)) for name, values in losses.items() if values
+        }
+
+    def train(
+        self, num_rounds: int, updates_per_round: int = 4, log_every: int = 10
+    ) -> None:
+        """
+        Alternate self-play rounds and network updates.
+
+        Args:
+            num_rounds: Number of rounds of ``num_tables`` games
+            updates_per_round: Minibatch updates per network after each round
+            log_every: Print progress every this many rounds (0 to disable)
+        """
+        start = time.perf_counter()
+        for round_number in range(1, num_rounds + 1):
+            self.play_round()
+            losses = self.update(updates_per_round)
+            if log_every and round_number % log_every == 0:
+                recent = self.contracts[-log_every * self.num_tables :]
+                made = np.mean([m for _, m in recent]) if recent else 0.0
+                level = np.mean([lv for lv, _ in recent]) if recent else 0.0
+                loss_text = ", ".join(f"{k} loss {v:.3f}" for k, v in losses.items())
+                print(
+                    f"Round {round_number}: {self.games_played} games, "
+                    f"{len(self.play_buffer)} play transitions, "
+                    f"made {made:.1%} at level {level:.2f}, {loss_text} "
+                    f"({time.perf_counter() - start:.1f}s)"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--tables", type=int, default=64)
+    parser.add_argument("--updates", type=int, default=4)
+    parser.add_argument("--out", default="self_play_weights.npz")
+    args = parser.parse_args()
+
+    runner = SelfPlayRunner(num_tables=args.tables)
+    runner.train(args.rounds, args.updates)
+    runner.agent.export_weights(args.out)
+    print(f"Weights written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Named arrays in shared memory for worker processes.
+
+A ``SharedStore`` is one ``multiprocessing.shared_memory`` segment holding a
+fixed set of named arrays, typically deal arrays and Q-network weights. The
+creating process copies the initial values in; workers attach by segment name
+and get NumPy (or torch) views of the same memory, so nothing is pickled.
+
+The header carries a version counter used as a sequence lock: it is odd while
+``update`` is writing and is bumped to the next even value when the write is
+done. Workers compare it with the version they last loaded to notice refreshed
+weights, and ``read`` retries until it gets a copy no write overlapped with.
+
+Layout::
+
+    magic (8 bytes) | version (uint64) | layout length (uint64) | layout JSON
+    | arrays, each aligned to 64 bytes
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import torch
+
+MAGIC = b"BRSHM001"
+_HEADER = struct.Struct("<8sQQ")
+_VERSION_OFFSET = 8
+_ALIGNMENT = 64
+
+
+def _to_numpy(value: Any) -> np.ndarray:
+    """NumPy array of an array or torch tensor."""
+    if hasattr(value, "detach"):
+        return value.detach().cpu().numpy()
+    return np.asarray(value)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class SharedStore:
+    """Fixed set of named arrays in one shared memory segment."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """Use ``create`` or ``attach`` instead."""
+        self._shm = shm
+        self._owner = owner
+        magic, _, layout_length = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment {shm.name} is not a SharedStore")
+        layout = json.loads(
+            bytes(shm.buf[_HEADER.size : _HEADER.size + layout_length]).decode()
+        )
+        # Views come from np.frombuffer, which holds an export of the buffer,
+        # so closing the segment while one is alive fails instead of unmapping
+        # memory still in use
+        self._version = np.frombuffer(
+            shm.buf, dtype=np.uint64, count=1, offset=_VERSION_OFFSET
+        ).reshape(())
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                shm.buf,
+                dtype=np.dtype(dtype),
+                count=math.prod(shape),
+                offset=offset,
+            ).reshape(shape)
+            for name, shape, dtype, offset in layout
+        }
+
+    @classmethod
+    def create(
+        cls, arrays: Mapping[str, Any], name: Optional[str] = None
+    ) -> "SharedStore":
+        """
+        Create a segment holding copies of the given arrays.
+
+        Args:
+            arrays: Initial values by name, as arrays or torch tensors. Their
+                shapes and dtypes are fixed for the life of the segment.
+            name: Segment name, chosen by the system if None
+
+        Returns:
+            The store, owning the segment
+        """
+        values = {key: _to_numpy(value) for key, value in arrays.items()}
+
+        # Offsets depend on the layout length, which depends on the offsets;
+        # reserve room for offsets of up to 20 digits.
+        draft = [[key, list(v.shape), v.dtype.str, 10**19] for key, v in values.items()]
+        offset = _align(_HEADER.size + len(json.dumps(draft).encode()))
+        layout = []
+        for key, value in values.items():
+            layout.append([key, list(value.shape), value.dtype.str, offset])
+            offset = _align(offset + value.nbytes)
+        encoded = json.dumps(layout).encode()
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 1))
+        _HEADER.pack_into(shm.buf, 0, MAGIC, 0, len(encoded))
+        shm.buf[_HEADER.size : _HEADER.size + len(encoded)] = encoded
+
+        store = cls(shm, owner=True)
+        for key, value in values.items():
+            store._arrays[key][...] = value
+        return store
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedStore":
+        """Attach to a segment created by another process."""
+        if sys.version_info >= (3, 13):
+            # Only the creator should unlink the segment
+            return cls(shared_memory.SharedMemory(name=name, track=False), owner=False)
+        # Processes started by multiprocessing share the creator's resource
+        # tracker, which keeps the segment alive until the creator unlinks it.
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        """Segment name to pass to ``attach`` in workers."""
+        return self._shm.name
+
+    @property
+    def version(self) -> int:
+        """Number of completed updates, times two (odd while one is in progress)."""
+        return int(self._version)
+
+    def names(self) -> List[str]:
+        return list(self._arrays)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Zero-copy view of an array. It may change under concurrent updates.
+
+        The view must be dropped before ``close``, which raises ``BufferError``
+        while views are alive.
+        """
+        return self._arrays[name]
+
+    def torch(self, name: str) -> "torch.Tensor":
+        """Zero-copy torch view of an array; drop it before ``close``."""
+        import torch
+
+        return torch.from_numpy(self._arrays[name])
+
+    def update(self, arrays: Mapping[str, Any]) -> int:
+        """
+        Overwrite arrays and publish a new version.
+
+        Only one process may update a store at a time.
+
+        Args:
+            arrays: New values by name, as arrays or torch tensors
+
+        Returns:
+            The new version
+
+        Raises:
+            KeyError: If a name is not in the store
+            ValueError: If a shape does not match
+        """
+        values = {key: _to_numpy(value) for key, value in arrays.items()}
+        for key, value in values.items():
+            if self._arrays[key].shape != value.shape:
+                raise ValueError(
+                    f"Shape mismatch for {key}: "
+                    f"{value.shape} != {self._arrays[key].shape}"
+                )
+
+        self._version[...] += 1
+        for key, value in values.items():
+            self._arrays[key][...] = value
+        self._version[...] += 1
+        return self.version
+
+    def read(
+        self, names: Optional[Iterable[str]] = None, retry_delay: float = 0.0005
+    ) -> Tuple[int, Dict[str, np.ndarray]]:
+        """
+        Copy arrays out, consistently with respect to ``update``.
+
+        Args:
+            names: Arrays to copy, all by default
+            retry_delay: Seconds to wait before retrying when an update is running
+
+        Returns:
+            The version that was read and the copied arrays
+        """
+        names = list(self._arrays) if names is None else list(names)
+        while True:
+            version = self.version
+            if version % 2 == 0:
+                copies = {name: self._arrays[name].copy() for name in names}
+                if self.version == version:
+                    return version, copies
+            time.sleep(retry_delay)
+
+    def read_prefix(self, prefix: str) -> Tuple[int, Dict[str, np.ndarray]]:
+        """Like ``read``, for the arrays named "<prefix>.<key>", keyed by <key>."""
+        start = len(prefix) + 1
+        version, arrays = self.read(
+            name for name in self._arrays if name.startswith(prefix + ".")
+        )
+        return version, {name[start:]: value for name, value in arrays.items()}
+
+    def close(self) -> None:
+        """
+        Detach from the segment, and free it if this process created it.
+
+        Raises:
+            BufferError: If views from ``__getitem__`` or ``torch`` are alive.
+                The store can no longer be used; drop the views and call
+                ``close`` again.
+        """
+        self._arrays.clear()
+        self._version = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,103 @@
+"""Measure import time of the entry points.
+
+Each module is imported in a fresh interpreter, several times, and the median
+wall time is reported along with any heavy dependency it pulled in. Exits
+with status 1 when a module exceeds its budget or loads a heavy dependency it
+should not, so it can be run as a check.
+
+Usage:
+    python startup_time.py [--runs N] [--budget-ms MS]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ["torch", "matplotlib", "endplay"]
+
+# Entry point -> heavy modules it is allowed to load at import time
+ENTRY_POINTS: Dict[str, List[str]] = {
+    "main": [],
+    "agents.registry": [],
+    "agents.heuristic_agent": [],
+    "convert_api": [],
+    "hand_analysis": [],
+    "train_rl_agent": [],
+    "agents.rl_agent": ["torch"],
+    "agents.numpy_rl_agent": [],
+    "dd_dataset": [],
+    "pretrain_bid_network": [],
+    "self_play": [],
+    "sweep": [],
+    "table_server": [],
+    "agents.mcts_bid_agent": [],
+    "auction_inference": [],
+    "bid_table": [],
+    "agents.memo": [],
+    "par": [],
+    "dd_service": [],
+    "dd_estimate": [],
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module: str, runs: int = 5) -> Tuple[float, List[str]]:
+    """
+    Import a module in fresh interpreters.
+
+    Args:
+        module: Module to import
+        runs: Number of interpreters to start
+
+    Returns:
+        Median import time in seconds and the heavy modules that were loaded
+    """
+    times = []
+    heavy: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+        heavy = output[1].split(",") if len(output) > 1 else []
+    return median(times), heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    failed = False
+    for module, allowed in ENTRY_POINTS.items():
+        elapsed, heavy = measure(module, args.runs)
+        unexpected = [m for m in heavy if m not in allowed]
+        over_budget = not allowed and elapsed * 1000 > args.budget_ms
+        failed |= bool(unexpected) or over_budget
+        status = "FAIL" if unexpected or over_budget else "ok"
+        print(
+            f"{module:<24} {elapsed * 1000:8.1f} ms  "
+            f"heavy: {', '.join(heavy) or '-':<20} {status}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Precomputed evaluation tables for single-suit holdings.
+
+A suit holding is a 13-bit mask where bit ``RANK_INDEX[rank]`` is set when the
+rank is held, so there are only 8192 of them. Every table below is a tuple with
+one entry per mask, which makes hand evaluation a handful of lookups.
+
+Rank entries are rank indices, -1 when the holding has no such card.
+"""
+
+from typing import Final, Iterable, Tuple
+
+from models.card import Card, Rank, RANK_INDEX
+
+NUM_HOLDINGS: Final[int] = 1 << 13
+
+# Ranks ordered by rank index
+RANKS: Final[Tuple[Rank, ...]] = tuple(sorted(RANK_INDEX, key=RANK_INDEX.get))
+
+HIGH_CARD_POINTS: Final = {
+    Rank.ACE: 4,
+    Rank.KING: 3,
+    Rank.QUEEN: 2,
+    Rank.JACK: 1,
+}
+
+# Suit quality weights used by HeuristicAgent
+SUIT_LENGTH_FACTOR: Final[float] = 0.5
+HIGH_CARD_QUALITY_FACTOR: Final[float] = 0.3
+
+_ACE = RANK_INDEX[Rank.ACE]
+_KING = RANK_INDEX[Rank.KING]
+_QUEEN = RANK_INDEX[Rank.QUEEN]
+_TEN = RANK_INDEX[Rank.TEN]
+
+
+def suit_mask(cards: Iterable[Card]) -> int:
+    """Holding mask of the given cards, which should all be of one suit."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << RANK_INDEX[card.rank]
+    return mask
+
+
+def _quick_tricks(mask: int) -> float:
+    """Quick tricks: AK=2, AQ=1.5, A=1, KQ=1, Kx=0.5."""
+    ace, king, queen = (mask >> _ACE & 1, mask >> _KING & 1, mask >> _QUEEN & 1)
+    if ace and king:
+        return 2.0
+    if ace:
+        return 1.5 if queen else 1.0
+    if king and queen:
+        return 1.0
+    if king and mask != 1 << _KING:
+        return 0.5
+    return 0.0
+
+
+def _losing_tricks(mask: int, length: int) -> int:
+    """Losers: missing A, K, Q among the top min(length, 3) cards."""
+    counted = min(length, 3)
+    honours = (_ACE, _KING, _QUEEN)[:counted]
+    return counted - sum(mask >> r & 1 for r in honours)
+
+
+def _top_of_sequence(mask: int) -> int:
+    """Top card of the highest run of 2+ touching cards headed by the ten or better."""
+    for r in range(12, _TEN - 1, -1):
+        if mask >> r & 1 and mask >> (r - 1) & 1:
+            return r
+    return -1
+
+
+def _build() -> Tuple[Tuple, ...]:
+    # Tables are filled from smaller holdings: a holding is its highest card
+    # plus the holding without it
+    rank_points = [HIGH_CARD_POINTS.get(rank, 0) for rank in RANKS]
+    lengths, hcp, highest, rest = [0], [0], [-1], [0]
+    for mask in range(1, NUM_HOLDINGS):
+        top = mask.bit_length() - 1
+        lower = mask ^ (1 << top)
+        lengths.append(lengths[lower] + 1)
+        hcp.append(hcp[lower] + rank_points[top])
+        highest.append(top)
+        rest.append(lower)
+
+    fourth = [
+        highest[rest[rest[rest[mask]]]] if lengths[mask] >= 4 else -1
+        for mask in range(NUM_HOLDINGS)
+    ]
+    # Rounded so that holdings of equal quality compare equal
+    quality = [
+        round(length * SUIT_LENGTH_FACTOR + points * HIGH_CARD_QUALITY_FACTOR, 9)
+        for length, points in zip(lengths, hcp)
+    ]
+
+    # Quick tricks, losers and sequences only depend on the cards from the ten
+    # up and on the length, so they are computed once per top holding
+    shift = _TEN - 1
+    tops = range(NUM_HOLDINGS >> shift)
+    top_quick = [_quick_tricks(top << shift) for top in tops]
+    top_losers = [
+        [_losing_tricks(top << shift, length) for length in range(4)] for top in tops
+    ]
+    top_sequence = [_top_of_sequence(top << shift) for top in tops]
+    singleton_king = (1 << _KING) >> shift
+
+    quick, losers, sequence = [], [], []
+    for mask, length in enumerate(lengths):
+        top = mask >> shift
+        if top == singleton_king:
+            quick.append(0.5 if length > 1 else 0.0)
+        else:
+            quick.append(top_quick[top])
+        losers.append(top_losers[top][min(length, 3)])
+        sequence.append(top_sequence[top])
+
+    # Touching cards held from the ace down: the leading ones of the mask
+    top_run = [
+        13 - (~mask & (NUM_HOLDINGS - 1)).bit_length() for mask in range(NUM_HOLDINGS)
+    ]
+
+    return tuple(
+        tuple(table)
+        for table in (
+            lengths,
+            hcp,
+            quick,
+            losers,
+            quality,
+            highest,
+            fourth,
+            sequence,
+            top_run,
+        )
+    )
+
+
+(
+    SUIT_LENGTH,
+    SUIT_HCP,
+    QUICK_TRICKS,
+    LOSING_TRICKS,
+    SUIT_QUALITY,
+    HIGHEST_CARD,
+    FOURTH_BEST,
+    TOP_OF_SEQUENCE,
+    TOP_RUN,
+) = _build()
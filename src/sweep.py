@@ -0,0 +1,330 @@
+"""Hyperparameter sweeps of ``BridgeTrainer`` with successive halving.
+
+Every trial is one configuration. All trials start with a small episode
+budget, run in parallel worker processes. After each rung only the best
+``1 / eta`` of the trials, ranked by a rolling training metric, continue
+with ``eta`` times the budget; the rest are stopped. Trials resume from a
+checkpoint written at the end of their previous rung.
+
+Configuration keys:
+
+* ``learning_rate``, ``epsilon``, ``epsilon_decay_factor``: ``RLAgent`` arguments
+* ``hidden_size1``, ``hidden_size2``, ``gamma``: ``QNetworkConfig`` values
+* upper-case ``BridgeTrainer`` reward constants, e.g. ``GAME_MADE_REWARD``
+
+Usage:
+    python sweep.py [--trials N] [--workers N] [--min-episodes N] [--eta N]
+        [--rungs N] [--metric score] [--out sweep_results.csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+AGENT_KEYS = ["learning_rate", "epsilon", "epsilon_decay_factor"]
+NETWORK_KEYS = ["hidden_size1", "hidden_size2", "gamma"]
+
+# Index into TrainingMetrics.get_recent_averages()
+METRICS = {
+    "score": 0,
+    "tricks": 1,
+    "declaration_rate": 2,
+    "success_rate": 3,
+    "contract_level": 4,
+}
+
+# Default search space, sampled at random
+SEARCH_SPACE: Dict[str, Sequence[Any]] = {
+    "learning_rate": [1e-4, 3e-4, 1e-3, 3e-3],
+    "epsilon": [0.05, 0.1, 0.2, 0.3],
+    "epsilon_decay_factor": [0.99, 0.995, 0.999, 1.0],
+    "hidden_size1": [64, 128, 256],
+    "hidden_size2": [32, 64, 128],
+    "gamma": [0.9, 0.95, 0.99],
+    "GAME_MADE_REWARD": [15.0, 30.0, 60.0],
+    "SLAM_MADE_REWARD": [40.0, 80.0, 160.0],
+}
+
+
+@dataclass
+class Trial:
+    """One configuration and how far it got."""
+
+    trial_id: int
+    config: Dict[str, Any]
+    episodes: int = 0
+    rung: int = 0
+    metric: float = float("-inf")
+    history: List[float] = field(default_factory=list)
+    stopped: bool = False
+
+
+def sample_configs(
+    space: Dict[str, Sequence[Any]], num_trials: int, seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Draw distinct configurations from a search space.
+
+    Args:
+        space: Candidate values per key
+        num_trials: Number of configurations, capped at the size of the grid
+        seed: Random seed
+
+    Returns:
+        The configurations
+    """
+    keys = list(space)
+    grid = list(itertools.product(*(space[key] for key in keys)))
+    rng = random.Random(seed)
+    picked = rng.sample(grid, min(num_trials, len(grid)))
+    return [dict(zip(keys, values)) for values in picked]
+
+
+# QNetworkConfig values before any trial changed them
+_NETWORK_DEFAULTS: Dict[str, Any] = {}
+
+
+def _configure_network(config: Dict[str, Any]) -> None:
+    """Set the ``QNetworkConfig`` class values of this worker process."""
+    from agents.rl_agent import QNetworkConfig
+
+    if not _NETWORK_DEFAULTS:
+        _NETWORK_DEFAULTS.update(
+            {key: getattr(QNetworkConfig, key) for key in NETWORK_KEYS}
+        )
+    for key in NETWORK_KEYS:
+        setattr(QNetworkConfig, key, config.get(key, _NETWORK_DEFAULTS[key]))
+
+
+def _build_trainer(config: Dict[str, Any]):
+    from train_rl_agent import BridgeTrainer
+
+    _configure_network(config)
+    agent_options = {key: config[key] for key in AGENT_KEYS if key in config}
+    trainer = BridgeTrainer(num_episodes=0, agent_options=agent_options)
+    for key, value in config.items():
+        if key.isupper():
+            if not hasattr(BridgeTrainer, key):
+                raise ValueError(f"Unknown BridgeTrainer constant {key}")
+            setattr(trainer, key, value)
+    return trainer
+
+
+def _save_checkpoint(trainer, path: str) -> None:
+    import torch
+
+    agent = trainer.rl_agent
+    torch.save(
+        {
+            "bid_q_network": agent.bid_q_network.state_dict(),
+            "play_q_network": agent.play_q_network.state_dict(),
+            "bid_optimizer": agent.bid_optimizer.state_dict(),
+            "play_optimizer": agent.play_optimizer.state_dict(),
+            "epsilon": agent.epsilon,
+            "episodes_played": trainer.episodes_played,
+            "metrics": trainer.metrics,
+        },
+        path,
+    )
+
+
+def _load_checkpoint(trainer, path: str) -> None:
+    import torch
+
+    state = torch.load(path, weights_only=False)
+    agent = trainer.rl_agent
+    agent.bid_q_network.load_state_dict(state["bid_q_network"])
+    agent.play_q_network.load_state_dict(state["play_q_network"])
+    agent.bid_optimizer.load_state_dict(state["bid_optimizer"])
+    agent.play_optimizer.load_state_dict(state["play_optimizer"])
+    agent.epsilon = state["epsilon"]
+    trainer.episodes_played = state["episodes_played"]
+    trainer.metrics = state["metrics"]
+
+
+def run_trial(
+    config: Dict[str, Any],
+    episodes: int,
+    checkpoint: str,
+    metric: str = "score",
+    window: int = 100,
+) -> float:
+    """
+    Train a configuration up to a number of episodes, resuming if possible.
+
+    Runs in a worker process.
+
+    Args:
+        config: Trial configuration
+        episodes: Total episodes the trial should have played afterwards
+        checkpoint: Checkpoint file, read if it exists and written afterwards
+        metric: Name of the rolling metric to report, see ``METRICS``
+        window: Episodes the rolling metric averages over
+
+    Returns:
+        The rolling metric after training
+    """
+    trainer = _build_trainer(config)
+    if os.path.exists(checkpoint):
+        _load_checkpoint(trainer, checkpoint)
+    trainer.run_episodes(episodes - trainer.episodes_played, verbose=False)
+    _save_checkpoint(trainer, checkpoint)
+    return float(trainer.metrics.get_recent_averages(window)[METRICS[metric]])
+
+
+def successive_halving(
+    configs: List[Dict[str, Any]],
+    min_episodes: int = 200,
+    eta: int = 3,
+    max_rungs: int = 4,
+    workers: Optional[int] = None,
+    metric: str = "score",
+    checkpoint_dir: Optional[str] = None,
+    verbose: bool = True,
+) -> List[Trial]:
+    """
+    Run a successive halving sweep.
+
+    Args:
+        configs: Configurations to try
+        min_episodes: Episode budget of the first rung
+        eta: Fraction of trials kept (1 / eta) and budget growth per rung
+        max_rungs: Number of rungs at most
+        workers: Worker processes, one per CPU by default
+        metric: Rolling metric to rank trials by, higher is better
+        checkpoint_dir: Where trials are checkpointed between rungs, a
+            temporary directory by default
+        verbose: Print each rung's ranking
+
+    Returns:
+        All trials, best first
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', available: {', '.join(METRICS)}")
+
+    trials = [Trial(i, config) for i, config in enumerate(configs)]
+    owned_dir = None
+    if checkpoint_dir is None:
+        owned_dir = tempfile.TemporaryDirectory(prefix="sweep_")
+        checkpoint_dir = owned_dir.name
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def checkpoint(trial: Trial) -> str:
+        return os.path.join(checkpoint_dir, f"trial_{trial.trial_id}.pt")
+
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            alive = trials
+            for rung in range(max_rungs):
+                episodes = min_episodes * eta**rung
+                futures = {
+                    trial.trial_id: pool.submit(
+                        run_trial, trial.config, episodes, checkpoint(trial), metric
+                    )
+                    for trial in alive
+                }
+                for trial in alive:
+                    trial.metric = futures[trial.trial_id].result()
+                    trial.history.append(trial.metric)
+                    trial.episodes = episodes
+                    trial.rung = rung
+
+                alive.sort(key=lambda trial: trial.metric, reverse=True)
+                if verbose:
+                    print(f"Rung {rung} ({episodes} episodes):")
+                    print(format_table(alive, metric))
+                if len(alive) == 1 or rung == max_rungs - 1:
+                    break
+
+                keep = max(1, len(alive) // eta)
+                for trial in alive[keep:]:
+                    trial.stopped = True
+                    if os.path.exists(checkpoint(trial)):
+                        os.remove(checkpoint(trial))
+                alive = alive[:keep]
+    finally:
+        if owned_dir is not None:
+            owned_dir.cleanup()
+
+    return sorted(trials, key=lambda t: (t.rung, t.metric), reverse=True)
+
+
+def format_table(trials: List[Trial], metric: str = "score") -> str:
+    """Format trials as an aligned text table."""
+    keys = sorted({key for trial in trials for key in trial.config})
+    header = ["trial", "rung", "episodes", metric, *keys]
+    rows = [
+        [
+            str(trial.trial_id),
+            str(trial.rung),
+            str(trial.episodes),
+            f"{trial.metric:.3f}",
+            *(str(trial.config.get(key, "")) for key in keys),
+        ]
+        for trial in trials
+    ]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(row, widths))
+        for row in [header, *rows]
+    )
+
+
+def write_csv(trials: List[Trial], path: str, metric: str = "score") -> None:
+    """Write one row per trial with its configuration and metric history."""
+    keys = sorted({key for trial in trials for key in trial.config})
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["trial", "rung", "episodes", metric, "history", *keys])
+        for trial in trials:
+            writer.writerow(
+                [
+                    trial.trial_id,
+                    trial.rung,
+                    trial.episodes,
+                    trial.metric,
+                    " ".join(f"{value:.3f}" for value in trial.history),
+                    *(trial.config.get(key, "") for key in keys),
+                ]
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-episodes", type=int, default=200)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=4)
+    parser.add_argument("--metric", default="score", choices=list(METRICS))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    configs = sample_configs(SEARCH_SPACE, args.trials, args.seed)
+    trials = successive_halving(
+        configs,
+        args.min_episodes,
+        args.eta,
+        args.rungs,
+        args.workers,
+        args.metric,
+    )
+    print("Final results:")
+    print(format_table(trials, args.metric))
+    write_csv(trials, args.out, args.metric)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Asyncio server hosting many human-vs-bot tables in one process.
+
+Each TCP connection gets its own table: the client plays one seat and bots
+from the agent registry play the others. Games run through ``Game.steps``,
+so a table waiting for its human only awaits that connection while bot seats
+answer synchronously and every other table keeps playing.
+
+Protocol: one ASCII message per line. Bids are written ``P``, ``1C`` ..
+``7N`` and cards as suit and rank, e.g. ``SA``, ``HT``, ``C2``.
+
+Server to client::
+
+    DEAL <seat> <dealer> <cards...>     new deal and the client's hand
+    ?B <cheapest bid>                   client to bid ("-" if only pass)
+    ?C <cards...>                       client to play one of these cards
+    BID <seat> <bid>                    bid made at the table
+    CONTRACT <bid> <declarer>           end of auction ("CONTRACT P" if passed out)
+    PLAY <seat> <card>                  card played at the table
+    TRICK <winner>                      trick complete
+    END <declarer tricks> <score>       deal over; reply NEXT or QUIT
+    ERR <reason>                        invalid message, the request is repeated
+
+Client to server: a bid or card answering ``?B`` / ``?C``, ``NEXT``, ``QUIT``.
+
+Usage:
+    python table_server.py [--host H] [--port P] [--bots heuristic,random,heuristic]
+    python table_server.py --connect H:P     (plain terminal client)
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional, Sequence
+
+from agents.registry import create_agent
+from models.bid import Bid
+from models.card import CARDS, Card, Suit, SUIT_INDEX
+from models.game import Decision, Game
+from models.player import Player
+
+_STRAIN_CODES = "CDHSN"
+_SUITS = list(SUIT_INDEX)
+
+CARD_BY_CODE: Dict[str, Card] = {
+    _STRAIN_CODES[card.suit.index] + card.rank.value: card for card in CARDS
+}
+
+
+def card_code(card: Card) -> str:
+    return _STRAIN_CODES[card.suit.index] + card.rank.value
+
+
+def bid_code(bid: Bid) -> str:
+    if bid.is_pass:
+        return "P"
+    return f"{bid.number}{_STRAIN_CODES[bid.suit.index]}"
+
+
+def parse_bid(code: str) -> Optional[Bid]:
+    """Parse a bid code, None if malformed."""
+    if code == "P":
+        return Bid(0)
+    if len(code) != 2 or code[0] not in "1234567" or code[1] not in _STRAIN_CODES:
+        return None
+    return Bid(int(code[0]), _SUITS[_STRAIN_CODES.index(code[1])])
+
+
+class RemoteSeat(Player):
+    """Seat played over the network; its moves are awaited by ``TableSession``."""
+
+    def make_bid(self, valid_bids: List[Bid]) -> Bid:
+        raise RuntimeError("RemoteSeat moves come from TableSession")
+
+    def choose_card(
+        self, valid_cards: List[Card], trick_suit: Optional[Suit] = None
+    ) -> Card:
+        raise RuntimeError("RemoteSeat moves come from TableSession")
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection, quit or timed out."""
+
+
+class TableSession:
+    """One client playing deals against bots."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        bots: Sequence[str],
+        seat: int = 0,
+        move_timeout: float = 600.0,
+    ):
+        """
+        Args:
+            reader: Client connection
+            writer: Client connection
+            bots: Registry names of the three bot seats, clockwise after the client
+            seat: Seat of the client
+            move_timeout: Seconds to wait for a client message before giving up
+        """
+        self.reader = reader
+        self.writer = writer
+        self.bots = list(bots)
+        self.seat = seat
+        self.move_timeout = move_timeout
+        self.deals_played = 0
+
+    def send(self, message: str) -> None:
+        """Queue a message; it is flushed before the next read."""
+        self.writer.write(message.encode() + b"\n")
+
+    async def receive(self) -> str:
+        await self.writer.drain()
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.move_timeout)
+        except asyncio.TimeoutError:
+            raise ClientDisconnected("timeout")
+        if not line:
+            raise ClientDisconnected("closed")
+        message = line.decode(errors="replace").strip().upper()
+        if message == "QUIT":
+            raise ClientDisconnected("quit")
+        return message
+
+    def _players(self) -> List[Player]:
+        players: List[Player] = []
+        bots = iter(self.bots)
+        for seat in range(4):
+            if seat == self.seat:
+                players.append(RemoteSeat("Client"))
+            else:
+                players.append(create_agent(next(bots), f"Bot {seat}"))
+        return players
+
+    async def _ask(self, decision: Decision):
+        """Request a move from the client until it sends a valid one."""
+        if decision.is_bid:
+            contracts = [bid for bid in decision.valid_bids if not bid.is_pass]
+            request = "?B " + (bid_code(min(contracts)) if contracts else "-")
+        else:
+            request = "?C " + " ".join(card_code(c) for c in decision.valid_cards)
+
+        while True:
+            self.send(request)
+            message = await self.receive()
+            if decision.is_bid:
+                choice = parse_bid(message)
+                valid = decision.valid_bids
+            else:
+                choice = CARD_BY_CODE.get(message)
+                valid = decision.valid_cards
+            if choice is not None and choice in valid:
+                return choice
+            self.send(f"ERR invalid move {message}")
+
+    async def play_deal(self) -> None:
+        players = self._players()
+        seats = {player: seat for seat, player in enumerate(players)}
+        game = Game(players)
+        game.trick_observer = lambda game, trick: self.send(
+            f"TRICK {seats[trick.get_winner()]}"
+        )
+
+        steps = game.steps()
+        decision = next(steps, None)
+        hand = " ".join(card_code(card) for card in players[self.seat].hand)
+        self.send(f"DEAL {self.seat} {game.dealer_index} {hand}")
+
+        bidding = True
+        while decision is not None:
+            player = decision.player
+            if bidding and not decision.is_bid:
+                bidding = False
+                self.send(f"CONTRACT {bid_code(game.contract)} {seats[game.declarer]}")
+
+            if seats[player] == self.seat:
+                choice = await self._ask(decision)
+            elif decision.is_bid:
+                choice = player.make_bid(decision.valid_bids)
+            else:
+                choice = player.choose_card(decision.valid_cards, decision.trick_suit)
+
+            if decision.is_bid:
+                self.send(f"BID {seats[player]} {bid_code(choice)}")
+            else:
+                self.send(f"PLAY {seats[player]} {card_code(choice)}")
+            try:
+                decision = steps.send(choice)
+            except StopIteration:
+                decision = None
+
+        if not game.contract:
+            self.send("CONTRACT P")
+            self.send("END 0 0")
+        else:
+            declarer = seats[game.declarer]
+            tricks = (
+                players[declarer].tricks_won + players[(declarer + 2) % 4].tricks_won
+            )
+            self.send(f"END {tricks} {game.score[players[self.seat]]}")
+        self.deals_played += 1
+
+    async def run(self) -> None:
+        """Play deals until the client quits or disconnects."""
+        try:
+            while True:
+                await self.play_deal()
+                while (message := await self.receive()) != "NEXT":
+                    self.send(f"ERR expected NEXT or QUIT, got {message}")
+        except (ClientDisconnected, ConnectionError):
+            pass
+        finally:
+            self.writer.close()
+
+
+class TableServer:
+    """Accepts connections and runs one ``TableSession`` per client."""
+
+    def __init__(
+        self,
+        bots: Sequence[str] = ("heuristic", "heuristic", "heuristic"),
+        max_tables: int = 1000,
+        move_timeout: float = 600.0,
+    ):
+        """
+        Args:
+            bots: Registry names of the three bot seats at every table
+            max_tables: Connections beyond this are refused
+            move_timeout: Seconds a client may take per message
+        """
+        if len(bots) != 3:
+            raise ValueError("A table needs exactly 3 bots")
+        self.bots = list(bots)
+        self.max_tables = max_tables
+        self.move_timeout = move_timeout
+        self.active = 0
+        self.deals_played = 0
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if self.active >= self.max_tables:
+            writer.write(b"ERR server full\n")
+            writer.close()
+            return
+        self.active += 1
+        session = TableSession(
+            reader, writer, self.bots, move_timeout=self.move_timeout
+        )
+        try:
+            await session.run()
+        finally:
+            self.active -= 1
+            self.deals_played += session.deals_played
+
+    async def start(self, host: str = "127.0.0.1", port: int = 7777):
+        """Start listening; returns the ``asyncio.Server``."""
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 7777) -> None:
+        server = await self.start(host, port)
+        print(f"Serving tables on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+async def run_client(host: str, port: int) -> None:
+    """Minimal terminal client: prints server messages and prompts for moves."""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    while line := await reader.readline():
+        message = line.decode().strip()
+        print(message)
+        if message.startswith(("?B", "?C", "END", "ERR expected")):
+            reply = await loop.run_in_executor(None, input, "> ")
+            writer.write(reply.strip().encode() + b"\n")
+            await writer.drain()
+    writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--bots", default="heuristic,heuristic,heuristic")
+    parser.add_argument("--max-tables", type=int, default=1000)
+    parser.add_argument("--connect", default=None, metavar="HOST:PORT")
+    args = parser.parse_args()
+
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        asyncio.run(run_client(host, int(port)))
+        return
+
+    server = TableServer(args.bots.split(","), args.max_tables)
+    asyncio.run(server.serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from agents.compiled_heuristic_agent import CompiledHeuristicAgent
+from agents.heuristic_agent import HeuristicAgent
+from bid_table import check_tables
+from dealer import Dealer, array_to_hands
+from models.game import Game
+
+
+def test_tables_match_agent():
+    assert check_tables(50) == 0
+
+
+def play(agent_class, hands, dealer_index):
+    game = Game([agent_class(f"p{seat}") for seat in range(4)])
+    game.new_deal(dealer_index)
+    game.play(hands)
+    declarer = game.players.index(game.declarer) if game.declarer else None
+    tricks = [player.tricks_won for player in game.players]
+    return declarer, game.contract, tricks, [game.score[p] for p in game.players]
+
+
+def test_compiled_agent_plays_same_games():
+    for i, deal in enumerate(Dealer(seed=1).generate(40)):
+        expected = play(HeuristicAgent, array_to_hands(deal), i % 4)
+        assert play(CompiledHeuristicAgent, array_to_hands(deal), i % 4) == expected
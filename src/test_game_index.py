@@ -0,0 +1,52 @@
+import numpy as np
+
+from game_index import GameIndex, IndexedGameLogWriter
+from game_log import GameRecord
+
+
+def make_record(contract: int, declarer: int, tricks: int) -> GameRecord:
+    return GameRecord(
+        deal=bytes(card // 13 for card in range(52)),
+        dealer=0,
+        auction=bytes([contract, 0, 0, 0]),
+        plays=b"",
+        declarer=declarer,
+        contract=contract,
+        declarer_tricks=tricks,
+        scores=(0, 0, 0, 0),
+        agent_ids=("a", "b", "a", "b"),
+    )
+
+
+def test_query_empty_index():
+    index = GameIndex()
+    assert len(index.query(level=4)) == 0
+    assert len(index.query(hcp={0: (10, 20)}, went_down=True)) == 0
+
+
+def test_save_and_open_without_records(tmp_path):
+    path = str(tmp_path / "games.log")
+    IndexedGameLogWriter(path).close()
+
+    index = GameIndex.open(path)
+    assert len(index) == 0
+    assert len(index.query(level=4)) == 0
+
+
+def test_open_matches_build(tmp_path):
+    path = str(tmp_path / "games.log")
+    with IndexedGameLogWriter(path) as writer:
+        offsets = [
+            writer.append_record(make_record(contract, contract % 4, contract % 14))
+            for contract in range(1, 36)
+        ]
+
+    index = GameIndex.open(path)
+    built = GameIndex.build(path)
+    assert len(index) == len(offsets)
+    for query in (
+        {"level": 4},
+        {"declarer": 2, "went_down": True},
+        {"tricks": (9, 13)},
+    ):
+        assert np.array_equal(index.query(**query), built.query(**query))
@@ -0,0 +1,42 @@
+import numpy as np
+
+from par import check_par, par
+
+# DD tables (strain index by seat) of stored deals, chosen to cover part
+# scores, games, slams, no trump and doubled sacrifices
+TABLES = np.array(
+    [
+        [[3, 10, 3, 10], [3, 10, 3, 10], [4, 8, 4, 9], [3, 10, 3, 10], [3, 9, 3, 10]],
+        [[9, 4, 9, 4], [7, 6, 7, 6], [7, 5, 7, 5], [7, 6, 7, 6], [7, 5, 7, 5]],
+        [[7, 6, 7, 6], [6, 7, 6, 7], [9, 3, 10, 3], [8, 4, 8, 4], [6, 4, 6, 4]],
+        [[9, 3, 9, 3], [6, 6, 6, 6], [8, 3, 9, 3], [5, 8, 5, 8], [7, 5, 7, 5]],
+        [[8, 5, 8, 5], [7, 5, 7, 5], [7, 6, 7, 6], [5, 7, 5, 7], [6, 6, 6, 6]],
+        [[9, 2, 9, 4], [4, 8, 4, 9], [4, 8, 4, 9], [9, 3, 9, 4], [7, 3, 7, 6]],
+        [[5, 8, 5, 8], [8, 5, 8, 5], [9, 4, 9, 4], [5, 7, 5, 7], [7, 6, 7, 6]],
+        [[2, 11, 2, 11], [3, 10, 3, 10], [2, 11, 2, 11], [3, 9, 3, 9], [2, 11, 2, 10]],
+        [[2, 11, 2, 11], [6, 7, 6, 7], [1, 11, 1, 12], [1, 11, 1, 12], [2, 11, 2, 11]],
+        [[12, 1, 12, 1], [12, 1, 12, 1], [8, 5, 7, 5], [9, 4, 9, 4], [12, 1, 12, 1]],
+        [[9, 4, 9, 4], [5, 7, 5, 7], [5, 8, 5, 8], [9, 3, 9, 3], [8, 4, 8, 4]],
+        [[5, 8, 5, 8], [2, 10, 2, 10], [2, 9, 2, 9], [1, 11, 1, 11], [2, 10, 2, 10]],
+        [[7, 6, 7, 6], [11, 2, 11, 2], [11, 2, 11, 2], [4, 7, 4, 7], [10, 3, 10, 3]],
+        [[6, 7, 4, 7], [4, 9, 4, 9], [10, 3, 10, 3], [8, 3, 8, 3], [6, 6, 6, 6]],
+        [[8, 5, 8, 5], [4, 9, 4, 9], [3, 9, 3, 9], [3, 10, 3, 10], [7, 6, 7, 6]],
+        [[4, 9, 4, 9], [5, 8, 5, 8], [8, 5, 7, 5], [6, 6, 6, 6], [7, 5, 7, 5]],
+        [[3, 10, 3, 10], [5, 7, 5, 7], [5, 8, 5, 8], [10, 3, 10, 3], [5, 5, 5, 5]],
+        [[4, 8, 4, 8], [10, 3, 10, 3], [10, 3, 10, 3], [7, 6, 7, 6], [7, 5, 7, 5]],
+        [[9, 4, 9, 4], [4, 9, 4, 9], [7, 5, 8, 5], [3, 10, 3, 10], [6, 7, 6, 7]],
+        # Nobody makes a contract: passed out
+        [[6, 6, 6, 6]] * 5,
+    ],
+    dtype=np.int8,
+)
+
+
+def test_par_matches_endplay():
+    for seed in range(4):
+        assert check_par(TABLES, seed) == 0
+
+
+def test_passed_out():
+    result = par(TABLES[-1:])
+    assert result.score[0] == 0 and result.level[0] == 0
@@ -1,15 +1,22 @@
 """Bridge trainer module for reinforcement learning agents."""
 
-from typing import List, Optional
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
 import numpy as np
-import torch
-import matplotlib.pyplot as plt
 from models.game import Game
-from agents.rl_agent import RLAgent
 from agents.random_agent import RandomAgent
 from agents.pass_agent import PassAgent
-from models.card import Suit
+from models.card import Card, Suit
+from models.trick import Trick
+from agents.rl_encoding import CARD_STATE_SIZE, TRICK_STATE_SIZE
+from dealer import array_to_hands, owners_to_array
+
+# torch and matplotlib are imported where they are used, so that importing
+# this module (e.g. for TrainingMetrics or the reward functions) stays cheap
+if TYPE_CHECKING:
+    import torch
 
 
 @dataclass
@@ -97,22 +104,78 @@ class BridgeTrainer:
     FAILED_CONTRACT_MULTIPLIER = -3.0
     DECLARER_TRICK_REWARD = 1.0
     DEFENDER_TRICK_REWARD = 0.5
+    SLAM_MADE_REWARD = 80.0
+    GAME_MADE_REWARD = 30.0
+    PARTSCORE_MADE_REWARD_PER_LEVEL = 1.2
+    SLAM_FAILED_PENALTY = 20.0
+    GAME_FAILED_PENALTY = 10.0
+    PARTSCORE_FAILED_PENALTY_PER_LEVEL = 1.0
     INITIAL_BID_ENCODING_SIZE = 35
     PROGRESS_UPDATE_FREQUENCY = 100
     NUM_PLAYERS = 4
+    NUM_TRICKS = 13
+    # Deals read from a DD dataset at a time
+    DD_BATCH_SIZE = 256
 
-    def __init__(self, num_episodes: int = 1000):
+    def __init__(
+        self,
+        num_episodes: int = 1000,
+        train_play: bool = False,
+        play_batch_size: int = 256,
+        play_updates_per_episode: int = 1,
+        agent_options: Optional[Dict[str, float]] = None,
+        dd_dataset: Optional[str] = None,
+    ):
         """Initialize the Bridge trainer.
 
         Args:
             num_episodes: Number of training episodes to run.
+            train_play: Also train the play network, from one transition per
+                trick the agent plays in.
+            play_batch_size: Transitions per play network update.
+            play_updates_per_episode: Play network updates after each episode.
+            agent_options: Extra ``RLAgent`` arguments, e.g. learning_rate.
+            dd_dataset: Directory of a ``dd_dataset`` dataset. If given,
+                episodes only run the auction, on the dataset's deals, and the
+                contract is scored with the stored double dummy trick count.
         """
+        from agents.rl_agent import RLAgent
+
+        if dd_dataset is not None and train_play:
+            raise ValueError("Bidding-only episodes cannot train the play network")
+
         self.num_episodes = num_episodes
-        self.rl_agent = RLAgent("RL Player")
+        self.episodes_played = 0
+        self.rl_agent = RLAgent("RL Player", **(agent_options or {}))
         self.opponents = [
             PassAgent(f"Random {i+1}") for i in range(self.NUM_PLAYERS - 1)
         ]
         self.metrics = TrainingMetrics()
+        # One reusable game per seat of the RL agent
+        self._games: Dict[int, Game] = {}
+
+        self.train_play = train_play
+        self.play_batch_size = play_batch_size
+        self.play_updates_per_episode = play_updates_per_episode
+        self._pending_play: Optional[tuple[np.ndarray, int, float]] = None
+        if train_play:
+            from agents.replay_buffer import ReplayBuffer
+
+            self.play_buffer = ReplayBuffer(CARD_STATE_SIZE + TRICK_STATE_SIZE)
+            self.rl_agent.record_plays()
+        self._dd_deals = (
+            self._stream_dd_deals(dd_dataset) if dd_dataset is not None else None
+        )
+
+    def _stream_dd_deals(
+        self, directory: str
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yield (owners, dd) of single deals of a DD dataset, looping forever."""
+        from dd_dataset import minibatches
+
+        while True:
+            for owners, dd in minibatches(directory, self.DD_BATCH_SIZE):
+                yield from zip(owners, dd)
 
     def _get_reward_for_bid(
         self, contract_level: int, made_contract: bool, contract_suit: Suit
@@ -132,8 +195,13 @@ class BridgeTrainer:
             else (contract_level >= 4)
         )
         slam = contract_level >= 6
-        made_mult = 80 if slam else 30 if game else contract_level * 1.2
-        fail_mult = 20 if slam else 10 if game else contract_level
+        if slam:
+            made_mult, fail_mult = self.SLAM_MADE_REWARD, self.SLAM_FAILED_PENALTY
+        elif game:
+            made_mult, fail_mult = self.GAME_MADE_REWARD, self.GAME_FAILED_PENALTY
+        else:
+            made_mult = contract_level * self.PARTSCORE_MADE_REWARD_PER_LEVEL
+            fail_mult = contract_level * self.PARTSCORE_FAILED_PENALTY_PER_LEVEL
 
         multiplier = made_mult if made_contract else -fail_mult
 
@@ -153,28 +221,144 @@ class BridgeTrainer:
             return 0.0
         return self.DECLARER_TRICK_REWARD if is_declarer else self.DEFENDER_TRICK_REWARD
 
-    def _setup_game(self, episode: int) -> tuple[Game, torch.Tensor]:
+    def _setup_game(self, episode: int) -> Game:
         """Set up a new game episode.
 
         Args:
             episode: Current episode number.
 
         Returns:
-            tuple: Game instance and initial state tensor.
+            Game: Game instance, dealt when it is played.
         """
         position = episode % self.NUM_PLAYERS
-        players = self.opponents.copy()
-        players.insert(position, self.rl_agent)
+        game = self._games.get(position)
+        if game is None:
+            players = self.opponents.copy()
+            players.insert(position, self.rl_agent)
+            game = Game(players, keep_history=False)
+            if self.train_play:
+                game.trick_observer = self._record_trick
+            self._games[position] = game
+        else:
+            game.new_deal()
+        self._pending_play = None
+        return game
+
+    def _bidding_state(self) -> torch.Tensor:
+        """State tensor of the agent's current hand before any bid."""
+        import torch
 
-        game = Game(players)
-        initial_state = torch.cat(
+        return torch.cat(
             [self.rl_agent._encode_hand(), torch.zeros(self.INITIAL_BID_ENCODING_SIZE)]
         )
 
-        return game, initial_state
+    def _play_game(
+        self,
+        game: Game,
+        hands: Optional[List[List[Card]]] = None,
+        bidding_only: bool = False,
+    ) -> torch.Tensor:
+        """Play a deal as ``Game.play`` does, keeping the agent's dealt hand.
+
+        Args:
+            game: Game prepared by ``_setup_game``.
+            hands: Predetermined hands in player order, dealt at random if None.
+            bidding_only: Stop after the auction.
+
+        Returns:
+            torch.Tensor: Initial bidding state, encoded at the first bid,
+            once the cards are dealt and before any is played.
+        """
+        steps = game.steps(hands, bidding_only)
+        decision = next(steps)
+        initial_state = self._bidding_state()
+        while decision is not None:
+            player = decision.player
+            if decision.is_bid:
+                choice = player.make_bid(decision.valid_bids)
+            else:
+                choice = player.choose_card(decision.valid_cards, decision.trick_suit)
+            try:
+                decision = steps.send(choice)
+            except StopIteration:
+                decision = None
+        return initial_state
+
+    def _play_bidding(self, game: Game) -> tuple[Optional[int], torch.Tensor]:
+        """Run the auction of a dataset deal and score it from its DD table.
+
+        Args:
+            game: Game prepared by ``_setup_game``.
+
+        Returns:
+            tuple: Tricks the declarer's side takes double dummy, None if
+            passed out, and the initial state of the agent's dealt hand.
+        """
+        owners, dd = next(self._dd_deals)
+        initial_state = self._play_game(
+            game, array_to_hands(owners_to_array(owners)), bidding_only=True
+        )
+        if not game.contract:
+            return None, initial_state
+        tricks = int(dd[game.contract.suit.index, game.players.index(game.declarer)])
+        game.score_result(tricks)
+        return tricks, initial_state
+
+    def _record_trick(self, game: Game, trick: Trick) -> None:
+        """Turn the agent's card in a completed trick into a transition.
+
+        The transition of a trick is stored once the agent's next state is
+        known, i.e. after the following trick, or as terminal after the last.
+
+        Args:
+            game: Game being played.
+            trick: The completed trick.
+        """
+        last_play = self.rl_agent.last_play
+        if last_play is None:
+            return
+        self.rl_agent.last_play = None
+
+        agent_index = game.players.index(self.rl_agent)
+        team = (self.rl_agent, game.players[(agent_index + 2) % self.NUM_PLAYERS])
+        reward = self._get_reward_for_trick(
+            trick.get_winner() in team, game.declarer in team
+        )
+
+        state, action = last_play
+        if self._pending_play is not None:
+            self.play_buffer.add(*self._pending_play, state, False)
+        if len(game.tricks_played) == self.NUM_TRICKS:
+            self.play_buffer.add(state, action, reward, None, True)
+            self._pending_play = None
+        else:
+            self._pending_play = (state, action, reward)
+
+    def _side_tricks(self, game: Game, declarer_team_tricks: Optional[int]) -> int:
+        """Tricks of the agent's side given those of the declarer's side."""
+        if declarer_team_tricks is None:
+            return 0
+        agent_index = game.players.index(self.rl_agent)
+        declarer_index = game.players.index(game.declarer)
+        if (agent_index - declarer_index) % 2 == 0:
+            return declarer_team_tricks
+        return self.NUM_TRICKS - declarer_team_tricks
+
+    def _update_play_network(self) -> None:
+        """Train the play network on minibatches from the play buffer."""
+        if len(self.play_buffer) < self.play_batch_size:
+            return
+        for _ in range(self.play_updates_per_episode):
+            self.rl_agent.update_q_network_batch(
+                *self.play_buffer.sample(self.play_batch_size), is_bidding=False
+            )
 
     def _process_bidding_rewards(
-        self, game: Game, players: List[RandomAgent], initial_state: torch.Tensor
+        self,
+        game: Game,
+        players: List[RandomAgent],
+        initial_state: torch.Tensor,
+        declarer_team_tricks: Optional[int] = None,
     ) -> tuple[bool, Optional[int], Optional[bool]]:
         """Process rewards for the bidding phase.
 
@@ -182,20 +366,25 @@ class BridgeTrainer:
             game: Current game instance.
             players: List of players in the game.
             initial_state: Initial state tensor for Q-network update.
+            declarer_team_tricks: Tricks of the declarer's side, counted from
+                the tricks played if None.
 
         Returns:
             tuple: (is_declarer, contract_level, made_contract) for metrics tracking
         """
+        import torch
+
         is_declarer = bool(game.contract and game.declarer == self.rl_agent)
         contract_level = None
         made_contract = None
         self.metrics.epsilon_decay_factor *= 0.9999
 
         if is_declarer:
-            partner_index = (players.index(self.rl_agent) + 2) % self.NUM_PLAYERS
-            declarer_team_tricks = (
-                game.declarer.tricks_won + players[partner_index].tricks_won
-            )
+            if declarer_team_tricks is None:
+                partner_index = (players.index(self.rl_agent) + 2) % self.NUM_PLAYERS
+                declarer_team_tricks = (
+                    game.declarer.tricks_won + players[partner_index].tricks_won
+                )
             tricks_needed = 6 + game.contract.number
             made_contract = declarer_team_tricks >= tricks_needed
             contract_level = game.contract.number
@@ -236,26 +425,46 @@ class BridgeTrainer:
     def train(self) -> None:
         """Train the RL agent through self-play against random agents."""
         print(f"Starting training for {self.num_episodes} episodes...")
+        self.run_episodes(self.num_episodes)
+        self._plot_training_results()
+
+    def run_episodes(self, num_episodes: int, verbose: bool = True) -> None:
+        """Play and learn from more episodes, continuing previous training.
 
-        for episode in range(self.num_episodes):
-            game, initial_state = self._setup_game(episode)
-            game.play()
+        Args:
+            num_episodes: Number of episodes to play.
+            verbose: Print progress every PROGRESS_UPDATE_FREQUENCY episodes.
+        """
+        for _ in range(num_episodes):
+            episode = self.episodes_played
+            self.episodes_played += 1
+            game = self._setup_game(episode)
+            if self._dd_deals is None:
+                initial_state = self._play_game(game)
+                declarer_team_tricks = None
+                tricks = self.rl_agent.tricks_won
+            else:
+                declarer_team_tricks, initial_state = self._play_bidding(game)
+                # Double dummy tricks of the agent's side in the contract
+                tricks = self._side_tricks(game, declarer_team_tricks)
 
             is_declarer, contract_level, made_contract = self._process_bidding_rewards(
-                game, game.players, initial_state
+                game, game.players, initial_state, declarer_team_tricks
             )
+            if self.train_play:
+                self._update_play_network()
 
             # Update metrics
             self.metrics.update(
                 game.score[self.rl_agent],
-                self.rl_agent.tricks_won,
+                tricks,
                 is_declarer,
                 contract_level,
                 made_contract,
             )
 
             # Print progress
-            if (episode + 1) % self.PROGRESS_UPDATE_FREQUENCY == 0:
+            if verbose and (episode + 1) % self.PROGRESS_UPDATE_FREQUENCY == 0:
                 avg_score, avg_tricks, decl_rate, success_rate, avg_level = (
                     self.metrics.get_recent_averages()
                 )
@@ -266,10 +475,10 @@ class BridgeTrainer:
                 print(f"Contract Success Rate: {success_rate:.2%}")
                 print(f"Average Contract Level: {avg_level:.2f}")
 
-        self._plot_training_results()
-
     def _plot_training_results(self) -> None:
         """Plot and save training metrics with rolling averages."""
+        import matplotlib.pyplot as plt
+
         window = 100  # Window size for rolling average
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(20, 16))
         episodes = range(len(self.metrics.scores))
@@ -369,7 +578,18 @@ class BridgeTrainer:
 
 def main() -> None:
     """Main entry point for training."""
-    trainer = BridgeTrainer(num_episodes=1_000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the RL agent")
+    parser.add_argument("--episodes", type=int, default=1_000)
+    parser.add_argument(
+        "--dd-dataset",
+        default=None,
+        help="Train bidding only, scoring contracts from this DD dataset",
+    )
+    args = parser.parse_args()
+
+    trainer = BridgeTrainer(num_episodes=args.episodes, dd_dataset=args.dd_dataset)
     trainer.train()
 
 